@@ -1,3 +1,4 @@
+from django import forms
 from django.contrib import admin
 from django.contrib.auth.models import User
 
@@ -8,8 +9,94 @@ admin.site.index_title = "Welcome to DonateHub Administration"
 from django.urls import path
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils.functional import cached_property
 
-from .models import Donation, DonationImage, DonationTracking, DonationStatus
+from .models import (
+    Donation, DonationImage, DonationStatusEvent, DonationTracking, DonationStatus, OutboundEmail,
+    PickupSlot, KERALA_DISTRICTS, RECEIPT_PREFIX,
+)
+from .utils.donation_search import search_filter
+from .utils.donation_stats import get_district_counts, get_status_counts
+from .utils.status_transitions import InvalidTransition, bulk_transition, check_transition, transition
+
+
+# ================= PERFORMANCE: Changelist base =================
+class EstimatedCountPaginator(Paginator):
+    """Uses the planner's row estimate for big, unfiltered PostgreSQL tables.
+
+    COUNT(*) over millions of rows is a full scan; pg_class.reltuples is close
+    enough for page links. Filtered changelists are still counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000):
+                return row[0]
+        return super().count
+
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    """Changelist defaults for large tables: no unfiltered COUNT(*), no facet counts."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+
+class CountedChoicesFilter(admin.SimpleListFilter):
+    """Choice filter labelled with counts from a maintained or cached aggregate.
+
+    Counts cover the whole table rather than the current selection, so the
+    sidebar costs one cheap lookup instead of a COUNT(*) per choice.
+    Subclasses override ``counts``; the default is a single GROUP BY on
+    ``parameter_name``.
+    """
+    options = ()
+
+    def counts(self, model_admin):
+        return dict(
+            model_admin.model._default_manager.order_by()
+            .values_list(self.parameter_name).annotate(Count('pk'))
+        )
+
+    def lookups(self, request, model_admin):
+        counts = self.counts(model_admin)
+        return [(value, f"{label} ({counts.get(value, 0):,})") for value, label in self.options]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class StatusFilter(CountedChoicesFilter):
+    title = 'status'
+    parameter_name = 'status'
+    options = DonationStatus.CHOICES
+
+    def counts(self, model_admin):
+        return get_status_counts()
+
+
+class DistrictFilter(CountedChoicesFilter):
+    title = 'district'
+    parameter_name = 'district'
+    options = KERALA_DISTRICTS
+
+    def counts(self, model_admin):
+        return get_district_counts()
 
 
 # ================= INLINE: Donation Images =================
@@ -20,52 +107,80 @@ class DonationImageInline(admin.TabularInline):
     fields = ('image', 'uploaded_at')
 
 
+# ================= INLINE: Status History =================
+class DonationStatusEventInline(admin.TabularInline):
+    model = DonationStatusEvent
+    extra = 0
+    can_delete = False
+    fields = ('status', 'actor', 'created_at')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 # ================= ADMIN ACTION: Send OTP =================
 def send_otp_action(modeladmin, request, queryset):
     """Admin action to send OTP to donors for pickup/delivery verification."""
     import random
-    from django.core.mail import send_mail
+    import time
     from django.conf import settings
+    from django.core.mail import get_connection
     from django.utils import timezone
-    
-    sent_count = 0
-    for donation in queryset:
-        # Generate OTP
-        otp = str(random.randint(100000, 999999))
-        donation.otp = otp
-        donation.otp_created_at = timezone.now()
+    from .utils.donation_cache import invalidate_donations
+    from .utils.email_outbox import deliver
+
+    started = time.perf_counter()
+    now = timezone.now()
+    donations = list(queryset.select_related('donor'))
+
+    # Generate all OTPs and persist them in one statement
+    for donation in donations:
+        donation.otp = str(random.randint(100000, 999999))
+        donation.otp_created_at = now
         donation.otp_verified = False
-        donation.save()
-        
-        # Send OTP via email
+    Donation.objects.bulk_update(donations, ['otp', 'otp_created_at', 'otp_verified'])
+    invalidate_donations([donation.pk for donation in donations])
+
+    # Record the emails in the outbox, then send them all over one connection.
+    # Anything that fails stays queued for `send_queued_emails` to retry.
+    emails = {}
+    for donation in donations:
         user_email = donation.donor.email
-        if user_email:
-            try:
-                send_mail(
-                    subject="Your OTP for Donation Verification - DonateHub",
-                    message=(
-                        f"Hello {donation.donor.username},\n\n"
-                        f"Your OTP for donation verification is: {otp}\n\n"
-                        f"This OTP is valid for 10 minutes.\n\n"
-                        f"Donation Details:\n"
-                        f"Category: {donation.category}\n"
-                        f"Receipt: {donation.receipt_number}\n\n"
-                        f"Please share this OTP with the admin when requested.\n\n"
-                        f"Regards,\nDonateHub Team"
-                    ),
-                    from_email=getattr(settings, 'EMAIL_HOST_USER', None),
-                    recipient_list=[user_email],
-                    fail_silently=True,
-                )
-                sent_count += 1
-                messages.success(request, f"OTP sent to {user_email} for donation #{donation.id}")
-            except Exception as e:
-                messages.error(request, f"Failed to send OTP for donation #{donation.id}: {e}")
-        else:
+        if not user_email:
             messages.warning(request, f"No email found for donation #{donation.id}")
-    
-    if sent_count == 0:
+            continue
+        emails[donation.id] = OutboundEmail(
+            subject="Your OTP for Donation Verification - DonateHub",
+            body=(
+                f"Hello {donation.donor.username},\n\n"
+                f"Your OTP for donation verification is: {donation.otp}\n\n"
+                f"This OTP is valid for 10 minutes.\n\n"
+                f"Donation Details:\n"
+                f"Category: {donation.category}\n"
+                f"Receipt: {donation.receipt_number}\n\n"
+                f"Please share this OTP with the admin when requested.\n\n"
+                f"Regards,\nDonateHub Team"
+            ),
+            from_email=getattr(settings, 'EMAIL_HOST_USER', None) or '',
+            to=[user_email],
+        )
+    OutboundEmail.objects.bulk_create(emails.values())
+    sent = {email.pk for email in deliver(list(emails.values()), get_connection())}
+
+    for donation_id, email in emails.items():
+        if email.pk in sent:
+            messages.success(request, f"OTP sent to {email.to[0]} for donation #{donation_id}")
+        else:
+            messages.error(
+                request,
+                f"Failed to send OTP for donation #{donation_id}: {email.last_error} (queued for retry)",
+            )
+
+    elapsed = time.perf_counter() - started
+    if not emails:
         messages.warning(request, "No OTPs were sent (no valid email addresses).")
+    messages.info(request, f"Sent {len(sent)} of {len(donations)} OTPs in {elapsed:.2f}s.")
 
 send_otp_action.short_description = "Send OTP to selected donors"
 
@@ -85,9 +200,57 @@ def verify_otp_action(modeladmin, request, queryset):
 verify_otp_action.short_description = "Verify OTP (requires OTP input)"
 
 
+# ================= ADMIN ACTIONS: Bulk status =================
+def make_bulk_status_action(new_status):
+    """Admin action moving every selected donation to ``new_status`` in one transaction."""
+    label = DonationStatus.LABELS[new_status]
+
+    def action(modeladmin, request, queryset):
+        results = bulk_transition(
+            list(queryset.order_by().values_list('id', flat=True)), new_status, actor=request.user
+        )
+        failed = [result for result in results if not result['ok']]
+        updated = len(results) - len(failed)
+        if updated:
+            messages.success(request, f"{updated} donation(s) marked as {label}.")
+        if failed:
+            messages.warning(
+                request,
+                f"{len(failed)} donation(s) skipped: "
+                + "; ".join(f"#{result['id']}: {result['error']}" for result in failed[:10])
+                + (" ..." if len(failed) > 10 else ""),
+            )
+
+    action.__name__ = f"mark_{new_status.lower()}"
+    action.short_description = f"Mark selected as {label}"
+    return action
+
+
+bulk_status_actions = [
+    make_bulk_status_action(status)
+    for status in DonationStatus.ORDER[1:] + [DonationStatus.CANCELLED]
+]
+
+
 # ================= ADMIN: Donation =================
+class DonationAdminForm(forms.ModelForm):
+    """Rejects illegal status changes before anything is saved."""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.instance.pk and cleaned_data.get('status') == DonationStatus.PICKUP_SCHEDULED:
+            # A new donation has no pickup slot to hold the place
+            self.add_error('status', "Add the donation first, then schedule its pickup.")
+        elif self.instance.pk and 'status' in self.changed_data and 'status' in cleaned_data:
+            try:
+                check_transition(self.initial['status'], cleaned_data['status'])
+            except InvalidTransition as e:
+                self.add_error('status', str(e))
+        return cleaned_data
+
+
 @admin.register(Donation)
-class DonationAdmin(admin.ModelAdmin):
+class DonationAdmin(PerformanceModelAdmin):
     list_display = (
         'id',
         'donor',
@@ -101,12 +264,16 @@ class DonationAdmin(admin.ModelAdmin):
     )
     
     list_filter = (
-        'status',
-        'district',
+        StatusFilter,
+        DistrictFilter,
         'pickup_date',
         'created_at',
     )
+
+    list_select_related = ('donor',)
     
+    # Shows the search box; the lookup itself goes through the search index
+    # (see get_search_results), which covers all of these fields
     search_fields = (
         'donor__username',
         'donor__email',
@@ -122,6 +289,7 @@ class DonationAdmin(admin.ModelAdmin):
     
     inlines = [
         DonationImageInline,
+        DonationStatusEventInline,
     ]
     
     readonly_fields = (
@@ -131,35 +299,45 @@ class DonationAdmin(admin.ModelAdmin):
         'receipt_number',
         'otp',
         'otp_verified',
+        'pickup_slot',
     )
     
-    actions = [send_otp_action, verify_otp_action]
+    actions = [send_otp_action, verify_otp_action, *bulk_status_actions]
+
+    form = DonationAdminForm
+
+    def get_changelist_form(self, request, **kwargs):
+        # list_editable status changes get the same check as the change form
+        kwargs.setdefault('form', DonationAdminForm)
+        return super().get_changelist_form(request, **kwargs)
 
     def save_model(self, request, obj, form, change):
-        """Override save to update tracking when status changes."""
-        if change:
-            old_obj = Donation.objects.get(pk=obj.pk)
-            if old_obj.status != obj.status:
-                # Status changed - update tracking
-                from django.utils import timezone
-                from .models import DonationTracking
-                tracking, created = DonationTracking.objects.get_or_create(donation=obj)
-                tracking.current_status = obj.status
-                # Set the appropriate timestamp based on new status
-                status_timestamp_map = {
-                    DonationStatus.SUBMITTED: 'submitted_at',
-                    DonationStatus.CONFIRMED: 'confirmed_at',
-                    DonationStatus.PICKUP_SCHEDULED: 'pickup_scheduled_at',
-                    DonationStatus.PICKED_UP: 'picked_up_at',
-                    DonationStatus.IN_TRANSIT: 'in_transit_at',
-                    DonationStatus.DELIVERED: 'delivered_at',
-                    DonationStatus.COMPLETED: 'completed_at',
-                }
-                timestamp_field = status_timestamp_map.get(obj.status)
-                if timestamp_field and not getattr(tracking, timestamp_field):
-                    setattr(tracking, timestamp_field, timezone.now())
-                tracking.save()
-        super().save_model(request, obj, form, change)
+        """Save the donation; status changes go through the transition service."""
+        obj.status_actor = request.user
+        if not (change and 'status' in form.changed_data):
+            super().save_model(request, obj, form, change)
+            return
+
+        old_status = form.initial['status']
+        new_status, obj.status = obj.status, old_status
+        other_fields = [name for name in form.changed_data if name != 'status']
+        # The form checked the move; a concurrent change or a full pickup
+        # calendar can still refuse it, and then nothing is saved
+        try:
+            with transaction.atomic():
+                if other_fields:
+                    obj.save(update_fields=other_fields)
+                transition(obj, new_status, actor=request.user, expected=old_status)
+        except InvalidTransition as e:
+            messages.error(request, f"Donation #{obj.pk}: {e}")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Receipt numbers sort by day then sequence, so "RCPT-20260301-" or a
+        # full number is answered by a range scan on the receipt index
+        term = search_term.strip().upper()
+        if term.startswith(f"{RECEIPT_PREFIX}-"):
+            return queryset.with_receipt_prefix(term), False
+        return search_filter(queryset, search_term), False
 
     def get_urls(self):
         urls = super().get_urls()
@@ -189,15 +367,15 @@ class DonationAdmin(admin.ModelAdmin):
                         messages.error(request, "OTP has expired. Please request a new OTP.")
                         return redirect('/admin/core/donation/')
                 
-                donation.otp_verified = True
                 # Update donation status to PICKED_UP after OTP verification
-                donation.status = DonationStatus.PICKED_UP
-                donation.save()
-                
-                # Update tracking record
-                from .models import DonationTracking
-                tracking, created = DonationTracking.objects.get_or_create(donation=donation)
-                tracking.save()
+                try:
+                    transition(
+                        donation, DonationStatus.PICKED_UP, actor=request.user,
+                        fields={'otp_verified': True},
+                    )
+                except InvalidTransition as e:
+                    messages.error(request, f"Donation #{donation.id}: {e}")
+                    return redirect('/admin/core/donation/')
                 
                 messages.success(request, f"OTP verified successfully for donation #{donation.id}. Status updated to Picked Up.")
                 return redirect('/admin/core/donation/')
@@ -217,7 +395,7 @@ class DonationAdmin(admin.ModelAdmin):
             'description': 'State is fixed to Kerala. Select district from dropdown.'
         }),
         ('Status & Tracking', {
-            'fields': ('status', 'pickup_date', 'created_at', 'updated_at')
+            'fields': ('status', 'pickup_date', 'pickup_slot', 'created_at', 'updated_at')
         }),
         ('OTP Verification', {
             'fields': ('otp', 'otp_created_at', 'otp_verified'),
@@ -228,7 +406,7 @@ class DonationAdmin(admin.ModelAdmin):
 
 # ================= ADMIN: Donation Image =================
 @admin.register(DonationImage)
-class DonationImageAdmin(admin.ModelAdmin):
+class DonationImageAdmin(PerformanceModelAdmin):
     list_display = (
         'id',
         'donation',
@@ -237,6 +415,8 @@ class DonationImageAdmin(admin.ModelAdmin):
     )
     
     list_filter = ('uploaded_at',)
+
+    list_select_related = ('donation__donor',)
     
     search_fields = (
         'donation__id',
@@ -248,12 +428,12 @@ class DonationImageAdmin(admin.ModelAdmin):
     def donation_donor(self, obj):
         return obj.donation.donor.username
     
-    donation_donor.short_name = 'Donor'
+    donation_donor.short_description = 'Donor'
 
 
 # ================= ADMIN: Donation Tracking =================
 @admin.register(DonationTracking)
-class DonationTrackingAdmin(admin.ModelAdmin):
+class DonationTrackingAdmin(PerformanceModelAdmin):
     list_display = (
         'id',
         'donation',
@@ -266,6 +446,8 @@ class DonationTrackingAdmin(admin.ModelAdmin):
         'current_status',
         'updated_at',
     )
+
+    list_select_related = ('donation__donor',)
     
     search_fields = (
         'donation__id',
@@ -276,16 +458,51 @@ class DonationTrackingAdmin(admin.ModelAdmin):
         'donation',
         'current_status',
         'updated_at',
-        'submitted_at',
-        'confirmed_at',
-        'pickup_scheduled_at',
-        'picked_up_at',
-        'in_transit_at',
-        'delivered_at',
-        'completed_at',
     )
     
     def donation_donor(self, obj):
         return obj.donation.donor.username
     
-    donation_donor.short_name = 'Donor'
+    donation_donor.short_description = 'Donor'
+
+
+# ================= ADMIN: Pickup Slots =================
+@admin.register(PickupSlot)
+class PickupSlotAdmin(PerformanceModelAdmin):
+    list_display = (
+        'day',
+        'district',
+        'booked',
+        'capacity',
+        'available',
+    )
+
+    list_filter = (
+        'district',
+        'day',
+    )
+
+    ordering = ('day', 'district')
+
+    # Only reservations move the counter
+    readonly_fields = ('booked',)
+
+
+# ================= ADMIN: Email Outbox =================
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'subject',
+        'to',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+
+    list_filter = ('status',)
+
+    search_fields = ('subject',)
+
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
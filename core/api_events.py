@@ -0,0 +1,119 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .models import Donation
+from .utils.status_events import broker, donation_key, donor_key, format_event, status_payload
+
+
+async def _authenticate(request):
+    """Session user, or a JWT from the Authorization header or ``?token=``.
+
+    Browsers' EventSource can't set headers, hence the query parameter. The
+    access token then shows up in access logs and proxy logs for the stream
+    URL; keep ACCESS_TOKEN_LIFETIME short or strip query strings from those
+    logs.
+    """
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+
+    raw = request.GET.get('token')
+    header = request.headers.get('Authorization', '')
+    if not raw and header.startswith('Bearer '):
+        raw = header.split(' ', 1)[1]
+    if not raw:
+        return None
+
+    auth = JWTAuthentication()
+    try:
+        token = auth.get_validated_token(raw)
+        return await sync_to_async(auth.get_user)(token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+class EventStream:
+    """Async iterable of SSE frames for one subscription.
+
+    Django calls ``close()`` when the response finishes or the client goes
+    away, which releases the subscription.
+    """
+
+    def __init__(self, subscription, first_frame=None):
+        self.subscription = subscription
+        self.first_frame = first_frame
+
+    def __aiter__(self):
+        return self._frames()
+
+    async def _frames(self):
+        heartbeat = getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+        yield f"retry: {getattr(settings, 'EVENT_STREAM_RETRY_MS', 3000)}\n\n".encode()
+        if self.first_frame:
+            yield self.first_frame
+        while True:
+            try:
+                yield await self.subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                # Comment line; keeps proxies from closing an idle connection
+                yield b": keep-alive\n\n"
+
+    def close(self):
+        broker.unsubscribe(self.subscription)
+
+
+def _not_streamable(request):
+    """503 for requests not served over ASGI.
+
+    A WSGI server buffers the whole streaming response, and this one never
+    ends, so the request would hang and hold a worker for as long as the
+    tab stays open. EventSource doesn't reconnect after a 503.
+    """
+    if isinstance(request, ASGIRequest):
+        return None
+    return JsonResponse({"error": "Status events need the ASGI server."}, status=503)
+
+
+def _event_stream_response(stream):
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ================= DONATION STATUS EVENTS (SSE) =================
+async def donation_events(request, donation_id):
+    """Stream status transitions for one donation, starting with its current status."""
+    refused = _not_streamable(request)
+    if refused:
+        return refused
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({"error": "Authentication required."}, status=401)
+
+    # Subscribe before reading the current status so no transition is missed
+    subscription = broker.subscribe([donation_key(donation_id)])
+    donation = await Donation.objects.only('id', 'donor_id', 'status').filter(pk=donation_id).afirst()
+    if donation is None or not (donation.donor_id == user.id or user.is_staff or user.is_superuser):
+        broker.unsubscribe(subscription)
+        return JsonResponse({"error": "Donation not found."}, status=404)
+
+    return _event_stream_response(EventStream(subscription, format_event(status_payload(donation))))
+
+
+async def my_donation_events(request):
+    """Stream status transitions for every donation of the current user."""
+    refused = _not_streamable(request)
+    if refused:
+        return refused
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({"error": "Authentication required."}, status=401)
+    return _event_stream_response(EventStream(broker.subscribe([donor_key(user.id)])))
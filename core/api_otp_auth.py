@@ -1,18 +1,22 @@
 import random
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from .models import Donation, DonationStatus, DonationTracking
+from .models import Donation, DonationStatus
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from .utils.email_outbox import queue_email
+from .utils.status_transitions import InvalidTransition, transition
 
 class SendOTPView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -29,31 +33,28 @@ class SendOTPView(APIView):
         donation.otp = otp
         donation.otp_created_at = timezone.now()
         donation.otp_verified = False
-        donation.save()
+        # Leave status to the transition service; this row wasn't read under a lock
+        donation.save(update_fields=['otp', 'otp_created_at', 'otp_verified'])
 
-        # Send OTP via email to donor
+        # Queue OTP email to donor; the outbox worker delivers it
         if donation.donor.email:
-            try:
-                context = {
-                    'username': donation.donor.username,
-                    'otp': otp,
-                    'category': donation.category,
-                    'receipt_number': donation.receipt_number,
-                }
-                html_message = render_to_string('email/email_otp.html', context)
-                plain_message = strip_tags(html_message)
-
-                send_mail(
-                    subject="Your OTP for Donation Verification - DonateHub",
-                    message=plain_message,
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=[donation.donor.email],
-                    html_message=html_message,
-                    fail_silently=False,
-                )
-                return Response({"message": f"OTP sent to {donation.donor.email}"}, status=status.HTTP_200_OK)
-            except Exception as e:
-                return Response({"error": f"Failed to send email: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            context = {
+                'username': donation.donor.username,
+                'otp': otp,
+                'category': donation.category,
+                'receipt_number': donation.receipt_number,
+            }
+            html_message = render_to_string('email/email_otp.html', context)
+            plain_message = strip_tags(html_message)
+
+            queue_email(
+                subject="Your OTP for Donation Verification - DonateHub",
+                message=plain_message,
+                from_email=settings.EMAIL_HOST_USER,
+                recipient_list=[donation.donor.email],
+                html_message=html_message,
+            )
+            return Response({"message": f"OTP sent to {donation.donor.email}"}, status=status.HTTP_200_OK)
         
         return Response({"error": "Donor has no email address."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -61,26 +62,29 @@ class VerifyOTPView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, donation_id):
-        donation = get_object_or_404(Donation, id=donation_id)
         entered_otp = request.data.get('otp', '').strip()
 
-        if not donation.otp or entered_otp != donation.otp:
-            return Response({"error": "Invalid OTP."}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # Locked so two agents can't verify the same OTP concurrently
+            donation = get_object_or_404(Donation.objects.select_for_update(), id=donation_id)
 
-        # Check expiry (10 minutes)
-        if donation.otp_created_at:
-            time_diff = timezone.now() - donation.otp_created_at
-            if time_diff.total_seconds() > 600:
-                return Response({"error": "OTP has expired."}, status=status.HTTP_400_BAD_REQUEST)
+            if not donation.otp or entered_otp != donation.otp:
+                return Response({"error": "Invalid OTP."}, status=status.HTTP_400_BAD_REQUEST)
 
-        donation.otp_verified = True
-        # If OTP is for delivery, update status
-        donation.status = DonationStatus.DELIVERED
-        donation.save()
+            # Check expiry (10 minutes)
+            if donation.otp_created_at:
+                time_diff = timezone.now() - donation.otp_created_at
+                if time_diff.total_seconds() > 600:
+                    return Response({"error": "OTP has expired."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Update tracking
-        tracking, created = DonationTracking.objects.get_or_create(donation=donation)
-        tracking.save()
+            # If OTP is for delivery, update status
+            try:
+                transition(
+                    donation, DonationStatus.DELIVERED, actor=request.user,
+                    expected=donation.status, fields={'otp_verified': True},
+                )
+            except InvalidTransition as e:
+                return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
 
         return Response({"message": "OTP verified successfully. Donation marked as Delivered."}, status=status.HTTP_200_OK)
 
@@ -98,24 +102,20 @@ class ForgotPasswordView(APIView):
             uid = urlsafe_base64_encode(force_bytes(user.pk))
             reset_link = f"{settings.FRONTEND_URL}/reset-password?uid={uid}&token={token}"
             
-            try:
-                context = {
-                    'username': user.username,
-                    'reset_link': reset_link,
-                }
-                html_message = render_to_string('email/email_password_reset.html', context)
-                plain_message = strip_tags(html_message)
-
-                send_mail(
-                    subject="Password Reset Request - DonateHub",
-                    message=plain_message,
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=[email],
-                    html_message=html_message,
-                    fail_silently=False,
-                )
-            except Exception as e:
-                return Response({"error": f"Failed to send email: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            context = {
+                'username': user.username,
+                'reset_link': reset_link,
+            }
+            html_message = render_to_string('email/email_password_reset.html', context)
+            plain_message = strip_tags(html_message)
+
+            queue_email(
+                subject="Password Reset Request - DonateHub",
+                message=plain_message,
+                from_email=settings.EMAIL_HOST_USER,
+                recipient_list=[email],
+                html_message=html_message,
+            )
 
         # For security, always return success even if user doesn't exist
         return Response({"message": "If an account exists with this email, a reset link has been sent."}, status=status.HTTP_200_OK)
@@ -149,29 +149,52 @@ class ReceiptPDFView(APIView):
 
     def get(self, request, donation_id):
         try:
-            donation = Donation.objects.get(id=donation_id)
+            donation = Donation.objects.select_related('donor').get(id=donation_id)
             # Only donor or staff can download receipt
             if donation.donor != request.user and not request.user.is_staff:
                 return Response({"error": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
             
-            context = {
-                'donation': donation,
-                'donation_id': donation.id,
-                'receipt_number': donation.receipt_number,
-                'donor_name': donation.donor.username,
-                'category': donation.category,
-                'description': donation.description,
-                'area': donation.area,
-                'district': donation.district,
-                'status': donation.get_status_display(),
-                'pickup_date': donation.pickup_date,
-                'created_at': donation.created_at,
-            }
-            
-            from core.utils.receipt_pdf import render_to_pdf
-            return render_to_pdf('admin/receipt_pdf.html', context)
+            from core.utils.receipt_pdf import cached_pdf_response, receipt_key, render_receipt_bytes
+            return cached_pdf_response(
+                request,
+                receipt_key(donation),
+                donation.updated_at,
+                f"receipt_{donation.id}.pdf",
+                lambda: render_receipt_bytes(donation),
+            )
             
         except Donation.DoesNotExist:
             return Response({"error": "Donation not found"}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ReceiptExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Stream a ZIP of the user's receipts for ?from=YYYY-MM-DD&to=YYYY-MM-DD."""
+        today = timezone.localdate()
+        raw_start, raw_end = request.query_params.get('from'), request.query_params.get('to')
+        try:
+            start = parse_date(raw_start) if raw_start else today.replace(month=1, day=1)
+            end = parse_date(raw_end) if raw_end else today
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({"error": "'from' must not be after 'to'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        donations = list(
+            Donation.objects.filter(donor=request.user, created_at__date__range=(start, end))
+            .select_related('donor')
+            .order_by('created_at')
+        )
+        if not donations:
+            return Response({"error": "No donations in this date range."}, status=status.HTTP_404_NOT_FOUND)
+
+        from core.utils.receipt_export import iter_receipts_zip
+        response = StreamingHttpResponse(iter_receipts_zip(donations), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="receipts_{start}_{end}.zip"'
+        return response
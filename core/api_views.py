@@ -1,63 +1,137 @@
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Donation, DonationImage, DonationTracking
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from .models import (
+    Donation, DonationImage, DonationTracking, DonationStatus, KERALA_DISTRICTS, generate_receipt_number,
+)
 from .serializers import (
     UserSerializer, RegisterSerializer, DonationSerializer
 )
+from .pagination import DonationSearchPagination, RecentDonationCursorPagination
+from .utils.donation_stats import get_status_counts
+from .utils.donation_cache import current_version, get_payload, make_etag, set_payload
+from .utils.image_pipeline import ImageRejected, probe, store_upload, validate_upload
+from .utils.pickup_routing import plan_pickups
+from .utils.pickup_slots import availability
+from .utils.receipt_jobs import receipt_queue_metrics
+from .utils.status_transitions import bulk_transition
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (permissions.AllowAny,)
     serializer_class = RegisterSerializer
 
-from django.core.mail import send_mail
+from .utils.email_outbox import queue_email
 
 class DonationListCreateView(generics.ListCreateAPIView):
     serializer_class = DonationSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_queryset(self):
-        return Donation.objects.filter(donor=self.request.user)
+        return Donation.objects.filter(donor=self.request.user).with_images().with_timeline()
 
     def perform_create(self, serializer):
-        donation = serializer.save(donor=self.request.user)
-        # Handle images if provided in request.FILES
         images = self.request.FILES.getlist('images')
-        for image in images:
-            DonationImage.objects.create(donation=donation, image=image)
-        # Create tracking entry
-        DonationTracking.objects.create(donation=donation)
+        try:
+            for image in images:
+                validate_upload(image)
+                probe(image)
+        except ImageRejected as e:
+            raise ValidationError({'images': [str(e)]})
+
+        # Files are written and the receipt number reserved before the
+        # transaction, which holds a status counter row until it commits
+        stored = [store_upload(image) for image in images]
+        receipt_number = generate_receipt_number()
+        try:
+            with transaction.atomic():
+                donation = serializer.save(donor=self.request.user, receipt_number=receipt_number)
+                # Renditions are produced by the process_images worker
+                for name in stored:
+                    DonationImage.objects.create(donation=donation, image=name)
+                # Create tracking entry
+                DonationTracking.objects.create(donation=donation)
+        except Exception:
+            for name in stored:
+                default_storage.delete(name)
+            raise
 
-        # Restore Email confirmation service
+        # Confirmation email is delivered by the outbox worker
         if self.request.user.email:
-            try:
-                send_mail(
-                    subject="Donation Received - DonateHub",
-                    message=(
-                        f"Hello {self.request.user.username},\n\n"
-                        f"We have received your donation request.\n\n"
-                        f"Category: {donation.category}\n"
-                        f"Location: {donation.area}\n"
-                        f"Pickup Date: {donation.pickup_date}\n\n"
-                        f"Track it here: http://localhost:5173/tracking/{donation.id}\n\n"
-                        f"Regards,\nDonateHub Team"
-                    ),
-                    from_email=None,
-                    recipient_list=[self.request.user.email],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            queue_email(
+                subject="Donation Received - DonateHub",
+                message=(
+                    f"Hello {self.request.user.username},\n\n"
+                    f"We have received your donation request.\n\n"
+                    f"Category: {donation.category}\n"
+                    f"Location: {donation.area}\n"
+                    f"Pickup Date: {donation.pickup_date}\n\n"
+                    f"Track it here: http://localhost:5173/tracking/{donation.id}\n\n"
+                    f"Regards,\nDonateHub Team"
+                ),
+                recipient_list=[self.request.user.email],
+            )
 
 class DonationDetailView(generics.RetrieveAPIView):
     serializer_class = DonationSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_queryset(self):
-        return Donation.objects.filter(donor=self.request.user)
+        return Donation.objects.filter(donor=self.request.user).with_images().with_timeline()
+
+    def retrieve(self, request, *args, **kwargs):
+        # Polled by the tracking and OTP pages: serve from the payload cache,
+        # and answer unchanged polls with 304 before touching the donation
+        donation_id = kwargs['pk']
+        variant = request.build_absolute_uri('/')
+        version = current_version(donation_id)
+        etag = make_etag(version, request.user.id, variant)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = get_payload(donation_id, version, variant, request.user.id)
+            if data is None:
+                data = self.get_serializer(self.get_object()).data
+                set_payload(donation_id, version, variant, request.user.id, data)
+            response = Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+class DonationSearchView(APIView):
+    """Ranked full-text search: ``?q=books kakkanad&page=2``.
+
+    Donors search their own donations; staff search all of them.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        donations = Donation.objects.all()
+        if not (request.user.is_staff or request.user.is_superuser):
+            donations = donations.filter(donor=request.user)
+
+        paginator = DonationSearchPagination()
+        page = paginator.paginate_search(donations, query, request)
+        prefetch_related_objects(page, 'images', 'status_events')
+        results = DonationSerializer(page, many=True, context={'request': request}).data
+        for item, donation in zip(results, page):
+            item['search_rank'] = donation.search_rank
+        return paginator.get_paginated_response(results)
+
 
 class UserDetailView(generics.RetrieveAPIView):
     serializer_class = UserSerializer
@@ -72,11 +146,123 @@ class AdminStatsView(APIView):
         if not (request.user.is_staff or request.user.is_superuser):
             return Response({"error": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
         
+        paginator = RecentDonationCursorPagination()
+        recent = paginator.paginate_queryset(
+            Donation.objects.with_images().with_timeline(), request, view=self
+        )
+
+        counts = get_status_counts()
         stats = {
-            "total": Donation.objects.count(),
-            "pending": Donation.objects.filter(status='SUBMITTED').count(),
-            "approved": Donation.objects.filter(status='CONFIRMED').count(),
-            "completed": Donation.objects.filter(status='COMPLETED').count(),
-            "recent": DonationSerializer(Donation.objects.all().order_by('-created_at')[:10], many=True).data
+            "total": sum(counts.values()),
+            "pending": counts[DonationStatus.SUBMITTED],
+            "approved": counts[DonationStatus.CONFIRMED],
+            "completed": counts[DonationStatus.COMPLETED],
+            "by_status": counts,
+            "recent": DonationSerializer(recent, many=True, context={'request': request}).data,
+            "recent_next": paginator.get_next_link(),
+            "recent_previous": paginator.get_previous_link(),
         }
         return Response(stats)
+
+
+class ReceiptQueueStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not (request.user.is_staff or request.user.is_superuser):
+            return Response({"error": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+        return Response(receipt_queue_metrics())
+
+
+class BulkStatusView(APIView):
+    """Move many donations to one status: ``{"ids": [...], "status": "PICKED_UP"}``."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if not (request.user.is_staff or request.user.is_superuser):
+            return Response({"error": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+
+        new_status = request.data.get('status')
+        ids = request.data.get('ids')
+        limit = getattr(settings, 'BULK_STATUS_MAX_IDS', 10000)
+        if new_status not in DonationStatus.LABELS:
+            return Response({"error": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not ids:
+            return Response({"error": "ids must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > limit:
+            return Response({"error": f"At most {limit} ids per request."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response({"error": "ids must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = bulk_transition(ids, new_status, actor=request.user)
+        updated = sum(1 for result in results if result['ok'])
+        return Response({
+            "status": new_status,
+            "updated": updated,
+            "failed": len(results) - updated,
+            "results": results,
+        })
+
+
+def _query_date(request, name, default):
+    """``?name=YYYY-MM-DD`` as a date, ``default`` when absent; ValueError when malformed."""
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Invalid date {value!r}")
+    return day
+
+
+class PickupRoutesView(APIView):
+    """Planned pickup runs: ``?date=YYYY-MM-DD&district=Ernakulam&capacity=25``."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not (request.user.is_staff or request.user.is_superuser):
+            return Response({"error": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            day = _query_date(request, 'date', timezone.localdate())
+        except ValueError:
+            return Response({"error": "date must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        district = request.query_params.get('district') or None
+        if district and district not in dict(KERALA_DISTRICTS):
+            return Response({"error": "Unknown district."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            capacity = int(request.query_params.get('capacity') or getattr(settings, 'PICKUP_RUN_CAPACITY', 25))
+        except ValueError:
+            capacity = 0
+        if not 1 <= capacity <= 500:
+            return Response({"error": "capacity must be between 1 and 500."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(plan_pickups(day, district=district, capacity=capacity))
+
+
+class PickupAvailabilityView(APIView):
+    """Free pickup places per day: ``?district=Ernakulam&from=YYYY-MM-DD&days=14``."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        district = request.query_params.get('district')
+        if district not in dict(KERALA_DISTRICTS):
+            return Response({"error": "Unknown district."}, status=status.HTTP_400_BAD_REQUEST)
+        today = timezone.localdate()
+        try:
+            start = _query_date(request, 'from', today)
+        except ValueError:
+            return Response({"error": "from must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = int(request.query_params.get('days') or getattr(settings, 'PICKUP_SLOT_HORIZON_DAYS', 14))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 90:
+            return Response({"error": "days must be between 1 and 90."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'district': district,
+            'days': availability(district, max(start, today), days),
+        })
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from core.utils.donation_cache import is_shared
+
+
+@register(Tags.caches, deploy=True)
+def check_donation_cache(app_configs, **kwargs):
+    """Worker commands invalidate payloads the web server must see."""
+    if settings.DEBUG or is_shared():
+        return []
+    return [
+        Error(
+            "The donation payload cache is a per-process LocMemCache.",
+            hint=(
+                "Invalidations from other processes (e.g. manage.py process_images) never reach "
+                "the web server. Set DONATION_CACHE_BACKEND to a shared cache such as Redis."
+            ),
+            id='core.E001',
+        )
+    ]
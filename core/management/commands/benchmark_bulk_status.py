@@ -0,0 +1,112 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Donation, DonationStatus, PickupSlot, ReceiptRenderJob
+from core.utils.donation_stats import rebuild_status_counters
+from core.utils.status_transitions import bulk_transition, transition
+
+BENCH_USERNAME = 'bench-bulk-status'
+BENCH_DISTRICT = 'Ernakulam'
+# Far enough ahead that the benchmark never books real pickup slots
+BENCH_DAY = date(2099, 12, 31)
+
+STEPS = [DonationStatus.CONFIRMED, DonationStatus.PICKUP_SCHEDULED, DonationStatus.PICKED_UP, DonationStatus.IN_TRANSIT]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic donations and time bulk status transitions against "
+        "moving the same rows one at a time. Seeded rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help="Donations moved per bulk step (default 10,000).")
+        parser.add_argument(
+            '--single-rows',
+            type=int,
+            default=500,
+            help="Donations moved one by one for comparison; the per-row rate is extrapolated.",
+        )
+        parser.add_argument(
+            '--i-know',
+            action='store_true',
+            help="Run with DEBUG off. Rows are seeded into the default database.",
+        )
+
+    def handle(self, *args, **options):
+        if not (settings.DEBUG or options['i_know']):
+            raise CommandError(
+                "This seeds and transitions donations in the default database. "
+                "Run it with DEBUG on, or pass --i-know on a scratch database."
+            )
+        donor, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        try:
+            ids = self._seed(donor, options['rows'])
+            # One day with room for every row, so scheduling never spills over
+            PickupSlot.open(BENCH_DISTRICT, [BENCH_DAY])
+            PickupSlot.objects.filter(district=BENCH_DISTRICT, day=BENCH_DAY).update(capacity=len(ids))
+            for new_status in STEPS:
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    results = bulk_transition(ids, new_status)
+                    elapsed = time.perf_counter() - started
+                moved = sum(1 for result in results if result['ok'])
+                self.stdout.write(
+                    f"bulk    -> {new_status:<16} {moved} rows in {elapsed * 1000:8.1f} ms "
+                    f"({moved / elapsed:9.0f} rows/s, {len(ctx.captured_queries)} queries)"
+                )
+
+            sample = self._seed(donor, options['single_rows'])
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for donation in Donation.objects.filter(pk__in=sample).only('id', 'donor_id', 'status'):
+                    transition(donation, STEPS[0])
+                elapsed = time.perf_counter() - started
+            rate = len(sample) / elapsed
+            self.stdout.write(
+                f"per-row -> {STEPS[0]:<16} {len(sample)} rows in {elapsed * 1000:8.1f} ms "
+                f"({rate:9.0f} rows/s, {len(ctx.captured_queries)} queries); "
+                f"~{options['rows'] / rate:.1f} s for {options['rows']} rows"
+            )
+        finally:
+            self._cleanup(donor)
+
+    def _seed(self, donor, rows):
+        stamp = time.monotonic_ns()
+        with transaction.atomic():
+            created = Donation.objects.bulk_create(
+                [
+                    Donation(
+                        donor=donor,
+                        category='Books',
+                        description='Benchmark donation',
+                        pickup_date=BENCH_DAY,
+                        district=BENCH_DISTRICT,
+                        receipt_number=f"BULK-{stamp}-{i:07d}",
+                    )
+                    for i in range(rows)
+                ],
+                batch_size=1000,
+            )
+        # bulk_create skips Donation.save, so bring the counters back in line
+        rebuild_status_counters()
+        if created and created[0].pk is not None:
+            return [donation.pk for donation in created]
+        return list(
+            Donation.objects.filter(receipt_number__startswith=f"BULK-{stamp}-")
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def _cleanup(self, donor):
+        ReceiptRenderJob.objects.filter(donation__donor=donor).delete()
+        Donation.objects.filter(donor=donor).delete()
+        PickupSlot.objects.filter(district=BENCH_DISTRICT, day__gte=BENCH_DAY).delete()
+        donor.delete()
+        rebuild_status_counters()
+        self.stdout.write("Removed benchmark donations.")
@@ -0,0 +1,168 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Donation, DonationStatus, KERALA_DISTRICTS
+from core.utils.donation_search import build_search_document, search_ranked, uses_database_index
+from core.utils.donation_stats import rebuild_status_counters
+
+BENCH_USER_PREFIX = 'bench-donor-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic donations and report EXPLAIN plans and latencies for the "
+        "hot Donation queries, optionally with and without the Donation indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Donations to seed (default 1,000,000).")
+        parser.add_argument('--donors', type=int, default=1000, help="Synthetic donors to spread rows over.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query.")
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help="Also measure with Donation.Meta.indexes dropped, then restore them.",
+        )
+        parser.add_argument('--keep', action='store_true', help="Keep the seeded rows afterwards.")
+        parser.add_argument(
+            '--i-know',
+            action='store_true',
+            help="Run with DEBUG off. Rows are seeded into, and --compare drops indexes on, the default database.",
+        )
+
+    def handle(self, *args, **options):
+        if not (settings.DEBUG or options['i_know']):
+            raise CommandError(
+                "This seeds the default database and --compare drops its Donation indexes. "
+                "Run it with DEBUG on, or pass --i-know on a scratch database."
+            )
+        try:
+            donors = self._seed(options['rows'], options['donors'], options['batch_size'])
+            if options['compare']:
+                self._drop_indexes()
+                try:
+                    self._report("without indexes", donors, options['repeat'])
+                finally:
+                    self._add_indexes()
+            self._report("with indexes", donors, options['repeat'])
+        finally:
+            if not options['keep']:
+                self._cleanup()
+
+    # ---------- seeding ----------
+    def _seed(self, rows, donor_count, batch_size):
+        existing = list(User.objects.filter(username__startswith=BENCH_USER_PREFIX))
+        if existing:
+            self.stdout.write(f"Reusing {len(existing)} benchmark donors.")
+            return existing
+
+        donors = User.objects.bulk_create(
+            [User(username=f"{BENCH_USER_PREFIX}{i}") for i in range(donor_count)]
+        )
+        statuses = [status for status, _label in DonationStatus.CHOICES]
+        districts = [name for name, _label in KERALA_DISTRICTS]
+        categories = ['Books', 'Clothes', 'Toys', 'Furniture', 'Electronics']
+        today = timezone.localdate()
+
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            batch = [
+                Donation(
+                    donor=random.choice(donors),
+                    category=random.choice(categories),
+                    description='Benchmark donation',
+                    pickup_date=today + timedelta(days=random.randint(-30, 30)),
+                    status=random.choice(statuses),
+                    district=random.choice(districts),
+                    # Sequential so random suffixes can't collide at this scale
+                    receipt_number=f"BENCH-{offset + i:010d}",
+                )
+                for i in range(min(batch_size, rows - offset))
+            ]
+            for donation in batch:
+                donation.search_document = build_search_document(donation)
+            with transaction.atomic():
+                Donation.objects.bulk_create(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Seeded {rows} donations in {elapsed:.1f}s.")
+
+        # bulk_create skips Donation.save, so bring the counters back in line
+        rebuild_status_counters()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"ANALYZE {Donation._meta.db_table}")
+            elif connection.vendor == 'sqlite':
+                cursor.execute("ANALYZE")
+        return donors
+
+    def _cleanup(self):
+        donor_ids = list(
+            User.objects.filter(username__startswith=BENCH_USER_PREFIX).values_list('id', flat=True)
+        )
+        if not donor_ids:
+            return
+        # Plain DELETE: seeded rows have no images or tracking to cascade to
+        placeholders = ', '.join(['%s'] * len(donor_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Donation._meta.db_table} WHERE donor_id IN ({placeholders})",
+                donor_ids,
+            )
+        User.objects.filter(id__in=donor_ids).delete()
+        rebuild_status_counters()
+        self.stdout.write("Removed benchmark donations.")
+
+    # ---------- index toggling ----------
+    def _drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in Donation._meta.indexes:
+                editor.remove_index(Donation, index)
+
+    def _add_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in Donation._meta.indexes:
+                editor.add_index(Donation, index)
+
+    # ---------- measurement ----------
+    def _queries(self, donors):
+        donor = donors[len(donors) // 2]
+        today = timezone.localdate()
+        queries = [
+            ("donor list page", Donation.objects.filter(donor=donor).order_by('-created_at', '-id')[:20]),
+            ("recent feed", Donation.objects.order_by('-created_at')[:10]),
+            ("status filter", Donation.objects.filter(status=DonationStatus.SUBMITTED).order_by('-created_at')[:20]),
+            ("district + status", Donation.objects.filter(district='Ernakulam', status=DonationStatus.CONFIRMED)[:100]),
+            (
+                "open pickups today",
+                Donation.objects.filter(pickup_date=today, district='Ernakulam')
+                .exclude(status__in=DonationStatus.TERMINAL).order_by()[:100],
+            ),
+        ]
+        if uses_database_index():
+            queries += [
+                ("search, ranked page", search_ranked(Donation.objects.all(), 'ernakulam books')[:20]),
+                ("search, donor scope", search_ranked(Donation.objects.filter(donor=donor), 'toys')[:20]),
+            ]
+        return queries
+
+    def _report(self, label, donors, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n=== {label} ==="))
+        for name, queryset in self._queries(donors):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms"
+            ))
+            self.stdout.write(queryset.explain())
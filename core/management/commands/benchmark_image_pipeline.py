@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.image_pipeline import build_renditions, decode
+
+
+def _process(path):
+    """Decode and encode every rendition of one file in memory; returns bytes produced."""
+    with open(path, 'rb') as source:
+        original, thumbnail, renditions = build_renditions(decode(source))
+    return len(original) + len(thumbnail) + sum(len(data) for *_meta, data in renditions)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure image pipeline throughput (images/sec, and per core) over the "
+        "sample JPEGs bundled in donations/. Nothing is written to storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(Path(settings.BASE_DIR) / 'donations'))
+        parser.add_argument(
+            '--processes',
+            type=int,
+            nargs='+',
+            default=sorted({1, os.cpu_count() or 1}),
+            help="Pool sizes to measure.",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Passes over the sample set per pool size.")
+
+    def handle(self, *args, **options):
+        paths = sorted(
+            str(path) for path in Path(options['source']).glob('*')
+            if path.suffix.lower() in ('.jpg', '.jpeg', '.png', '.webp')
+        )
+        if not paths:
+            raise CommandError(f"No sample images found in {options['source']}")
+        work = paths * options['repeat']
+        self.stdout.write(f"{len(paths)} sample images x {options['repeat']} passes")
+
+        for processes in options['processes']:
+            with multiprocessing.Pool(processes) as pool:
+                # Warm up workers so pool start-up isn't measured
+                pool.map(_process, paths[:processes])
+                started = time.perf_counter()
+                produced = sum(pool.imap_unordered(_process, work))
+                elapsed = time.perf_counter() - started
+            rate = len(work) / elapsed
+            self.stdout.write(
+                f"processes={processes:<3} {rate:8.1f} images/s  {rate / processes:8.1f} images/s/core  "
+                f"{produced / len(work) / 1024:.0f} KiB out per image"
+            )
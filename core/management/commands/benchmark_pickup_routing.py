@@ -0,0 +1,57 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.pickup_routing import load_gazetteer, plan_district
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the pickup route planner on synthetic days: stops scattered "
+        "around gazetteer places, across all districts and packed into one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stops', type=int, default=10_000, help="Stops per synthetic day (default 10,000).")
+        parser.add_argument('--capacity', type=int, default=25, help="Stops per run.")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed runs per scenario.")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        gazetteer = load_gazetteer()
+        rng = random.Random(options['seed'])
+        scenarios = [
+            ("all districts", list(gazetteer)),
+            ("one district (Ernakulam)", ['Ernakulam']),
+        ]
+        for label, districts in scenarios:
+            day = self._synthetic_day(rng, gazetteer, districts, options['stops'])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n=== {label}: {options['stops']} stops ==="))
+            for improve, name in ((False, "nearest-neighbour"), (True, "nearest-neighbour + 2-opt")):
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    plans = [plan_district(district, stops, options['capacity'], improve=improve)
+                             for district, stops in day.items()]
+                    timings.append(time.perf_counter() - started)
+                runs = sum(len(plan['runs']) for plan in plans)
+                distance = sum(plan['distance_km'] for plan in plans)
+                self.stdout.write(self.style.SUCCESS(
+                    f"{name:<26} median {statistics.median(timings) * 1000:7.1f} ms   "
+                    f"{runs} runs, {distance:,.0f} km"
+                ))
+
+    def _synthetic_day(self, rng, gazetteer, districts, count):
+        day = {district: [] for district in districts}
+        for donation_id in range(count):
+            district = rng.choice(districts)
+            lat, lon = rng.choice(list(gazetteer[district]['areas'].values()))
+            # Spread addresses a couple of kilometres around the named place
+            day[district].append({
+                'donation_id': donation_id,
+                'lat': lat + rng.gauss(0, 0.02),
+                'lon': lon + rng.gauss(0, 0.02),
+            })
+        return {district: stops for district, stops in day.items() if stops}
@@ -0,0 +1,115 @@
+import time
+import uuid
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import RECEIPT_SEQUENCE_MAX, ReceiptSequence, generate_receipt_numbers
+
+BENCH_TABLE = 'core_receipt_bench'
+# Far enough ahead that the benchmark never shares a sequence row with real receipts
+BENCH_DAY = date(2099, 12, 31)
+
+
+def legacy_receipt_number():
+    """The previous scheme: a random 8-hex-digit suffix."""
+    return f"RCPT-{BENCH_DAY:%Y%m%d}-{uuid.uuid4().hex[:8].upper()}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert throughput and unique-index size of random (uuid) "
+        "receipt numbers against sequence-backed ones, in a scratch table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help="Receipts inserted per scheme.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT transaction.")
+        parser.add_argument(
+            '--single-rows',
+            type=int,
+            default=2000,
+            help="Numbers allocated one at a time to time per-row reservation.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError("Index sizes can only be measured on PostgreSQL or SQLite.")
+        rows, batch_size = options['rows'], options['batch_size']
+        # Allocation test plus the sequential scheme, all on BENCH_DAY
+        if options['single_rows'] + 2 * rows > RECEIPT_SEQUENCE_MAX:
+            raise CommandError(f"One day only has {RECEIPT_SEQUENCE_MAX:,} receipt numbers; use fewer --rows.")
+        try:
+            self._report_allocation(rows, options['single_rows'])
+
+            schemes = [
+                ("random (uuid4)", lambda count: [legacy_receipt_number() for _ in range(count)]),
+                ("sequential", lambda count: generate_receipt_numbers(count, day=BENCH_DAY)),
+            ]
+            for label, allocate in schemes:
+                self._create_table()
+                try:
+                    started = time.perf_counter()
+                    for offset in range(0, rows, batch_size):
+                        numbers = allocate(min(batch_size, rows - offset))
+                        with transaction.atomic(), connection.cursor() as cursor:
+                            # Clashes are counted instead of aborting the run
+                            cursor.executemany(
+                                f"INSERT INTO {BENCH_TABLE} (receipt_number) VALUES (%s) ON CONFLICT DO NOTHING",
+                                [(number,) for number in numbers],
+                            )
+                    elapsed = time.perf_counter() - started
+                    size, stored = self._index_size(), self._row_count()
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{label:<16} {rows / elapsed:9.0f} inserts/s   "
+                        f"index {size / 1024:9.0f} KiB ({size / stored:.1f} bytes/row)   "
+                        f"{rows - stored} collisions"
+                    ))
+                finally:
+                    self._drop_table()
+        finally:
+            ReceiptSequence.objects.filter(day=BENCH_DAY).delete()
+
+    def _report_allocation(self, rows, single_rows):
+        started = time.perf_counter()
+        for _ in range(single_rows):
+            generate_receipt_numbers(1, day=BENCH_DAY)
+        per_row = single_rows / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        generate_receipt_numbers(rows, day=BENCH_DAY)
+        block = rows / (time.perf_counter() - started)
+        self.stdout.write(
+            f"allocation: {per_row:9.0f} numbers/s one at a time, {block:9.0f} numbers/s as one block of {rows}"
+        )
+
+    # ---------- scratch table ----------
+    def _create_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+            cursor.execute(f"CREATE TABLE {BENCH_TABLE} (receipt_number varchar(30) NOT NULL UNIQUE)")
+
+    def _drop_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+
+    def _row_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {BENCH_TABLE}")
+            return cursor.fetchone()[0]
+
+    def _index_size(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "SELECT SUM(pg_relation_size(indexrelid)) FROM pg_index WHERE indrelid = %s::regclass",
+                    [BENCH_TABLE],
+                )
+            else:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [BENCH_TABLE],
+                )
+            return cursor.fetchone()[0]
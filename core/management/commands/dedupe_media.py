@@ -0,0 +1,121 @@
+import hashlib
+import os
+from collections import defaultdict
+
+from django.core.files.storage import default_storage, storages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import DonationImage, MediaBlob
+from core.storage import ContentAddressedStorage, blob_name
+from core.utils.donation_cache import invalidate_donation
+
+
+def _sha256(path, chunk_size=1024 * 1024):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapse identical files under MEDIA_ROOT into single content-addressed "
+        "blobs, repoint DonationImage rows at them and report the bytes reclaimed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='donations', help="Media subdirectory to scan.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be reclaimed without changing anything.")
+
+    def handle(self, *args, **options):
+        if not isinstance(storages['default'], ContentAddressedStorage):
+            raise CommandError("The default storage is not core.storage.ContentAddressedStorage.")
+
+        groups = self._scan(options['prefix'])
+        references = self._references()
+        known = dict(MediaBlob.objects.values_list('sha256', 'name'))
+
+        renames = {}
+        doomed = []
+        blobs = []
+        reclaimed = 0
+        for digest, names in groups.items():
+            referenced = [name for name in names if name in references]
+            if len(names) == 1 and (not referenced or digest in known):
+                continue
+            canonical = known.get(digest) or blob_name(names[0], digest)
+            keep = canonical if canonical in names else names[0]
+            for name in names:
+                if name != keep:
+                    doomed.append(name)
+                    reclaimed += default_storage.size(name)
+            if referenced:
+                # Referenced content becomes a blob that every row points at
+                renames.update({name: canonical for name in names if name != canonical})
+                refs = sum(references[name] for name in referenced)
+                blobs.append((digest, canonical, keep, refs))
+
+        self.stdout.write(
+            f"Scanned {sum(len(names) for names in groups.values())} files in {len(groups)} distinct blobs; "
+            f"{len(doomed)} duplicates, {reclaimed / (1024 * 1024):.1f} MiB reclaimable."
+        )
+        if options['dry_run']:
+            return
+
+        with transaction.atomic():
+            for digest, canonical, keep, refs in blobs:
+                if keep != canonical:
+                    os.makedirs(os.path.dirname(default_storage.path(canonical)), exist_ok=True)
+                    os.replace(default_storage.path(keep), default_storage.path(canonical))
+                size = default_storage.size(canonical)
+                MediaBlob.objects.update_or_create(
+                    sha256=digest, defaults={'name': canonical, 'size': size, 'ref_count': refs},
+                )
+            updated = self._repoint(renames)
+
+        for name in doomed:
+            if os.path.exists(default_storage.path(name)):
+                os.remove(default_storage.path(name))
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {len(doomed)} duplicate files and repointed {updated} images; "
+            f"reclaimed {reclaimed} bytes ({reclaimed / (1024 * 1024):.1f} MiB)."
+        ))
+
+    def _scan(self, prefix):
+        root = default_storage.path(prefix)
+        groups = defaultdict(list)
+        for directory, _dirs, files in os.walk(root):
+            for filename in sorted(files):
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, default_storage.location).replace(os.sep, '/')
+                groups[_sha256(path)].append(name)
+        return groups
+
+    def _references(self):
+        counts = defaultdict(int)
+        for image in DonationImage.objects.only('image', 'thumbnail', 'renditions').iterator():
+            for name in image.file_names():
+                counts[name] += 1
+        return counts
+
+    def _repoint(self, renames):
+        changed = []
+        for image in DonationImage.objects.only('donation', 'image', 'thumbnail', 'renditions').iterator():
+            dirty = False
+            for field in ('image', 'thumbnail'):
+                name = getattr(image, field).name
+                if name in renames:
+                    setattr(image, field, renames[name])
+                    dirty = True
+            for rendition in image.renditions:
+                if rendition['name'] in renames:
+                    rendition['name'] = renames[rendition['name']]
+                    dirty = True
+            if dirty:
+                changed.append(image)
+        DonationImage.objects.bulk_update(changed, ['image', 'thumbnail', 'renditions'], batch_size=500)
+        for donation_id in {image.donation_id for image in changed}:
+            invalidate_donation(donation_id)
+        return len(changed)
@@ -0,0 +1,214 @@
+import csv
+import json
+import time
+from collections import Counter
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import (
+    Donation, DonationStatus, DonationStatusCounter, DonationStatusEvent, DonationTracking,
+    KERALA_DISTRICTS, ReceiptSequenceExhausted, generate_receipt_numbers,
+)
+from core.utils.donation_search import build_search_document, reindex_donations
+
+VALID_STATUSES = {status for status, _label in DonationStatus.CHOICES}
+VALID_DISTRICTS = {name for name, _label in KERALA_DISTRICTS}
+_AMOUNT_FIELD = Donation._meta.get_field('amount')
+AMOUNT_QUANTUM = Decimal(1).scaleb(-_AMOUNT_FIELD.decimal_places)
+AMOUNT_INTEGER_DIGITS = _AMOUNT_FIELD.max_digits - _AMOUNT_FIELD.decimal_places
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(path, fmt):
+    """Yield ``(line_no, record)`` pairs without loading the whole file.
+
+    A JSONL line that isn't valid JSON is yielded as a RowError in place of
+    the record, so parse_row reports it like any other bad row.
+    """
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_no, RowError(f"invalid JSON: {exc.msg}")
+
+
+def _text(row, key):
+    value = row.get(key)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise RowError(f"{key} must be a string, not {type(value).__name__}")
+    return value.strip()
+
+
+def parse_row(row):
+    """Turn a raw record into Donation field values, raising RowError if invalid."""
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError("expected an object")
+
+    donor = _text(row, 'donor')
+    category = _text(row, 'category')
+    description = _text(row, 'description')
+    if not donor or not category or not description:
+        raise RowError("donor, category and description are required")
+
+    try:
+        pickup_date = date.fromisoformat(_text(row, 'pickup_date'))
+    except ValueError:
+        raise RowError(f"invalid pickup_date {row.get('pickup_date')!r}")
+
+    amount = row.get('amount')
+    if amount in (None, ''):
+        amount = None
+    else:
+        try:
+            amount = Decimal(str(amount))
+        except InvalidOperation:
+            raise RowError(f"invalid amount {amount!r}")
+        if not amount.is_finite():
+            raise RowError(f"invalid amount {row.get('amount')!r}")
+        # Checked here so one oversized amount can't fail the whole batch insert
+        try:
+            amount = amount.quantize(AMOUNT_QUANTUM)
+        except InvalidOperation:
+            raise RowError(f"amount {row.get('amount')!r} is too large")
+        if amount.adjusted() >= AMOUNT_INTEGER_DIGITS:
+            raise RowError(f"amount {row.get('amount')!r} is too large")
+
+    district = _text(row, 'district') or None
+    if district and district not in VALID_DISTRICTS:
+        raise RowError(f"unknown district {district!r}")
+
+    status = _text(row, 'status') or DonationStatus.SUBMITTED
+    if status not in VALID_STATUSES:
+        raise RowError(f"unknown status {status!r}")
+    if status == DonationStatus.PICKUP_SCHEDULED:
+        # Scheduling books a pickup slot, which bulk inserts can't do
+        raise RowError("cannot import as PICKUP_SCHEDULED; import as CONFIRMED and schedule the pickup")
+
+    return donor, {
+        'category': category,
+        'description': description,
+        'pickup_date': pickup_date,
+        'amount': amount,
+        'district': district,
+        'area': _text(row, 'area') or None,
+        'pickup_address': _text(row, 'pickup_address') or None,
+        'status': status,
+    }
+
+
+class Command(BaseCommand):
+    help = "Bulk import donations from a CSV or JSONL file using batched inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (with header) or JSONL file to import.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help="Abort on an invalid row instead of skipping it; earlier batches stay committed.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        rows = read_rows(path, fmt)
+        imported = skipped = 0
+        started = time.perf_counter()
+
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            created, errors = self._import_batch(chunk, options['strict'])
+            imported += created
+            skipped += len(errors)
+            for line_no, message in errors:
+                self.stderr.write(f"Row {line_no}: {message}")
+
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{imported} imported, {skipped} skipped ({imported / elapsed:.0f} rows/s)")
+
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} donations in {elapsed:.2f}s ({rate:.0f} rows/s); skipped {skipped}."
+        ))
+
+    def _import_batch(self, chunk, strict=False):
+        """Validate and insert one batch in a single transaction."""
+        errors = []
+        parsed = []
+        for line_no, row in chunk:
+            try:
+                parsed.append((line_no, *parse_row(row)))
+            except RowError as exc:
+                errors.append((line_no, str(exc)))
+
+        keys = {donor for _line_no, donor, _fields in parsed}
+        donors = {}
+        for user in User.objects.filter(Q(username__in=keys) | Q(email__in=keys)):
+            donors.setdefault(user.username, user)
+            if user.email:
+                donors.setdefault(user.email, user)
+
+        donations = []
+        for line_no, donor, fields in parsed:
+            if donor not in donors:
+                errors.append((line_no, f"unknown donor {donor!r}"))
+                continue
+            donations.append(Donation(donor=donors[donor], **fields))
+
+        errors.sort()
+        if strict and errors:
+            line_no, message = errors[0]
+            raise CommandError(f"Row {line_no}: {message}")
+
+        try:
+            receipts = generate_receipt_numbers(len(donations))
+        except ReceiptSequenceExhausted as e:
+            raise CommandError(str(e))
+        for donation, receipt in zip(donations, receipts):
+            donation.receipt_number = receipt
+            donation.search_document = build_search_document(donation)
+
+        with transaction.atomic():
+            # bulk_create skips Donation.save, so tracking rows, status events
+            # and status counters are written here in bulk as well
+            Donation.objects.bulk_create(donations)
+            DonationTracking.objects.bulk_create(
+                [DonationTracking.for_donation(donation) for donation in donations]
+            )
+            DonationStatusEvent.objects.bulk_create(
+                [DonationStatusEvent.for_donation(donation) for donation in donations]
+            )
+            DonationStatusCounter.adjust(Counter(donation.status for donation in donations))
+            reindex_donations({donation.pk: donation.search_document for donation in donations})
+
+        return len(donations), errors
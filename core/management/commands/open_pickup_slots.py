@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.models import KERALA_DISTRICTS, PickupSlot
+
+
+class Command(BaseCommand):
+    help = (
+        "Create pickup slots for the coming days and optionally set their "
+        "capacity. Capacity is never lowered below what is already booked."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14, help="Days to open, starting today (default 14).")
+        parser.add_argument('--district', help="Only this district (default: all).")
+        parser.add_argument('--capacity', type=int, help="Pickups per day; defaults to PICKUP_SLOT_CAPACITY.")
+
+    def handle(self, *args, **options):
+        districts = [name for name, _label in KERALA_DISTRICTS]
+        if options['district']:
+            if options['district'] not in districts:
+                raise CommandError(f"Unknown district {options['district']!r}.")
+            districts = [options['district']]
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1.")
+        if options['capacity'] is not None and options['capacity'] < 0:
+            raise CommandError("--capacity cannot be negative.")
+
+        today = timezone.localdate()
+        days = [today + timedelta(days=offset) for offset in range(options['days'])]
+        for district in districts:
+            PickupSlot.open(district, days)
+
+        slots = PickupSlot.objects.filter(district__in=districts, day__in=days)
+        if options['capacity'] is not None:
+            slots.update(capacity=Greatest(options['capacity'], F('booked')))
+        self.stdout.write(self.style.SUCCESS(
+            f"{slots.count()} pickup slots open for {len(districts)} district(s) "
+            f"from {days[0]} to {days[-1]}."
+        ))
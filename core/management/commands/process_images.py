@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.utils.donation_cache import is_shared
+from core.utils.image_pipeline import claim_images, process_image, record_image_results, requeue_stale_images
+
+
+def _init_worker():
+    django.setup()
+    # Never share the parent's database sockets
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Produce renditions and thumbnails for uploaded donation images using a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes; 0 processes images in this process.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help="Images claimed at a time; bounds the queue handed to the pool.",
+        )
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when idle.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue and exit.")
+
+    def handle(self, *args, **options):
+        if not is_shared():
+            message = (
+                "The donation cache is local to this process, so the web server won't see "
+                "processed images until its cached payloads expire (DONATION_CACHE_TIMEOUT). "
+                "Set DONATION_CACHE_BACKEND to a shared cache."
+            )
+            if not settings.DEBUG:
+                raise CommandError(message)
+            self.stderr.write(self.style.WARNING(message))
+
+        pool = None
+        if options['processes'] > 0:
+            connections.close_all()
+            pool = multiprocessing.Pool(options['processes'], initializer=_init_worker)
+        run = pool.map if pool else lambda fn, ids: [fn(image_id) for image_id in ids]
+
+        try:
+            while True:
+                requeued = requeue_stale_images()
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} images whose worker stopped responding.")
+                claimed_at, ids = claim_images(options['batch_size'])
+                if ids:
+                    started = time.perf_counter()
+                    results = run(process_image, ids)
+                    record_image_results(results, claimed_at)
+                    elapsed = time.perf_counter() - started
+                    failed = sum(1 for _id, ok, _ms, _err, _fields in results if not ok)
+                    self.stdout.write(
+                        f"Processed {len(ids) - failed}/{len(ids)} images in {elapsed:.2f}s "
+                        f"({len(ids) / elapsed:.1f} images/s)"
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.utils.receipt_pdf import prune_receipt_cache
+
+
+class Command(BaseCommand):
+    help = "Delete cached receipt PDFs that have not been downloaded recently."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-days',
+            type=float,
+            default=getattr(settings, 'RECEIPT_CACHE_MAX_AGE', 30 * 24 * 3600) / 86400,
+        )
+
+    def handle(self, *args, **options):
+        removed = prune_receipt_cache(options['max_age_days'] * 86400)
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached receipts."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.donation_stats import check_status_counters, rebuild_status_counters
+
+
+class Command(BaseCommand):
+    help = "Verify the per-status donation counters and rebuild them from the donations table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report drift; exit with status 1 if counters are out of date.",
+        )
+
+    def handle(self, *args, **options):
+        drift = check_status_counters()
+        for status, (stored, actual) in drift.items():
+            self.stdout.write(f"{status}: counter={stored} actual={actual}")
+
+        if options['check']:
+            if drift:
+                raise CommandError("Status counters are out of date; run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Status counters are consistent."))
+            return
+
+        counts = rebuild_status_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt status counters ({sum(counts.values())} donations)."
+        ))
@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import time
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from core.models import ReceiptRenderJob
+from core.utils.receipt_jobs import (
+    claim_jobs, receipt_queue_metrics, record_results, render_job, requeue_stale_jobs,
+)
+
+
+def _init_worker():
+    django.setup()
+    # Never share the parent's database sockets
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Pre-render queued receipt PDFs using a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes; 0 renders in this process.",
+        )
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when idle.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue and exit.")
+        parser.add_argument('--keep-days', type=int, default=7, help="Delete finished jobs older than this.")
+
+    def handle(self, *args, **options):
+        pool = None
+        if options['processes'] > 0:
+            connections.close_all()
+            pool = multiprocessing.Pool(options['processes'], initializer=_init_worker)
+        run = pool.map if pool else lambda fn, ids: [fn(job_id) for job_id in ids]
+
+        try:
+            while True:
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} jobs whose worker stopped responding.")
+                claimed_at, ids = claim_jobs(options['batch_size'])
+                if ids:
+                    started = time.perf_counter()
+                    results = run(render_job, ids)
+                    record_results(results, claimed_at)
+                    failed = sum(1 for _id, ok, _ms, _err in results if not ok)
+                    self.stdout.write(
+                        f"Rendered {len(ids) - failed}/{len(ids)} receipts in "
+                        f"{time.perf_counter() - started:.2f}s; metrics: {receipt_queue_metrics()}"
+                    )
+                    continue
+                if options['once']:
+                    break
+                self._purge_finished(options['keep_days'])
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        self._purge_finished(options['keep_days'])
+
+    def _purge_finished(self, keep_days):
+        ReceiptRenderJob.objects.filter(
+            status=ReceiptRenderJob.DONE,
+            finished_at__lt=timezone.now() - timedelta(days=keep_days),
+        ).delete()
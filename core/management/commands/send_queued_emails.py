@@ -0,0 +1,57 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.utils.email_outbox import send_due_emails
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox over a persistent email connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100),
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument('--once', action='store_true', help="Drain what is due now and exit.")
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        total_sent = 0
+        try:
+            while True:
+                try:
+                    claimed, sent = send_due_emails(options['batch_size'], connection)
+                except Exception:
+                    # e.g. the database went away; keep the worker alive and retry
+                    logger.exception("Outbox batch failed")
+                    if options['once']:
+                        raise
+                    connection.close()
+                    time.sleep(options['interval'])
+                    continue
+                total_sent += sent
+                if claimed:
+                    self.stdout.write(f"Sent {sent}/{claimed} emails.")
+                    continue
+                if options['once']:
+                    break
+                # Don't hold an idle SMTP session open between polls
+                connection.close()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(self.style.SUCCESS(f"Outbox worker stopped; {total_sent} emails sent."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alter_donation_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donor', '-created_at', '-id'], name='donation_donor_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:51
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    Donation = apps.get_model('core', 'Donation')
+    DonationStatusCounter = apps.get_model('core', 'DonationStatusCounter')
+    counts = Donation.objects.order_by().values('status').annotate(n=models.Count('id'))
+    DonationStatusCounter.objects.bulk_create(
+        [DonationStatusCounter(status=row['status'], count=row['n']) for row in counts]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_donation_donor_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationStatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('CONFIRMED', 'Confirmed'), ('PICKUP_SCHEDULED', 'Pickup Scheduled'), ('PICKED_UP', 'Picked Up'), ('IN_TRANSIT', 'In Transit'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20, unique=True)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
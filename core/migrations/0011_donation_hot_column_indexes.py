@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_donationstatuscounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['-created_at'], name='donation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['status', '-created_at'], name='donation_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['district', 'status'], name='donation_district_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(condition=models.Q(('status__in', ['COMPLETED', 'DELIVERED', 'CANCELLED']), _negated=True), fields=['pickup_date', 'district'], name='donation_open_pickup_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptRenderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('render_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('donation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipt_jobs', to='core.donation')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='receipt_job_status_idx')],
+            },
+        ),
+    ]
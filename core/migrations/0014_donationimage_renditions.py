@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_receiptrenderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='donationimage',
+            name='renditions',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='donationimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='donations/thumbs/%Y/%m/%d/'),
+        ),
+        migrations.AddField(
+            model_name='donationimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
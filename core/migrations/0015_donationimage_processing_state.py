@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_donationimage_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationimage',
+            name='processing_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='donationimage',
+            name='processing_state',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('READY', 'Ready'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='donationimage',
+            index=models.Index(fields=['processing_state', 'uploaded_at'], name='donation_image_state_idx'),
+        ),
+    ]
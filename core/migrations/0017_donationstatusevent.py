@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+TIMESTAMP_FIELDS = {
+    'SUBMITTED': 'submitted_at',
+    'CONFIRMED': 'confirmed_at',
+    'PICKUP_SCHEDULED': 'pickup_scheduled_at',
+    'PICKED_UP': 'picked_up_at',
+    'IN_TRANSIT': 'in_transit_at',
+    'DELIVERED': 'delivered_at',
+    'COMPLETED': 'completed_at',
+}
+
+
+def backfill_events(apps, schema_editor):
+    DonationTracking = apps.get_model('core', 'DonationTracking')
+    DonationStatusEvent = apps.get_model('core', 'DonationStatusEvent')
+
+    events = []
+    for tracking in DonationTracking.objects.iterator(chunk_size=2000):
+        for status, field in TIMESTAMP_FIELDS.items():
+            timestamp = getattr(tracking, field)
+            if timestamp:
+                events.append(DonationStatusEvent(donation_id=tracking.donation_id, status=status, created_at=timestamp))
+        # Cancellation had no column; its best-known time is the last tracking update
+        if tracking.current_status == 'CANCELLED':
+            events.append(DonationStatusEvent(
+                donation_id=tracking.donation_id, status='CANCELLED', created_at=tracking.updated_at,
+            ))
+        if len(events) >= 5000:
+            DonationStatusEvent.objects.bulk_create(events)
+            events = []
+    DonationStatusEvent.objects.bulk_create(events)
+
+
+def restore_timestamps(apps, schema_editor):
+    DonationTracking = apps.get_model('core', 'DonationTracking')
+    DonationStatusEvent = apps.get_model('core', 'DonationStatusEvent')
+
+    first_seen = {}
+    for donation_id, status, created_at in (
+        DonationStatusEvent.objects.order_by('-created_at').values_list('donation_id', 'status', 'created_at')
+        .iterator(chunk_size=5000)
+    ):
+        if status in TIMESTAMP_FIELDS:
+            first_seen.setdefault(donation_id, {})[TIMESTAMP_FIELDS[status]] = created_at
+
+    trackings = list(DonationTracking.objects.filter(donation_id__in=first_seen))
+    for tracking in trackings:
+        for field, timestamp in first_seen[tracking.donation_id].items():
+            setattr(tracking, field, timestamp)
+    DonationTracking.objects.bulk_update(trackings, list(TIMESTAMP_FIELDS.values()), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_mediablob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('CONFIRMED', 'Confirmed'), ('PICKUP_SCHEDULED', 'Pickup Scheduled'), ('PICKED_UP', 'Picked Up'), ('IN_TRANSIT', 'In Transit'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='donation_status_events', to=settings.AUTH_USER_MODEL)),
+                ('donation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='core.donation')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['donation', 'created_at', 'id'], name='status_event_timeline_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, restore_timestamps),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='completed_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='confirmed_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='delivered_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='in_transit_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='picked_up_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='pickup_scheduled_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationtracking',
+            name='submitted_at',
+        ),
+    ]
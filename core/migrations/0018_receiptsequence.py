@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_donationstatusevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
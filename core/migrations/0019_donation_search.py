@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:29
+
+from django.db import migrations, models
+
+CREATE_SEARCH_VECTOR = [
+    "ALTER TABLE core_donation ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, coalesce(search_document, ''))) STORED",
+    "CREATE INDEX donation_search_vector_idx ON core_donation USING gin (search_vector)",
+]
+DROP_SEARCH_VECTOR = [
+    "DROP INDEX IF EXISTS donation_search_vector_idx",
+    "ALTER TABLE core_donation DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def backfill_documents(apps, schema_editor):
+    Donation = apps.get_model('core', 'Donation')
+
+    batch = []
+    for donation in Donation.objects.select_related('donor').iterator(chunk_size=2000):
+        parts = [
+            donation.donor.username, donation.donor.email,
+            donation.category, donation.description, donation.area, donation.district,
+            donation.receipt_number,
+        ]
+        donation.search_document = ' '.join(part for part in parts if part)
+        batch.append(donation)
+        if len(batch) >= 2000:
+            Donation.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Donation.objects.bulk_update(batch, ['search_document'])
+
+
+def _run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        # The column is not on the model: other backends search in-process
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_receiptsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+        migrations.RunPython(_run_on_postgresql(CREATE_SEARCH_VECTOR), _run_on_postgresql(DROP_SEARCH_VECTOR)),
+    ]
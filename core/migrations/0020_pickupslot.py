@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_donation_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PickupSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district', models.CharField(choices=[('Thiruvananthapuram', 'Thiruvananthapuram'), ('Kollam', 'Kollam'), ('Pathanamthitta', 'Pathanamthitta'), ('Alappuzha', 'Alappuzha'), ('Kottayam', 'Kottayam'), ('Idukki', 'Idukki'), ('Ernakulam', 'Ernakulam'), ('Thrissur', 'Thrissur'), ('Palakkad', 'Palakkad'), ('Malappuram', 'Malappuram'), ('Kozhikode', 'Kozhikode'), ('Wayanad', 'Wayanad'), ('Kannur', 'Kannur'), ('Kasaragod', 'Kasaragod')], max_length=50)),
+                ('day', models.DateField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('district', 'day'), name='pickup_slot_district_day'), models.CheckConstraint(condition=models.Q(('booked__lte', models.F('capacity'))), name='pickup_slot_within_capacity')],
+            },
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='pickup_slot',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='donations', to='core.pickupslot'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_pickupslot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationstatuscounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='donationstatuscounter',
+            name='status',
+            field=models.CharField(choices=[('SUBMITTED', 'Submitted'), ('CONFIRMED', 'Confirmed'), ('PICKUP_SCHEDULED', 'Pickup Scheduled'), ('PICKED_UP', 'Picked Up'), ('IN_TRANSIT', 'In Transit'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='donationstatuscounter',
+            constraint=models.UniqueConstraint(fields=('status', 'shard'), name='status_counter_shard'),
+        ),
+    ]
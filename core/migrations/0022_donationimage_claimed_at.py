@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_status_counter_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationimage',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
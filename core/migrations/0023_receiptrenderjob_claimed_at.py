@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_donationimage_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receiptrenderjob',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,16 @@
-from django.db import models
+import random
+
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
-import uuid
+
+from .utils.donation_cache import invalidate_donation
+from .utils.donation_search import build_search_document, reindex_donations
+from .utils.status_events import publish_status_change
 
 
 # Kerala Districts Constant
@@ -59,10 +67,58 @@ class DonationStatus:
     # Terminal statuses
     TERMINAL = [COMPLETED, DELIVERED, CANCELLED]
 
+    LABELS = dict(CHOICES)
+
+
+RECEIPT_PREFIX = 'RCPT'
+# Receipts per day; the six-digit suffix must not widen or the order breaks
+RECEIPT_SEQUENCE_MAX = 999_999
+
+
+def receipt_number_prefix(day):
+    """``RCPT-YYYYMMDD-``: every receipt issued on ``day`` starts with this."""
+    return f"{RECEIPT_PREFIX}-{day:%Y%m%d}-"
+
+
+def format_receipt_number(day, value):
+    # Zero-padded so receipts sort in issue order within a day
+    return f"{receipt_number_prefix(day)}{value:06d}"
+
 
 def generate_receipt_number():
-    """Generate unique receipt number."""
-    return f"RCPT-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
+    """Next receipt number for today, e.g. ``RCPT-20260301-000042``."""
+    return generate_receipt_numbers(1)[0]
+
+
+def generate_receipt_numbers(count, day=None):
+    """Reserve ``count`` consecutive receipt numbers for a bulk insert.
+
+    Raises ReceiptSequenceExhausted when the day has fewer than ``count``
+    numbers left.
+    """
+    day = day or timezone.localdate()
+    first = ReceiptSequence.reserve(day, count)
+    return [format_receipt_number(day, value) for value in range(first, first + count)]
+
+
+class DonationQuerySet(models.QuerySet):
+    def with_receipt_prefix(self, prefix):
+        """Receipts starting with ``prefix``, as a range scan on the unique index."""
+        if not prefix:
+            return self
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self.filter(receipt_number__gte=prefix, receipt_number__lt=upper)
+
+    def issued_on(self, day):
+        return self.with_receipt_prefix(receipt_number_prefix(day))
+
+    def with_images(self):
+        """Prefetch images so serializers don't query once per donation."""
+        return self.prefetch_related('images')
+
+    def with_timeline(self):
+        """Prefetch status events; a page of timelines costs one extra query."""
+        return self.prefetch_related('status_events')
 
 
 class Donation(models.Model):
@@ -70,6 +126,15 @@ class Donation(models.Model):
     category = models.CharField(max_length=100)
     description = models.TextField()
     pickup_date = models.DateField()
+    # Capacity held while the pickup is scheduled; see core/utils/pickup_slots.py
+    pickup_slot = models.ForeignKey(
+        'PickupSlot',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='donations',
+    )
     amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     
     # Status with new choices
@@ -106,17 +171,101 @@ class Donation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Text indexed by core.utils.donation_search; rebuilt on save
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    objects = DonationQuerySet.as_manager()
+
+    SEARCH_FIELDS = frozenset([
+        'donor', 'donor_id', 'category', 'description', 'area', 'district', 'receipt_number',
+    ])
+    SEARCH_COLUMNS = ('donor_id', 'category', 'description', 'area', 'district', 'receipt_number')
+
+    # Status as last read from / written to the database, used to keep
+    # DonationStatusCounter in step without re-reading the row.
+    _loaded_status = None
+    # SEARCH_COLUMNS as last read / written, so a full save that changes none
+    # of them (a status or OTP update) skips rebuilding search_document
+    _loaded_search = None
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Matches DonationCursorPagination's ordering for a donor's list
+            models.Index(
+                fields=['donor', '-created_at', '-id'],
+                name='donation_donor_created_idx',
+            ),
+            # Default ordering / admin "recent" feed
+            models.Index(fields=['-created_at'], name='donation_created_idx'),
+            # Admin status filter and per-status dashboard queries
+            models.Index(fields=['status', '-created_at'], name='donation_status_created_idx'),
+            # Admin district filter, optionally narrowed by status
+            models.Index(fields=['district', 'status'], name='donation_district_status_idx'),
+            # Open (non-terminal) work by pickup day; stays small as history grows
+            models.Index(
+                fields=['pickup_date', 'district'],
+                name='donation_open_pickup_idx',
+                condition=~models.Q(status__in=DonationStatus.TERMINAL),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.category} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        if all(name in field_names for name in cls.SEARCH_COLUMNS):
+            instance._loaded_search = instance._search_values()
+        return instance
+
+    def _search_values(self):
+        return tuple(getattr(self, name) for name in self.SEARCH_COLUMNS)
+
     def save(self, *args, **kwargs):
         # Generate receipt number if not exists
         if not self.receipt_number:
             self.receipt_number = generate_receipt_number()
-        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            reindex = self._loaded_search is None or self._loaded_search != self._search_values()
+        else:
+            reindex = not self.SEARCH_FIELDS.isdisjoint(update_fields)
+        if reindex:
+            self.search_document = build_search_document(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = [*update_fields, 'search_document']
+        adding = self._state.adding
+        old_status = self._loaded_status
+        status_changed = adding or (
+            old_status != self.status
+            and (update_fields is None or 'status' in update_fields)
+        )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if status_changed:
+                deltas = {self.status: 1}
+                if not adding and old_status:
+                    deltas[old_status] = -1
+                DonationStatusCounter.adjust(deltas)
+                DonationStatusEvent.objects.create(
+                    donation=self, status=self.status, actor=getattr(self, 'status_actor', None),
+                )
+                publish_status_change(self, None if adding else old_status)
+        self._loaded_status = self.status
+        if update_fields is None:
+            self._loaded_search = self._search_values()
+        elif reindex:
+            # Only some searched columns were written; compare afresh next time
+            self._loaded_search = None
+        invalidate_donation(self.pk)
+        if reindex:
+            reindex_donations({self.pk: self.search_document})
 
     def get_location_display(self):
         """Get formatted location string."""
@@ -147,7 +296,193 @@ class Donation(models.Model):
         return 0
 
 
+@receiver(post_delete, sender=Donation)
+def _decrement_status_counter(sender, instance, **kwargs):
+    DonationStatusCounter.adjust({instance._loaded_status or instance.status: -1})
+    invalidate_donation(instance.pk)
+    reindex_donations({instance.pk: None})
+
+
+@receiver(post_delete, sender=Donation)
+def _release_pickup_slot(sender, instance, **kwargs):
+    if instance.pickup_slot_id and instance.status == DonationStatus.PICKUP_SCHEDULED:
+        PickupSlot.release(instance.pickup_slot_id)
+
+
+@receiver(post_init, sender=User)
+def _remember_donor_identity(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields aren't fetched just to remember them
+    instance._search_identity = (instance.__dict__.get('username'), instance.__dict__.get('email'))
+
+
+@receiver(post_save, sender=User)
+def _reindex_donor_donations(sender, instance, created, update_fields=None, **kwargs):
+    """Username and email are part of every donation's search document."""
+    if update_fields is not None and not {'username', 'email'} & set(update_fields):
+        return
+    previous = instance._search_identity
+    instance._search_identity = (instance.username, instance.email)
+    if created or instance._search_identity == previous:
+        return
+    changed = []
+    donations = instance.donations.only(
+        'id', 'category', 'description', 'area', 'district', 'receipt_number', 'search_document',
+    )
+    for donation in donations:
+        donation.donor = instance
+        document = build_search_document(donation)
+        if document != donation.search_document:
+            donation.search_document = document
+            changed.append(donation)
+    Donation.objects.bulk_update(changed, ['search_document'], batch_size=500)
+    reindex_donations({donation.pk: donation.search_document for donation in changed})
+
+
+class DonationStatusCounter(models.Model):
+    """Running number of donations per status, for O(1) dashboard reads.
+
+    Each status is spread over STATUS_COUNTER_SHARDS rows and every adjust()
+    picks one at random, so concurrent creates don't all queue on the
+    SUBMITTED row until their transactions commit; readers sum the shards.
+
+    Maintained incrementally by Donation.save / delete; run
+    ``manage.py rebuild_status_counters`` to verify or repair it.
+    """
+    status = models.CharField(max_length=20, choices=DonationStatus.CHOICES)
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'shard'], name='status_counter_shard'),
+        ]
+
+    def __str__(self):
+        return f"{self.status}[{self.shard}]: {self.count}"
+
+    @classmethod
+    def adjust(cls, deltas):
+        """Apply ``{status: delta}`` changes with atomic in-database increments."""
+        shard = random.randrange(max(getattr(settings, 'STATUS_COUNTER_SHARDS', 8), 1))
+        for status, delta in deltas.items():
+            if not delta:
+                continue
+            updated = cls.objects.filter(status=status, shard=shard).update(count=F('count') + delta)
+            if not updated:
+                cls.objects.get_or_create(status=status, shard=shard)
+                cls.objects.filter(status=status, shard=shard).update(count=F('count') + delta)
+
+
+class ReceiptSequenceExhausted(Exception):
+    """A day's receipt numbers have run out."""
+
+
+class ReceiptSequence(models.Model):
+    """Last receipt number issued per day.
+
+    Numbers are handed out by incrementing the day's row under a row lock,
+    so they are unique without relying on the unique index to catch clashes,
+    and monotonic within the day. Inserts append to the end of the receipt
+    index instead of landing on random pages.
+    """
+    day = models.DateField(unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.last_value}"
+
+    @classmethod
+    def reserve(cls, day, count=1):
+        """Reserve ``count`` consecutive values for ``day`` and return the first.
+
+        The day's row stays locked until the caller's transaction ends, so
+        call this outside long transactions.
+        """
+        with transaction.atomic():
+            sequence, _ = cls.objects.select_for_update().get_or_create(day=day)
+            if sequence.last_value + count > RECEIPT_SEQUENCE_MAX:
+                raise ReceiptSequenceExhausted(
+                    f"Only {RECEIPT_SEQUENCE_MAX - sequence.last_value} receipt numbers left for {day}; "
+                    f"{count} requested."
+                )
+            cls.objects.filter(pk=sequence.pk).update(last_value=F('last_value') + count)
+        return sequence.last_value + 1
+
+
+class PickupSlot(models.Model):
+    """Pickup capacity for one district on one day.
+
+    ``booked`` only changes through conditional UPDATEs (``take`` /
+    ``release``), and the check constraint backs them up, so concurrent
+    bookings can never overfill a day.
+    """
+    district = models.CharField(max_length=50, choices=KERALA_DISTRICTS)
+    day = models.DateField()
+    capacity = models.PositiveIntegerField()
+    booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['district', 'day'], name='pickup_slot_district_day'),
+            models.CheckConstraint(
+                condition=models.Q(booked__lte=F('capacity')), name='pickup_slot_within_capacity',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.district} {self.day}: {self.booked}/{self.capacity}"
+
+    @property
+    def available(self):
+        return max(self.capacity - self.booked, 0)
+
+    @staticmethod
+    def default_capacity(district):
+        overrides = getattr(settings, 'PICKUP_SLOT_CAPACITY_BY_DISTRICT', {})
+        return overrides.get(district, getattr(settings, 'PICKUP_SLOT_CAPACITY', 200))
+
+    @classmethod
+    def open(cls, district, days):
+        """Make sure slots exist for ``district`` on ``days`` and return them in day order."""
+        cls.objects.bulk_create(
+            [cls(district=district, day=day, capacity=cls.default_capacity(district)) for day in days],
+            ignore_conflicts=True,
+        )
+        return list(cls.objects.filter(district=district, day__in=days).order_by('day'))
+
+    @classmethod
+    def take(cls, slot_id, wanted=1):
+        """Book up to ``wanted`` places with a conditional UPDATE; returns how many were booked."""
+        while wanted > 0:
+            booked = cls.objects.filter(pk=slot_id, booked__lte=F('capacity') - wanted).update(
+                booked=F('booked') + wanted
+            )
+            if booked:
+                return wanted
+            free = cls.objects.filter(pk=slot_id).values_list('capacity', 'booked').first()
+            if free is None or free[0] <= free[1]:
+                return 0
+            wanted = min(wanted, free[0] - free[1])
+        return 0
+
+    @classmethod
+    def release(cls, slot_id, count=1):
+        cls.objects.filter(pk=slot_id, booked__gte=count).update(booked=F('booked') - count)
+
+
 class DonationImage(models.Model):
+    # Renditions are produced off-request by ``manage.py process_images``
+    PENDING = 'PENDING'
+    PROCESSING = 'PROCESSING'
+    READY = 'READY'
+    FAILED = 'FAILED'
+    PROCESSING_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
     donation = models.ForeignKey(
         Donation, 
         on_delete=models.CASCADE, 
@@ -156,12 +491,51 @@ class DonationImage(models.Model):
     image = models.ImageField(upload_to='donations/%Y/%m/%d/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # Filled in by core.utils.image_pipeline
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail = models.ImageField(upload_to='donations/thumbs/%Y/%m/%d/', blank=True)
+    # [{"format": "webp", "width": 640, "height": 480, "name": "<storage path>"}, ...]
+    renditions = models.JSONField(default=list, blank=True)
+    processing_state = models.CharField(max_length=10, choices=PROCESSING_CHOICES, default=PENDING)
+    processing_error = models.TextField(blank=True, default='')
+    # When a worker claimed it; identifies that claim and bounds its lease
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['uploaded_at']
+        indexes = [
+            models.Index(fields=['processing_state', 'uploaded_at'], name='donation_image_state_idx'),
+        ]
 
     def __str__(self):
         return f"Image for {self.donation.id}"
 
+    def file_names(self):
+        names = [self.image.name, self.thumbnail.name] + [r['name'] for r in self.renditions]
+        return [name for name in names if name]
+
+
+@receiver(post_save, sender=DonationImage)
+def _invalidate_donation_on_image_save(sender, instance, **kwargs):
+    invalidate_donation(instance.donation_id)
+
+
+@receiver(post_delete, sender=DonationImage)
+def _release_image_files(sender, instance, **kwargs):
+    from django.core.files.storage import default_storage
+
+    invalidate_donation(instance.donation_id)
+    names = instance.file_names()
+
+    def release():
+        # Files are shared between identical uploads; the storage only
+        # removes a blob once nothing references it
+        for name in names:
+            default_storage.delete(name)
+
+    transaction.on_commit(release)
+
 
 class DonationTracking(models.Model):
     """Professional tracking with OneToOneField to donation."""
@@ -177,65 +551,164 @@ class DonationTracking(models.Model):
     )
     updated_at = models.DateTimeField(auto_now=True)
 
-    # Status history
-    submitted_at = models.DateTimeField(null=True, blank=True)
-    confirmed_at = models.DateTimeField(null=True, blank=True)
-    pickup_scheduled_at = models.DateTimeField(null=True, blank=True)
-    picked_up_at = models.DateTimeField(null=True, blank=True)
-    in_transit_at = models.DateTimeField(null=True, blank=True)
-    delivered_at = models.DateTimeField(null=True, blank=True)
-    completed_at = models.DateTimeField(null=True, blank=True)
-
     class Meta:
         verbose_name_plural = 'Donation tracking'
 
     def __str__(self):
         return f"Tracking: {self.donation.id} - {self.current_status}"
 
+    @classmethod
+    def for_donation(cls, donation):
+        """Build an unsaved tracking row in step with ``donation``, for bulk_create."""
+        return cls(donation=donation, current_status=donation.status)
+
     def save(self, *args, **kwargs):
         # Sync current_status with donation status
         if self.donation:
             self.current_status = self.donation.status
-        # Update timestamp based on status
-        self._update_timestamp()
         super().save(*args, **kwargs)
-
-    def _update_timestamp(self):
-        """Update timestamp based on current status."""
-        now = timezone.now()
-        status_map = {
-            DonationStatus.SUBMITTED: 'submitted_at',
-            DonationStatus.CONFIRMED: 'confirmed_at',
-            DonationStatus.PICKUP_SCHEDULED: 'pickup_scheduled_at',
-            DonationStatus.PICKED_UP: 'picked_up_at',
-            DonationStatus.IN_TRANSIT: 'in_transit_at',
-            DonationStatus.DELIVERED: 'delivered_at',
-            DonationStatus.COMPLETED: 'completed_at',
-        }
-        field_name = status_map.get(self.current_status)
-        if field_name and not getattr(self, field_name):
-            setattr(self, field_name, now)
+        invalidate_donation(self.donation_id)
 
     def get_tracking_steps(self):
-        """Get ordered tracking steps with timestamps."""
-        steps = []
-        for idx, status in enumerate(DonationStatus.ORDER):
-            status_label = dict(DonationStatus.CHOICES).get(status, status)
-            timestamp = getattr(self, f"{status.lower()}_at", None)
-            completed = getattr(self, f"{status.lower()}_at", None) is not None
-            # Use donation's status for is_current to ensure accuracy
-            donation_status = self.donation.status if self.donation else self.current_status
-            is_current = status == donation_status
-            
-            steps.append({
+        """Get ordered tracking steps with timestamps from the status event log."""
+        reached = {}
+        for event in self.donation.status_events.all():
+            # Keep the latest time each status was entered (re-scheduling repeats a step)
+            reached[event.status] = event.created_at
+        donation_status = self.donation.status
+        return [
+            {
                 'status': status,
-                'label': status_label,
-                'timestamp': timestamp,
-                'completed': completed,
-                'is_current': is_current,
+                'label': DonationStatus.LABELS.get(status, status),
+                'timestamp': reached.get(status),
+                'completed': status in reached,
+                'is_current': status == donation_status,
                 'step_number': idx + 1,
-            })
-        return steps
+            }
+            for idx, status in enumerate(DonationStatus.ORDER)
+        ]
 
 
+class DonationStatusEvent(models.Model):
+    """Append-only log of status transitions, one row per change."""
+    donation = models.ForeignKey(Donation, on_delete=models.CASCADE, related_name='status_events')
+    status = models.CharField(max_length=20, choices=DonationStatus.CHOICES)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='donation_status_events'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['donation', 'created_at', 'id'], name='status_event_timeline_idx'),
+        ]
 
+    def __str__(self):
+        return f"{self.donation_id}: {self.status} at {self.created_at:%Y-%m-%d %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Donation status events are append-only.")
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def for_donation(cls, donation, actor=None):
+        """Build an unsaved event for ``donation``'s current status, for bulk_create."""
+        return cls(donation=donation, status=donation.status, actor=actor)
+
+    @classmethod
+    def timelines(cls, donation_ids):
+        """``{donation_id: [events...]}`` for many donations in one query."""
+        result = {donation_id: [] for donation_id in donation_ids}
+        events = cls.objects.filter(donation_id__in=result).order_by('donation_id', 'created_at', 'id')
+        for event in events:
+            result[event.donation_id].append(event)
+        return result
+
+
+class OutboundEmail(models.Model):
+    """Queued email, delivered off-request by ``manage.py send_queued_emails``."""
+    PENDING = 'PENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=254, blank=True, default='')
+    to = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbound_email_due_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class ReceiptRenderJob(models.Model):
+    """Queued receipt pre-render, processed by ``manage.py render_receipts``."""
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    donation = models.ForeignKey(Donation, on_delete=models.CASCADE, related_name='receipt_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When a worker claimed it; identifies that claim and bounds its lease
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    render_ms = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='receipt_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Receipt job {self.id} for donation {self.donation_id} ({self.status})"
+
+
+class MediaBlob(models.Model):
+    """One stored file, shared by every upload with the same content.
+
+    Written by ``core.storage.ContentAddressedStorage``; ``ref_count`` is the
+    number of saves still pointing at ``name``.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
@@ -0,0 +1,81 @@
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .utils.donation_search import search_page
+
+
+class DonationCursorPagination(CursorPagination):
+    """Cursor pagination on created_at, newest first.
+
+    Cursors encode the last created_at seen instead of an OFFSET, so
+    fetching page 50 costs the same index seek as page 1 and rows inserted
+    while a donor is scrolling never shift or duplicate entries between
+    pages. DRF seeks on the first ordering field only: ``id`` just breaks
+    ties so the order is stable, and rows sharing the boundary timestamp
+    are stepped over with a small offset kept in the cursor.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'DONATION_MAX_PAGE_SIZE', 100)
+
+
+class RecentDonationCursorPagination(DonationCursorPagination):
+    """Cursor pagination for the admin dashboard's "recent" feed."""
+    page_size = getattr(settings, 'ADMIN_RECENT_PAGE_SIZE', 10)
+    cursor_query_param = 'recent_cursor'
+    page_size_query_param = 'recent_page_size'
+
+
+class DonationSearchPagination(BasePagination):
+    """Page-number pagination for ranked search results.
+
+    Results are ordered by rank, which has no key to seek on, so pages use
+    OFFSET; one extra row tells whether there is a next page, which saves
+    counting every match.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    page_query_param = 'page'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'DONATION_MAX_PAGE_SIZE', 100)
+
+    def _positive(self, name, default):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except (TypeError, ValueError):
+            raise NotFound(f"Invalid {name}.")
+        if value < 1:
+            raise NotFound(f"Invalid {name}.")
+        return value
+
+    def paginate_search(self, queryset, query, request):
+        self.request = request
+        self.page = self._positive(self.page_query_param, 1)
+        size = min(self._positive(self.page_size_query_param, self.page_size), self.max_page_size)
+        rows = search_page(queryset, query, (self.page - 1) * size, size + 1)
+        self.has_next = len(rows) > size
+        return rows[:size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page + 1)
+
+    def get_previous_link(self):
+        if self.page == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page - 1)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'page': self.page,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
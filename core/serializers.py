@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 from .models import Donation, DonationImage, DonationTracking
 
 class UserSerializer(serializers.ModelSerializer):
@@ -23,9 +24,27 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 class DonationImageSerializer(serializers.ModelSerializer):
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = DonationImage
-        fields = ('id', 'image', 'uploaded_at')
+        fields = (
+            'id', 'image', 'thumbnail', 'width', 'height', 'renditions',
+            'processing_state', 'uploaded_at',
+        )
+
+    def get_renditions(self, obj):
+        request = self.context.get('request')
+        renditions = []
+        for rendition in obj.renditions:
+            url = default_storage.url(rendition['name'])
+            renditions.append({
+                'format': rendition['format'],
+                'width': rendition['width'],
+                'height': rendition['height'],
+                'url': request.build_absolute_uri(url) if request else url,
+            })
+        return renditions
 
 class DonationSerializer(serializers.ModelSerializer):
     images = DonationImageSerializer(many=True, read_only=True)
@@ -33,6 +52,7 @@ class DonationSerializer(serializers.ModelSerializer):
     location_display = serializers.SerializerMethodField()
     progress_percentage = serializers.SerializerMethodField()
     main_image = serializers.SerializerMethodField()
+    timeline = serializers.SerializerMethodField()
 
     class Meta:
         model = Donation
@@ -40,16 +60,33 @@ class DonationSerializer(serializers.ModelSerializer):
             'id', 'category', 'description', 'pickup_date', 'amount', 
             'status', 'status_display', 'receipt_number', 
             'district', 'area', 'pickup_address', 'otp_verified',
-            'created_at', 'images', 'location_display', 'progress_percentage', 'main_image'
+            'created_at', 'images', 'location_display', 'progress_percentage', 'main_image',
+            'timeline',
         )
-        read_only_fields = ('receipt_number', 'otp_verified', 'created_at')
+        # Status only changes through core/utils/status_transitions.py
+        read_only_fields = ('status', 'receipt_number', 'otp_verified', 'created_at')
 
     def get_main_image(self, obj):
-        image = obj.images.first()
+        # .all() reuses the prefetch cache; .first() would re-query per row
+        images = obj.images.all()
+        image = images[0] if images else None
+        if image and image.thumbnail:
+            return image.thumbnail.url
         if image and image.image:
             return image.image.url
         return None
 
+    def get_timeline(self, obj):
+        # Reads the with_timeline() prefetch
+        return [
+            {
+                'status': event.status,
+                'label': event.get_status_display(),
+                'at': event.created_at,
+            }
+            for event in obj.status_events.all()
+        ]
+
     def get_location_display(self, obj):
         return f"{obj.area}, {obj.district}, Kerala"
 
@@ -0,0 +1,93 @@
+"""Content-addressed media storage.
+
+Files are stored under their SHA-256 (``donations/ab/ab12...ef.jpg``), so the
+same photo uploaded twice, or the same rendition produced twice, occupies
+disk once. MediaBlob rows count the references; ``delete`` only removes the
+file when the last one is released.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def hash_file(content):
+    """SHA-256 of a Django File, read in chunks."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+def blob_name(name, digest):
+    root = name.split('/', 1)[0] if '/' in name else 'files'
+    ext = os.path.splitext(name)[1].lower()
+    return f"{root}/{digest[:2]}/{digest}{ext}"
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to a temp file, hashing them on the way through."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def __init__(self, *args, **kwargs):
+        # Names are derived from content, so an existing file is never clobbered
+        # with anything different
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(*args, **kwargs)
+
+    def _save(self, name, content):
+        from core.models import MediaBlob
+
+        digest = hash_file(content)
+        name = blob_name(name, digest)
+        try:
+            with transaction.atomic():
+                if MediaBlob.objects.filter(sha256=digest).update(ref_count=F('ref_count') + 1):
+                    name = MediaBlob.objects.values_list('name', flat=True).get(sha256=digest)
+                    if not self.exists(name):
+                        super()._save(name, content)
+                    return name
+                if not self.exists(name):
+                    name = super()._save(name, content)
+                MediaBlob.objects.create(sha256=digest, name=name, size=content.size)
+        except IntegrityError:
+            # A concurrent save of the same content won the insert
+            MediaBlob.objects.filter(sha256=digest).update(ref_count=F('ref_count') + 1)
+        return name
+
+    def delete(self, name):
+        from core.models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            if blob is not None:
+                blob.delete()
+        super().delete(name)
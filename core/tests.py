@@ -1,3 +1,1709 @@
-from django.test import TestCase
+import asyncio
+import os
+import random
+import shutil
+import smtplib
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import caches
+from django.core.mail.backends import locmem
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from xhtml2pdf import pisa
+
+from .admin import CountedChoicesFilter
+from .checks import check_donation_cache
+from .models import (
+    Donation, DonationImage, DonationStatus, DonationStatusCounter, DonationStatusEvent, DonationTracking,
+    MediaBlob,
+    OutboundEmail,
+    PickupSlot,
+    ReceiptRenderJob,
+    ReceiptSequence,
+    ReceiptSequenceExhausted,
+    generate_receipt_numbers,
+)
+from .utils import (
+    category_classifier, donation_search, image_pipeline, pickup_routing, receipt_export, receipt_jobs,
+    status_events,
+)
+from .utils.donation_stats import (
+    aggregate_status_counts, check_status_counters, get_status_counts,
+)
+from .utils.email_outbox import queue_email, send_due_emails
+from .utils.pickup_slots import assign_slots
+from .utils.receipt_pdf import (
+    prerender_receipt, prune_receipt_cache, receipt_cache_path, receipt_key,
+)
+from .utils.status_transitions import InvalidTransition, TransitionConflict, bulk_transition, transition
+
+
+def make_donations(donor, count, images_per_donation=2):
+    donations = []
+    for i in range(count):
+        donation = Donation.objects.create(
+            donor=donor,
+            category='Books',
+            description=f'Box of books #{i}',
+            pickup_date=date(2026, 3, 1),
+            district='Ernakulam',
+            area='Kakkanad',
+        )
+        for j in range(images_per_donation):
+            DonationImage.objects.create(donation=donation, image=f'donations/{i}_{j}.jpg')
+        donations.append(donation)
+    return donations
+
+
+class DonationListQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _list_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/donations/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_flat_as_donations_grow(self):
+        make_donations(self.user, 2)
+        small, _ = self._list_query_count()
+
+        make_donations(self.user, 20)
+        large, response = self._list_query_count()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_main_image_is_first_uploaded_image(self):
+        donation = make_donations(self.user, 1)[0]
+        _, response = self._list_query_count()
+        first = donation.images.order_by('uploaded_at').first()
+        self.assertEqual(response.data['results'][0]['main_image'], first.image.url)
+
+    def test_admin_recent_feed_query_count_is_flat(self):
+        admin = User.objects.create_user('agent', 'agent@example.com', 'pass12345', is_staff=True)
+        self.client.force_authenticate(admin)
+
+        def stats_query_count():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/admin/stats/')
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries), response
+
+        make_donations(self.user, 2)
+        small, _ = stats_query_count()
+        make_donations(self.user, 6)
+        large, response = stats_query_count()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['recent']), 8)
+        self.assertTrue(all(item['timeline'] for item in response.data['recent']))
+
+
+class DonationPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_cover_every_donation_once(self):
+        make_donations(self.user, 7, images_per_donation=0)
+        seen = []
+        url = '/api/donations/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(d['id'] for d in response.data['results'])
+            url = response.data['next']
+        expected = list(
+            Donation.objects.filter(donor=self.user)
+            .order_by('-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_new_donation_does_not_shift_next_page(self):
+        make_donations(self.user, 4, images_per_donation=0)
+        first = self.client.get('/api/donations/?page_size=2')
+        make_donations(self.user, 1, images_per_donation=0)
+        second = self.client.get(first.data['next'])
+        first_ids = {d['id'] for d in first.data['results']}
+        second_ids = {d['id'] for d in second.data['results']}
+        self.assertFalse(first_ids & second_ids)
+        self.assertEqual(len(second_ids), 2)
+
+    def test_admin_recent_feed_is_paginated(self):
+        admin = User.objects.create_user('agent', 'agent@example.com', 'pass12345', is_staff=True)
+        self.client.force_authenticate(admin)
+        make_donations(self.user, 12, images_per_donation=0)
+        response = self.client.get('/api/admin/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['recent']), 10)
+        self.assertIsNotNone(response.data['recent_next'])
+
+
+class StatusCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+
+    def test_counters_follow_create_transition_and_delete(self):
+        first, second = make_donations(self.user, 2, images_per_donation=0)
+        self.assertEqual(get_status_counts()[DonationStatus.SUBMITTED], 2)
+
+        first.status = DonationStatus.CONFIRMED
+        first.save()
+        reloaded = Donation.objects.get(pk=second.pk)
+        reloaded.status = DonationStatus.COMPLETED
+        reloaded.save()
+        reloaded.delete()
+
+        counts = get_status_counts()
+        self.assertEqual(counts[DonationStatus.SUBMITTED], 0)
+        self.assertEqual(counts[DonationStatus.CONFIRMED], 1)
+        self.assertEqual(counts[DonationStatus.COMPLETED], 0)
+        self.assertEqual(counts, aggregate_status_counts())
+
+    def test_aggregate_is_a_single_query(self):
+        make_donations(self.user, 3, images_per_donation=0)
+        with self.assertNumQueries(1):
+            counts = aggregate_status_counts()
+        self.assertEqual(counts[DonationStatus.SUBMITTED], 3)
+
+    def test_rebuild_repairs_drift(self):
+        make_donations(self.user, 2, images_per_donation=0)
+        DonationStatusCounter.objects.filter(status=DonationStatus.SUBMITTED).update(count=99)
+        self.assertIn(DonationStatus.SUBMITTED, check_status_counters())
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_status_counters', '--check', stdout=StringIO())
+        call_command('rebuild_status_counters', stdout=StringIO())
+        self.assertEqual(check_status_counters(), {})
+
+    @override_settings(STATUS_COUNTER_SHARDS=4)
+    def test_counter_shards_are_summed_and_rebuilt(self):
+        make_donations(self.user, 12, images_per_donation=0)
+        rows = DonationStatusCounter.objects.filter(status=DonationStatus.SUBMITTED)
+        self.assertTrue(all(0 <= row.shard < 4 for row in rows))
+        self.assertEqual(sum(row.count for row in rows), 12)
+        self.assertEqual(get_status_counts()[DonationStatus.SUBMITTED], 12)
+
+        DonationStatusCounter.objects.update_or_create(
+            status=DonationStatus.SUBMITTED, shard=3, defaults={'count': 50}
+        )
+        self.assertIn(DonationStatus.SUBMITTED, check_status_counters())
+        call_command('rebuild_status_counters', stdout=StringIO())
+        self.assertEqual(rows.get(shard=0).count, 12)
+        self.assertEqual(get_status_counts()[DonationStatus.SUBMITTED], 12)
+
+    def test_admin_stats_reads_counters(self):
+        admin = User.objects.create_user('agent', 'agent@example.com', 'pass12345', is_staff=True)
+        make_donations(self.user, 3, images_per_donation=0)
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/admin/stats/')
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['pending'], 3)
+        self.assertEqual(response.data['by_status'][DonationStatus.SUBMITTED], 3)
+
+
+class ImportDonationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+
+    def _write(self, suffix, content):
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False)
+        handle.write(content)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_csv_import_creates_receipts_tracking_and_counters(self):
+        path = self._write('.csv', (
+            "donor,category,description,pickup_date,district,status\n"
+            "donor,Books,Textbooks,2026-03-01,Ernakulam,\n"
+            "donor@example.com,Toys,Blocks,2026-03-02,Kollam,CONFIRMED\n"
+            "nobody,Toys,Blocks,2026-03-02,Kollam,\n"
+            "donor,Toys,Blocks,not-a-date,Kollam,\n"
+        ))
+        call_command('import_donations', path, '--batch-size', '2', stdout=StringIO(), stderr=StringIO())
+
+        donations = Donation.objects.filter(donor=self.user)
+        self.assertEqual(donations.count(), 2)
+        self.assertTrue(all(d.receipt_number for d in donations))
+        confirmed = donations.get(status=DonationStatus.CONFIRMED)
+        self.assertEqual(confirmed.tracking.current_status, DonationStatus.CONFIRMED)
+        self.assertEqual(list(confirmed.status_events.values_list('status', flat=True)), [DonationStatus.CONFIRMED])
+        self.assertEqual(check_status_counters(), {})
+
+    def test_jsonl_strict_mode_rejects_bad_rows(self):
+        path = self._write('.jsonl', (
+            '{"donor": "donor", "category": "Books", "description": "Novels", "pickup_date": "2026-03-01"}\n'
+            '{"donor": "donor", "category": "Books", "description": "Novels", "pickup_date": "2026-03-01", '
+            '"district": "Atlantis"}\n'
+        ))
+        with self.assertRaises(CommandError):
+            call_command('import_donations', path, '--strict', stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(Donation.objects.exists())
+
+    def test_malformed_jsonl_lines_are_row_errors(self):
+        path = self._write('.jsonl', (
+            '{"donor": "donor", "category": "Books", "description": "Novels", "pickup_date": "2026-03-01"}\n'
+            '\n'
+            '{"donor": "donor", "category": \n'
+            '["not", "an", "object"]\n'
+            '{"donor": 5, "category": "Books", "description": "Novels", "pickup_date": "2026-03-01"}\n'
+            '{"donor": "donor", "category": "Books", "description": "Novels", "pickup_date": "2026-03-01", '
+            '"amount": "NaN"}\n'
+            '{"donor": "donor", "category": "Books", "description": "Maps", "pickup_date": "2026-03-02", '
+            '"amount": 12.5}\n'
+            '{"donor": "donor", "category": "Books", "description": "Atlas", "pickup_date": "2026-03-03", '
+            '"amount": 123456789}\n'
+            '{"donor": "donor", "category": "Books", "description": "Globe", "pickup_date": "2026-03-03", '
+            '"amount": "1e40"}\n'
+        ))
+        stderr = StringIO()
+        call_command('import_donations', path, stdout=StringIO(), stderr=stderr)
+
+        self.assertEqual(
+            sorted(Donation.objects.values_list('description', flat=True)), ['Maps', 'Novels']
+        )
+        errors = stderr.getvalue().splitlines()
+        self.assertEqual(
+            [line.split(':')[0] for line in errors], ['Row 3', 'Row 4', 'Row 5', 'Row 6', 'Row 8', 'Row 9']
+        )
+        self.assertIn("invalid JSON", errors[0])
+        self.assertIn("expected an object", errors[1])
+        self.assertIn("donor must be a string", errors[2])
+        self.assertIn("invalid amount 'NaN'", errors[3])
+        self.assertIn("amount 123456789 is too large", errors[4])
+        self.assertIn("amount '1e40' is too large", errors[5])
+        self.assertEqual(Donation.objects.get(description='Maps').amount, Decimal('12.50'))
+
+    def test_scheduled_rows_are_rejected(self):
+        path = self._write('.csv', (
+            "donor,category,description,pickup_date,district,status\n"
+            "donor,Books,Textbooks,2026-03-01,Ernakulam,PICKUP_SCHEDULED\n"
+        ))
+        stderr = StringIO()
+        call_command('import_donations', path, stdout=StringIO(), stderr=stderr)
+        self.assertFalse(Donation.objects.exists())
+        self.assertIn("cannot import as PICKUP_SCHEDULED", stderr.getvalue())
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPException("connection refused")
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError(111, "Connection refused")
+
+    def send_messages(self, email_messages):
+        raise AssertionError("send_messages called without a connection")
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_donation_post_only_enqueues(self):
+        response = self.client.post('/api/donations/', {
+            'category': 'Books',
+            'description': 'Old textbooks',
+            'pickup_date': '2026-03-01',
+            'district': 'Ernakulam',
+            'area': 'Kakkanad',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().to, ['donor@example.com'])
+
+        call_command('send_queued_emails', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "Donation Received - DonateHub")
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.SENT)
+
+    def test_html_alternative_is_kept(self):
+        queue_email("Hi", "plain", ['a@example.com'], html_message="<p>html</p>")
+        send_due_emails()
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>html</p>")
+
+    @override_settings(
+        EMAIL_BACKEND='core.tests.FailingEmailBackend',
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    )
+    def test_failures_back_off_then_give_up(self):
+        email = queue_email("Hi", "body", ['a@example.com'])
+        self.assertEqual(send_due_emails(), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # Not due yet, so nothing is claimed
+        self.assertEqual(send_due_emails(), (0, 0))
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        send_due_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    @override_settings(EMAIL_BACKEND='core.tests.UnreachableEmailBackend')
+    def test_connection_failure_counts_as_an_attempt_for_the_batch(self):
+        emails = [queue_email("Hi", "body", [f'{name}@example.com']) for name in 'ab']
+        self.assertEqual(send_due_emails(), (2, 0))
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboundEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertIn("Connection refused", email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+        call_command('send_queued_emails', '--once', stdout=StringIO())
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingEmailBackend.instances += 1
+
+
+@override_settings(EMAIL_BACKEND='core.tests.CountingEmailBackend')
+class SendOTPActionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(self.admin)
+        CountingEmailBackend.instances = 0
+
+    def test_action_sends_over_one_connection(self):
+        donors = [User.objects.create_user(f'donor{i}', f'donor{i}@example.com', 'pass12345') for i in range(3)]
+        no_email = User.objects.create_user('noemail', '', 'pass12345')
+        donations = [make_donations(donor, 1, images_per_donation=0)[0] for donor in donors + [no_email]]
+
+        with mock.patch('core.utils.donation_cache.invalidate_donations') as invalidate:
+            response = self.client.post('/admin/core/donation/', {
+                'action': 'send_otp_action',
+                '_selected_action': [d.pk for d in donations],
+            }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        invalidate.assert_called_once()
+        self.assertEqual(sorted(invalidate.call_args.args[0]), sorted(d.pk for d in donations))
+
+        self.assertEqual(CountingEmailBackend.instances, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        for donation in donations:
+            donation.refresh_from_db()
+            self.assertEqual(len(donation.otp), 6)
+            self.assertFalse(donation.otp_verified)
+        self.assertIn(donations[0].otp, mail.outbox[0].body + mail.outbox[1].body + mail.outbox[2].body)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.SENT).count(), 3)
+
+    @override_settings(EMAIL_BACKEND='core.tests.UnreachableEmailBackend')
+    def test_unreachable_server_queues_otps_for_retry(self):
+        donation = make_donations(self.admin, 1, images_per_donation=0)[0]
+        response = self.client.post('/admin/core/donation/', {
+            'action': 'send_otp_action',
+            '_selected_action': [donation.pk],
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "queued for retry")
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.PENDING, 1))
+
+
+class ReceiptCacheTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        override = override_settings(RECEIPT_CACHE_DIR=cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.donation = make_donations(self.user, 1, images_per_donation=0)[0]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/receipt/{self.donation.id}/pdf/'
+
+    def _get(self, **headers):
+        with mock.patch('core.utils.receipt_pdf.pisa.CreatePDF', wraps=pisa.CreatePDF) as create:
+            response = self.client.get(self.url, **headers)
+        return response, create.call_count
+
+    def test_repeat_download_reuses_rendered_pdf(self):
+        first, renders = self._get()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(renders, 1)
+        body = b''.join(first.streaming_content)
+        self.assertTrue(body.startswith(b'%PDF'))
+
+        second, renders = self._get()
+        self.assertEqual(renders, 0)
+        self.assertEqual(b''.join(second.streaming_content), body)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        first, _ = self._get()
+        second, renders = self._get(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(renders, 0)
+
+    def test_status_change_renders_a_new_receipt(self):
+        first, _ = self._get()
+        self.donation.status = DonationStatus.CONFIRMED
+        self.donation.save()
+        second, renders = self._get(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(renders, 1)
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_prune_removes_unused_entries(self):
+        self._get()
+        self.assertEqual(prune_receipt_cache(max_age=3600), 0)
+        self.assertEqual(prune_receipt_cache(max_age=-1), 1)
+
+    def test_html_receipt_view_is_cached_too(self):
+        self.client.force_login(self.user)
+        url = f'/receipt/{self.donation.id}/pdf/'
+        first = self.client.get(url)
+        self.assertEqual(first['Content-Type'], 'application/pdf')
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+
+class ReceiptPrerenderTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        override = override_settings(RECEIPT_CACHE_DIR=cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.donation = make_donations(self.admin, 1, images_per_donation=0)[0]
+
+    def test_status_update_enqueues_and_worker_prerenders(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        transition(self.donation, DonationStatus.IN_TRANSIT, actor=self.admin)
+        self.assertFalse(ReceiptRenderJob.objects.exists())
+        Donation.objects.filter(pk=self.donation.pk).update(otp='123456', otp_created_at=timezone.now())
+        response = client.post(f'/api/donations/{self.donation.id}/verify-otp/', {'otp': '123456'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ReceiptRenderJob.objects.filter(status=ReceiptRenderJob.PENDING).count(), 1)
+
+        call_command('render_receipts', '--once', '--processes', '0', stdout=StringIO())
+
+        job = ReceiptRenderJob.objects.get()
+        self.assertEqual(job.status, ReceiptRenderJob.DONE)
+        self.assertIsNotNone(job.render_ms)
+        self.donation.refresh_from_db()
+        self.assertTrue(receipt_cache_path(receipt_key(self.donation)).exists())
+
+        metrics = client.get('/api/admin/receipt-queue/').data
+        self.assertEqual(metrics['pending'], 0)
+        self.assertEqual(metrics['render_ms_avg'], job.render_ms)
+
+    def test_only_expired_claims_are_requeued_and_taken_over(self):
+        ReceiptRenderJob.objects.create(donation=self.donation)
+        first_claim, ids = receipt_jobs.claim_jobs(10)
+        self.assertEqual(receipt_jobs.requeue_stale_jobs(), 0)
+
+        later = timezone.now() + timedelta(seconds=301)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(receipt_jobs.requeue_stale_jobs(), 1)
+            second_claim, second_ids = receipt_jobs.claim_jobs(10)
+        self.assertEqual(second_ids, ids)
+
+        self.assertEqual(receipt_jobs.record_results([(ids[0], True, 12, '')], second_claim), 1)
+        self.assertEqual(receipt_jobs.record_results([(ids[0], False, 40, 'late failure')], first_claim), 0)
+        job = ReceiptRenderJob.objects.get()
+        self.assertEqual((job.status, job.render_ms, job.error), (ReceiptRenderJob.DONE, 12, ''))
+
+
+@override_settings(RECEIPT_EXPORT_PROCESSES=0)
+class ReceiptExportTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        override = override_settings(RECEIPT_CACHE_DIR=cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_zip_contains_every_receipt_in_range(self):
+        donations = make_donations(self.user, 3, images_per_donation=0)
+        other = User.objects.create_user('other', 'other@example.com', 'pass12345')
+        make_donations(other, 1, images_per_donation=0)
+        # One receipt already cached, the rest rendered during the export
+        prerender_receipt(donations[0])
+
+        today = timezone.localdate().isoformat()
+        response = self.client.get(f'/api/receipts/export/?from={today}&to={today}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(
+            sorted(archive.namelist()),
+            sorted(f"receipt_{d.receipt_number}.pdf" for d in donations),
+        )
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b'%PDF'))
+
+    def test_empty_range_is_404(self):
+        make_donations(self.user, 1, images_per_donation=0)
+        response = self.client.get('/api/receipts/export/?from=2001-01-01&to=2001-12-31')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/api/receipts/export/?from=01/01/2001').status_code, 400)
+
+
+def render_unless_marked(context):
+    """Pool worker stand-in: fails for donations described as failing."""
+    if context['description'].startswith('fail'):
+        raise RuntimeError("worker render failed")
+    return receipt_export._render_in_worker(context)
+
+
+@override_settings(RECEIPT_EXPORT_PROCESSES=1)
+class ReceiptExportPoolTests(TestCase):
+    """Runs the real spawn pool; workers re-import manage.py, whose main() is __main__-guarded."""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        override = override_settings(RECEIPT_CACHE_DIR=cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(self._shutdown_pool)
+
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _shutdown_pool(self):
+        if receipt_export._pool is not None:
+            receipt_export._discard_pool(receipt_export._pool)
+
+    def test_failed_worker_renders_fall_back_and_archive_stays_valid(self):
+        donations = make_donations(self.user, 4, images_per_donation=0)
+        Donation.objects.filter(pk=donations[1].pk).update(description='fail in worker')
+        Donation.objects.filter(pk=donations[2].pk).update(description='fail everywhere')
+        render = receipt_export.render_pdf_bytes
+
+        def render_inline(template, context):
+            if context['description'] == 'fail everywhere':
+                raise RuntimeError("inline render failed")
+            return render(template, context)
+
+        today = timezone.localdate().isoformat()
+        with mock.patch.object(receipt_export, '_render_in_worker', render_unless_marked), \
+                mock.patch.object(receipt_export, 'render_pdf_bytes', render_inline), \
+                self.assertLogs('core.utils.receipt_export', 'WARNING') as logs:
+            response = self.client.get(f'/api/receipts/export/?from={today}&to={today}')
+            content = b''.join(response.streaming_content)
+
+        archive = zipfile.ZipFile(BytesIO(content))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            sorted(archive.namelist()),
+            sorted(f"receipt_{d.receipt_number}.pdf" for d in donations if d is not donations[2]),
+        )
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b'%PDF'))
+        # Only the two marked receipts fell back; the others came from the worker
+        fallbacks = [line for line in logs.output if "Pool render" in line]
+        self.assertEqual(len(fallbacks), 2)
+        self.assertTrue(all("BrokenProcessPool" not in line for line in fallbacks))
+        self.assertTrue(any(f"donation {donations[2].id} could not be rendered" in line for line in logs.output))
+
+
+class FakeCategoryClient:
+    """Stand-in for the remote model: answers after ``delay`` and counts calls."""
+    answer = 'Toys'
+    delay = 0
+    calls = []
+
+    async def classify(self, description):
+        FakeCategoryClient.calls.append(description)
+        await asyncio.sleep(self.delay)
+        return self.answer
+
+
+@override_settings(CATEGORY_REMOTE_CLIENT='core.tests.FakeCategoryClient', CATEGORY_REMOTE_TIMEOUT=1.0)
+class CategoryClassifierTests(TestCase):
+    def setUp(self):
+        model_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, model_dir, ignore_errors=True)
+        override = override_settings(CATEGORY_MODEL_PATH=os.path.join(model_dir, 'model.json'))
+        override.enable()
+        self.addCleanup(override.disable)
+        category_classifier.reset()
+        self.addCleanup(category_classifier.reset)
+        FakeCategoryClient.calls = []
+        FakeCategoryClient.delay = 0
+
+    def test_confident_local_answer_skips_remote(self):
+        response = self.client.get('/api/ai-category/', {'description': 'Two boxes of old Books!'})
+        self.assertEqual(response.json(), {"category": "Books"})
+        self.assertEqual(FakeCategoryClient.calls, [])
+
+    def test_low_confidence_escalates_once_per_normalized_text(self):
+        first = self.client.get('/api/ai-category/', {'description': 'Assorted Xylophones'})
+        second = self.client.get('/api/ai-category/', {'description': '  assorted   xylophones. '})
+        self.assertEqual(first.json(), {"category": "Toys"})
+        self.assertEqual(second.json(), {"category": "Toys"})
+        self.assertEqual(FakeCategoryClient.calls, ['assorted xylophones'])
+
+    async def test_concurrent_identical_requests_share_one_remote_call(self):
+        FakeCategoryClient.delay = 0.05
+        responses = await asyncio.gather(*[
+            self.async_client.get('/api/ai-category/', {'description': 'assorted xylophones'})
+            for _ in range(5)
+        ])
+        self.assertEqual([r.json()["category"] for r in responses], ['Toys'] * 5)
+        self.assertEqual(FakeCategoryClient.calls, ['assorted xylophones'])
+
+    @override_settings(CATEGORY_REMOTE_TIMEOUT=0.05)
+    async def test_slow_remote_falls_back_to_local_answer(self):
+        FakeCategoryClient.delay = 5
+        started = time.perf_counter()
+        response = await self.async_client.get('/api/ai-category/', {'description': 'assorted xylophones'})
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(response.json(), {"category": category_classifier.DEFAULT_CATEGORY})
+
+    @override_settings(CATEGORY_REMOTE_CONCURRENCY=2)
+    async def test_remote_calls_are_bounded(self):
+        FakeCategoryClient.delay = 0.05
+        active = peak = 0
+        classify = FakeCategoryClient.classify
+
+        async def tracking(client, description):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                return await classify(client, description)
+            finally:
+                active -= 1
+
+        with mock.patch.object(FakeCategoryClient, 'classify', tracking):
+            await asyncio.gather(*[
+                category_classifier.suggest_category(f'assorted xylophones {n}') for n in range(6)
+            ])
+        self.assertEqual(peak, 2)
+        self.assertEqual(len(FakeCategoryClient.calls), 6)
+
+    @override_settings(CATEGORY_REMOTE_CONCURRENCY=2)
+    def test_limits_span_event_loops(self):
+        # Under WSGI every request classifies on its own thread and event loop
+        FakeCategoryClient.delay = 0.1
+        lock = threading.Lock()
+        active = peak = 0
+        classify = FakeCategoryClient.classify
+
+        async def tracking(client, description):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                return await classify(client, description)
+            finally:
+                with lock:
+                    active -= 1
+
+        def run_requests(descriptions):
+            threads = [
+                threading.Thread(target=asyncio.run, args=(category_classifier.remote_category(d),))
+                for d in descriptions
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        with mock.patch.object(FakeCategoryClient, 'classify', tracking):
+            run_requests(['assorted xylophones'] * 5)
+            self.assertEqual(FakeCategoryClient.calls, ['assorted xylophones'])
+
+            FakeCategoryClient.calls = []
+            run_requests([f'assorted xylophones {n}' for n in range(6)])
+        self.assertEqual(peak, 2)
+        self.assertEqual(len(FakeCategoryClient.calls), 6)
+
+    def test_training_learns_from_donations(self):
+        user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        for _ in range(5):
+            Donation.objects.create(
+                donor=user, category='Toys', description='xylophone for kids', pickup_date=date(2026, 3, 1),
+            )
+        call_command('train_category_classifier', stdout=StringIO())
+
+        category, confidence = category_classifier.get_model().predict('xylophone')
+        self.assertEqual(category, 'Toys')
+        self.assertGreaterEqual(confidence, 0.6)
+
+
+@override_settings(MAX_IMAGE_WIDTH=800, MAX_IMAGE_HEIGHT=800, IMAGE_RENDITION_WIDTHS=[320, 640])
+class ImageIngestionTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        # process_images needs a donation cache other processes can see
+        shared_cache = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(media, 'cache'),
+        }
+        override = override_settings(MEDIA_ROOT=media, CACHES={**settings.CACHES, 'donations': shared_cache})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _photo(self, size=(2000, 1000), name='photo.jpg'):
+        exif = Image.Exif()
+        exif[0x010F] = 'PhoneMaker'
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 30, 30)).save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def _post(self, *images):
+        return self.client.post('/api/donations/', {
+            'category': 'Books', 'description': 'Old books', 'pickup_date': '2026-03-01',
+            'district': 'Ernakulam', 'area': 'Kakkanad', 'images': list(images),
+        }, format='multipart')
+
+    def _process(self):
+        call_command('process_images', '--once', '--processes=0', stdout=StringIO())
+
+    def test_upload_is_acknowledged_before_processing(self):
+        response = self._post(self._photo())
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['images'][0]['processing_state'], DonationImage.PENDING)
+        self.assertEqual(DonationImage.objects.get().renditions, [])
+
+    def test_upload_is_bounded_stripped_and_thumbnailed(self):
+        response = self._post(self._photo())
+        self.assertEqual(response.status_code, 201, response.data)
+        raw = DonationImage.objects.get().image.path
+        self._process()
+
+        image = DonationImage.objects.get()
+        self.assertEqual(image.processing_state, DonationImage.READY)
+        self.assertFalse(os.path.exists(raw))
+        self.assertEqual((image.width, image.height), (800, 400))
+        with Image.open(image.image.path) as stored:
+            self.assertEqual(stored.size, (800, 400))
+            self.assertEqual(dict(stored.getexif()), {})
+        with Image.open(image.thumbnail.path) as thumb:
+            self.assertLessEqual(max(thumb.size), 240)
+        self.assertEqual(
+            sorted((r['format'], r['width'], r['height']) for r in image.renditions),
+            [('jpeg', 320, 160), ('jpeg', 640, 320), ('webp', 320, 160), ('webp', 640, 320)],
+        )
+        detail = self.client.get(f'/api/donations/{image.donation_id}/')
+        self.assertEqual(detail.data['main_image'], image.thumbnail.url)
+        self.assertEqual(detail.data['images'][0]['processing_state'], DonationImage.READY)
+
+    @override_settings(MAX_IMAGE_UPLOAD_SIZE=1024)
+    def test_oversized_upload_is_rejected_before_saving(self):
+        response = self._post(self._photo())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('images', response.data)
+        self.assertFalse(Donation.objects.exists())
+
+    def test_corrupt_upload_rolls_back_the_donation(self):
+        bogus = SimpleUploadedFile('photo.jpg', b'not an image', content_type='image/jpeg')
+        response = self._post(bogus)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Donation.objects.exists())
+
+    def test_undecodable_image_is_marked_failed(self):
+        photo = self._photo()
+        truncated = SimpleUploadedFile('photo.jpg', photo.read()[:2000], content_type='image/jpeg')
+        self.assertEqual(self._post(truncated).status_code, 201)
+        self._process()
+
+        image = DonationImage.objects.get()
+        self.assertEqual(image.processing_state, DonationImage.FAILED)
+        self.assertTrue(image.processing_error)
+
+    def test_expired_claim_cannot_overwrite_the_takeover(self):
+        self.assertEqual(self._post(self._photo()).status_code, 201)
+        first_claim, ids = image_pipeline.claim_images(10)
+        # A second worker starting up leaves a live claim alone
+        self.assertEqual(image_pipeline.requeue_stale_images(), 0)
+
+        later = timezone.now() + timedelta(seconds=601)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(image_pipeline.requeue_stale_images(), 1)
+            second_claim, second_ids = image_pipeline.claim_images(10)
+        self.assertEqual(second_ids, ids)
+
+        slow = [image_pipeline.process_image(image_id) for image_id in ids]
+        fast = [image_pipeline.process_image(image_id) for image_id in ids]
+        self.assertEqual(image_pipeline.record_image_results(fast, second_claim), set(ids))
+        with self.assertLogs('core.utils.image_pipeline', 'WARNING'):
+            self.assertEqual(image_pipeline.record_image_results(slow, first_claim), set())
+
+        image = DonationImage.objects.get()
+        self.assertEqual(image.processing_state, DonationImage.READY)
+        self.assertEqual(image.image.name, fast[0][4]['image'])
+        self.assertTrue(all(os.path.exists(os.path.join(settings.MEDIA_ROOT, name)) for name in image.file_names()))
+
+
+class MediaDedupTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+
+    def _jpeg(self, color=(10, 120, 200)):
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), color).save(buffer, 'JPEG')
+        return buffer.getvalue()
+
+    def test_identical_uploads_share_one_reference_counted_blob(self):
+        donations = make_donations(self.user, 2, images_per_donation=0)
+        data = self._jpeg()
+        images = [
+            DonationImage.objects.create(donation=d, image=SimpleUploadedFile('a.jpg', data)) for d in donations
+        ]
+        self.assertEqual(images[0].image.name, images[1].image.name)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+
+        path = images[0].image.path
+        with self.captureOnCommitCallbacks(execute=True):
+            donations[0].delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            donations[1].delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_dedupe_media_collapses_existing_copies(self):
+        data, other = self._jpeg(), self._jpeg((250, 0, 0))
+        folder = os.path.join(self.media, 'donations', '2025', '01', '01')
+        os.makedirs(folder)
+        for name, content in [('2141.jpg', data), ('2141_CSqBNUw.jpg', data), ('2141_Dgh.jpg', data), ('x.jpg', other)]:
+            with open(os.path.join(folder, name), 'wb') as handle:
+                handle.write(content)
+        donations = make_donations(self.user, 2, images_per_donation=0)
+        DonationImage.objects.create(donation=donations[0], image='donations/2025/01/01/2141.jpg')
+        DonationImage.objects.create(donation=donations[1], image='donations/2025/01/01/2141_CSqBNUw.jpg')
+
+        out = StringIO()
+        call_command('dedupe_media', stdout=out)
+
+        names = set(DonationImage.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        blob = MediaBlob.objects.get()
+        self.assertEqual(names, {blob.name})
+        self.assertEqual(blob.ref_count, 2)
+        self.assertTrue(os.path.exists(os.path.join(self.media, blob.name)))
+        self.assertEqual(sorted(os.listdir(folder)), ['x.jpg'])
+        self.assertIn(f"reclaimed {2 * len(data)} bytes", out.getvalue())
+
+
+class DonationDetailCacheTests(TestCase):
+    def setUp(self):
+        caches['donations'].clear()
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.donation = make_donations(self.user, 1, images_per_donation=1)[0]
+        self.url = f'/api/donations/{self.donation.id}/'
+
+    def test_repeat_and_conditional_polls_skip_the_database(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url)
+        self.assertEqual(again.data, first.data)
+
+        with self.assertNumQueries(0):
+            unchanged = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(unchanged.status_code, 304)
+
+    def test_writes_invalidate_the_cached_payload(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.donation.status = DonationStatus.CONFIRMED
+        self.donation.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], DonationStatus.CONFIRMED)
+
+        etag = response['ETag']
+        DonationImage.objects.create(donation=self.donation, image='donations/extra.jpg')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(response.data['images']), 2)
+
+        etag = response['ETag']
+        DonationTracking.objects.create(donation=self.donation)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_version_tokens_expire(self):
+        cache = caches['donations']
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add, \
+                mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            self.client.get(f'/api/donations/{self.donation.id + 1000}/')
+            self.donation.save()
+        self.assertEqual(add.call_args.args[2], 300)
+        self.assertTrue(all(call.args[1] == 300 for call in set_many.call_args_list))
+
+    def test_worker_refuses_a_process_local_cache(self):
+        with self.assertRaisesMessage(CommandError, "local to this process"):
+            call_command('process_images', '--once', '--processes=0', stdout=StringIO())
+        self.assertEqual([e.id for e in check_donation_cache(None)], ['core.E001'])
+
+    def test_cached_payload_is_not_served_to_other_users(self):
+        self.client.get(self.url)
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other', 'other@example.com', 'pass12345'))
+        self.assertEqual(other.get(self.url).status_code, 404)
+
+
+class StatusEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.donation = make_donations(self.user, 1, images_per_donation=0)[0]
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def _advance(self, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.donation.status = status
+            self.donation.save()
+
+    async def _next(self, chunks):
+        return (await asyncio.wait_for(anext(chunks), 2)).decode()
+
+    async def test_stream_pushes_current_status_then_transitions(self):
+        response = await self.async_client.get(
+            f'/api/donations/{self.donation.id}/events/', {'token': self.token},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await self._next(chunks)).startswith('retry:'))
+        self.assertIn('"status":"SUBMITTED"', await self._next(chunks))
+
+        await sync_to_async(self._advance)(DonationStatus.CONFIRMED)
+        frame = await self._next(chunks)
+        self.assertIn('event: status', frame)
+        self.assertIn('"status":"CONFIRMED","status_display":"Confirmed","previous":"SUBMITTED"', frame)
+
+        response.close()
+        self.assertEqual(status_events.broker.subscriber_count(), 0)
+
+    async def test_user_stream_fans_out_every_donation(self):
+        other = await sync_to_async(make_donations)(self.user, 1, images_per_donation=0)
+        response = await self.async_client.get('/api/donations/events/', {'token': self.token})
+        chunks = aiter(response.streaming_content)
+        await self._next(chunks)
+
+        await sync_to_async(self._advance)(DonationStatus.CONFIRMED)
+        self.assertIn(f'"donation_id":{self.donation.id}', await self._next(chunks))
+        response.close()
+        self.assertEqual(len(other), 1)
+
+    async def test_stream_requires_owner(self):
+        self.assertEqual((await self.async_client.get(f'/api/donations/{self.donation.id}/events/')).status_code, 401)
+        stranger = await sync_to_async(User.objects.create_user)('other', 'other@example.com', 'pass12345')
+        token = str(RefreshToken.for_user(stranger).access_token)
+        response = await self.async_client.get(f'/api/donations/{self.donation.id}/events/', {'token': token})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(status_events.broker.subscriber_count(), 0)
+
+    def test_wsgi_requests_are_refused(self):
+        response = self.client.get(f'/api/donations/{self.donation.id}/events/', {'token': self.token})
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.streaming)
+        self.assertEqual(self.client.get('/api/donations/events/', {'token': self.token}).status_code, 503)
+        self.assertEqual(status_events.broker.subscriber_count(), 0)
+
+    async def test_slow_subscriber_keeps_only_the_latest_frames(self):
+        subscription = status_events.broker.subscribe([status_events.donation_key(1)])
+        try:
+            for n in range(20):
+                subscription.offer(str(n).encode())
+            self.assertEqual(subscription.queue.qsize(), 8)
+            self.assertEqual(await subscription.get(1), b'12')
+        finally:
+            status_events.broker.unsubscribe(subscription)
+
+
+class StatusEventLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_every_transition_is_logged_including_repeats(self):
+        donation = make_donations(self.user, 1, images_per_donation=0)[0]
+        for status in (DonationStatus.CONFIRMED, DonationStatus.PICKUP_SCHEDULED,
+                       DonationStatus.CONFIRMED, DonationStatus.PICKUP_SCHEDULED, DonationStatus.CANCELLED):
+            donation.status = status
+            donation.status_actor = self.user
+            donation.save()
+        donation.save()  # no transition, no event
+
+        events = list(donation.status_events.all())
+        self.assertEqual([e.status for e in events], [
+            DonationStatus.SUBMITTED, DonationStatus.CONFIRMED, DonationStatus.PICKUP_SCHEDULED,
+            DonationStatus.CONFIRMED, DonationStatus.PICKUP_SCHEDULED, DonationStatus.CANCELLED,
+        ])
+        self.assertEqual(events[-1].actor, self.user)
+        with self.assertRaises(ValueError):
+            events[0].save()
+
+    def test_timelines_for_a_page_in_one_query(self):
+        donations = make_donations(self.user, 5, images_per_donation=0)
+        donations[0].status = DonationStatus.CONFIRMED
+        donations[0].save()
+
+        with self.assertNumQueries(1):
+            timelines = DonationStatusEvent.timelines([d.id for d in donations])
+        self.assertEqual(len(timelines[donations[0].id]), 2)
+        self.assertEqual(len(timelines[donations[4].id]), 1)
+
+        response = self.client.get('/api/donations/')
+        first = next(d for d in response.data['results'] if d['id'] == donations[0].id)
+        self.assertEqual([step['status'] for step in first['timeline']],
+                         [DonationStatus.SUBMITTED, DonationStatus.CONFIRMED])
+
+
+class StatusTransitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.agent = User.objects.create_user('agent', 'agent@example.com', 'pass12345', is_staff=True)
+        self.donation = make_donations(self.user, 1, images_per_donation=0)[0]
+
+    def test_transition_writes_status_tracking_and_event(self):
+        transition(self.donation, DonationStatus.CONFIRMED, actor=self.agent)
+
+        self.donation.refresh_from_db()
+        self.assertEqual(self.donation.status, DonationStatus.CONFIRMED)
+        self.assertEqual(DonationTracking.objects.get(donation=self.donation).current_status, DonationStatus.CONFIRMED)
+        self.assertEqual(self.donation.status_events.last().actor, self.agent)
+        self.assertEqual(get_status_counts()[DonationStatus.CONFIRMED], 1)
+
+    def test_illegal_transitions_are_rejected(self):
+        with self.assertRaises(InvalidTransition):
+            transition(self.donation, DonationStatus.SUBMITTED)
+        transition(self.donation, DonationStatus.CANCELLED)
+        with self.assertRaises(InvalidTransition):
+            transition(self.donation, DonationStatus.CONFIRMED)
+        self.assertEqual(Donation.objects.get(pk=self.donation.pk).status, DonationStatus.CANCELLED)
+
+    def test_stale_expected_status_conflicts(self):
+        transition(self.donation, DonationStatus.CONFIRMED)
+        with self.assertRaises(TransitionConflict):
+            transition(self.donation, DonationStatus.CANCELLED, expected=DonationStatus.SUBMITTED)
+        self.assertEqual(Donation.objects.get(pk=self.donation.pk).status, DonationStatus.CONFIRMED)
+        self.assertEqual(self.donation.status_events.count(), 2)
+
+    def test_api_cannot_create_past_submitted(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/donations/', {
+            'category': 'Books', 'description': 'Old books', 'pickup_date': '2026-03-01',
+            'district': 'Ernakulam', 'status': DonationStatus.COMPLETED,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], DonationStatus.SUBMITTED)
+        self.assertEqual(Donation.objects.get(pk=response.data['id']).status, DonationStatus.SUBMITTED)
+        self.assertEqual(check_status_counters(), {})
+
+    def test_send_otp_leaves_a_newer_status_alone(self):
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        stale = Donation.objects.get(pk=self.donation.pk)
+        transition(self.donation, DonationStatus.CONFIRMED)
+
+        with mock.patch('core.api_otp_auth.get_object_or_404', return_value=stale):
+            response = client.post(f'/api/donations/{self.donation.id}/send-otp/')
+        self.assertEqual(response.status_code, 200)
+        donation = Donation.objects.get(pk=self.donation.pk)
+        self.assertEqual(donation.status, DonationStatus.CONFIRMED)
+        self.assertEqual(len(donation.otp), 6)
+        self.assertEqual(check_status_counters(), {})
+
+    def test_known_status_skips_the_read(self):
+        with CaptureQueriesContext(connection) as ctx:
+            transition(self.donation, DonationStatus.CONFIRMED, expected=DonationStatus.SUBMITTED)
+        statements = [q['sql'] for q in ctx.captured_queries]
+        self.assertFalse([sql for sql in statements if sql.startswith('SELECT') and 'core_donation"' in sql])
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "core_donation"')]), 1)
+
+    # One shard and a warm-up, so the counter rows already exist
+    @override_settings(STATUS_COUNTER_SHARDS=1)
+    def test_statements_per_transition(self):
+        warm_up = make_donations(self.user, 1, images_per_donation=0)[0]
+        transition(warm_up, DonationStatus.CONFIRMED, expected=DonationStatus.SUBMITTED)
+
+        with CaptureQueriesContext(connection) as ctx:
+            transition(self.donation, DonationStatus.CONFIRMED, expected=DonationStatus.SUBMITTED)
+        statements = [
+            q['sql'] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))
+        ]
+        # The compare-and-set and the tracking upsert, then the event log and
+        # the two counter increments; CONFIRMED queues no receipt render
+        self.assertEqual(len(statements), 5)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "core_donation" ')]), 1)
+        self.assertEqual(len([sql for sql in statements if '"core_donationtracking"' in sql]), 1)
+
+    def test_admin_rejects_illegal_status_before_saving(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(admin)
+        transition(self.donation, DonationStatus.CANCELLED)
+
+        response = self.client.post('/admin/core/donation/', {
+            'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '1',
+            'form-0-id': self.donation.pk,
+            'form-0-status': DonationStatus.CONFIRMED,
+            'form-0-district': 'Kollam',
+            '_save': 'Save',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Cannot change status from Cancelled to Confirmed.")
+        donation = Donation.objects.get(pk=self.donation.pk)
+        self.assertEqual((donation.status, donation.district), (DonationStatus.CANCELLED, self.donation.district))
+
+    def test_verify_otp_moves_to_delivered_once(self):
+        Donation.objects.filter(pk=self.donation.pk).update(
+            status=DonationStatus.PICKED_UP, otp='123456', otp_created_at=timezone.now(),
+        )
+        client = APIClient()
+        client.force_authenticate(self.agent)
+
+        response = client.post(f'/api/donations/{self.donation.id}/verify-otp/', {'otp': '123456'})
+        self.assertEqual(response.status_code, 200)
+        donation = Donation.objects.get(pk=self.donation.pk)
+        self.assertEqual(donation.status, DonationStatus.DELIVERED)
+        self.assertTrue(donation.otp_verified)
+
+        response = client.post(f'/api/donations/{self.donation.id}/verify-otp/', {'otp': '123456'})
+        self.assertEqual(response.status_code, 409)
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.donor = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.agent = User.objects.create_user('agent', 'agent@example.com', 'pass12345', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+
+    def test_endpoint_reports_per_id_results(self):
+        donations = make_donations(self.donor, 3, images_per_donation=0)
+        transition(donations[2], DonationStatus.CANCELLED)
+        ids = [donations[0].id, donations[1].id, donations[2].id, 999999]
+
+        response = self.client.post('/api/donations/bulk-status/', {
+            'ids': ids, 'status': DonationStatus.CONFIRMED,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['updated'], response.data['failed']), (2, 2))
+        self.assertEqual([r['id'] for r in response.data['results']], ids)
+        self.assertEqual([r['ok'] for r in response.data['results']], [True, True, False, False])
+        self.assertEqual(response.data['results'][3]['error'], "Donation not found.")
+
+        self.assertEqual(Donation.objects.filter(status=DonationStatus.CONFIRMED).count(), 2)
+        self.assertEqual(DonationTracking.objects.filter(current_status=DonationStatus.CONFIRMED).count(), 2)
+        self.assertEqual(donations[0].status_events.last().actor, self.agent)
+        # Confirmed and cancelled receipts render on demand, not ahead
+        self.assertFalse(ReceiptRenderJob.objects.exists())
+        self.assertEqual(check_status_counters(), {})
+
+    # One shard, so both runs below hit the counter row created by the warm-up
+    @override_settings(STATUS_COUNTER_SHARDS=1)
+    def test_query_count_does_not_grow_with_rows(self):
+        few = [d.id for d in make_donations(self.donor, 3, images_per_donation=0)]
+        many = [d.id for d in make_donations(self.donor, 30, images_per_donation=0)]
+        # Creates the CONFIRMED counter row so both runs below take the same path
+        bulk_transition([make_donations(self.donor, 1, images_per_donation=0)[0].id], DonationStatus.CONFIRMED)
+
+        with CaptureQueriesContext(connection) as small:
+            bulk_transition(few, DonationStatus.CONFIRMED)
+        with CaptureQueriesContext(connection) as large:
+            bulk_transition(many, DonationStatus.CONFIRMED)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_rejects_non_staff_and_bad_payloads(self):
+        donation = make_donations(self.donor, 1, images_per_donation=0)[0]
+        self.assertEqual(self.client.post('/api/donations/bulk-status/', {
+            'ids': [donation.id], 'status': 'LOST',
+        }, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/donations/bulk-status/', {
+            'ids': 'all', 'status': DonationStatus.CONFIRMED,
+        }, format='json').status_code, 400)
+
+        self.client.force_authenticate(self.donor)
+        self.assertEqual(self.client.post('/api/donations/bulk-status/', {
+            'ids': [donation.id], 'status': DonationStatus.CONFIRMED,
+        }, format='json').status_code, 403)
+
+    def test_admin_action(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(admin)
+        donations = make_donations(self.donor, 2, images_per_donation=0)
+
+        response = self.client.post('/admin/core/donation/', {
+            'action': 'mark_confirmed',
+            '_selected_action': [d.pk for d in donations],
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Donation.objects.filter(status=DonationStatus.CONFIRMED).count(), 2)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_index_benchmark_needs_debug_and_cleans_up(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_donation_indexes', '--rows', '10', stdout=StringIO())
+        self.assertFalse(Donation.objects.exists())
+
+        call_command(
+            'benchmark_donation_indexes', '--rows', '30', '--donors', '3', '--repeat', '1', '--i-know',
+            stdout=StringIO(),
+        )
+        self.assertFalse(Donation.objects.exists())
+        self.assertFalse(User.objects.filter(username__startswith='bench-donor-').exists())
+
+    def test_bulk_status_benchmark_needs_debug_and_cleans_up(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_bulk_status', '--rows', '10', stdout=StringIO())
+
+        call_command('benchmark_bulk_status', '--rows', '20', '--single-rows', '5', '--i-know', stdout=StringIO())
+        self.assertFalse(Donation.objects.exists())
+        self.assertFalse(PickupSlot.objects.exists())
+        self.assertFalse(ReceiptRenderJob.objects.exists())
+        self.assertEqual(check_status_counters(), {})
+
+
+class ReceiptNumberTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+
+    def test_numbers_are_sequential_within_a_day(self):
+        today = timezone.localdate()
+        donations = make_donations(self.user, 3, images_per_donation=0)
+        prefix = f"RCPT-{today:%Y%m%d}-"
+        self.assertEqual([d.receipt_number for d in donations], [f"{prefix}{n:06d}" for n in (1, 2, 3)])
+
+        block = generate_receipt_numbers(4)
+        self.assertEqual(block, [f"{prefix}{n:06d}" for n in range(4, 8)])
+        self.assertEqual(generate_receipt_numbers(1, day=date(2026, 3, 1)), ["RCPT-20260301-000001"])
+
+    def test_numbers_stop_at_six_digits(self):
+        day = date(2026, 3, 1)
+        ReceiptSequence.objects.create(day=day, last_value=999_998)
+
+        with self.assertRaises(ReceiptSequenceExhausted):
+            generate_receipt_numbers(2, day=day)
+        self.assertEqual(generate_receipt_numbers(1, day=day), ["RCPT-20260301-999999"])
+        with self.assertRaises(ReceiptSequenceExhausted):
+            generate_receipt_numbers(1, day=day)
+        self.assertEqual(ReceiptSequence.objects.get(day=day).last_value, 999_999)
+
+    def test_prefix_lookup_is_a_range(self):
+        donations = make_donations(self.user, 12, images_per_donation=0)
+        prefix = donations[0].receipt_number[:-1]  # ...00000x: receipts 1-9
+
+        matches = Donation.objects.with_receipt_prefix(prefix)
+        self.assertEqual(sorted(d.id for d in matches), sorted(d.id for d in donations[:9]))
+        self.assertIn('>=', str(matches.query))
+        self.assertEqual(Donation.objects.issued_on(timezone.localdate()).count(), 12)
+        self.assertFalse(Donation.objects.issued_on(date(2000, 1, 1)).exists())
+
+    def test_admin_search_by_receipt_prefix(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(admin)
+        donation = make_donations(self.user, 1, images_per_donation=0)[0]
+
+        response = self.client.get('/admin/core/donation/', {'q': donation.receipt_number.lower()})
+        self.assertEqual(list(response.context['cl'].result_list), [donation])
+
+
+class DonationSearchTests(TestCase):
+    def setUp(self):
+        donation_search.reset()
+        self.addCleanup(donation_search.reset)
+        self.donor = User.objects.create_user('asha', 'asha@example.com', 'pass12345')
+        self.other = User.objects.create_user('ravi', 'ravi@example.com', 'pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.donor)
+
+    def _donate(self, donor, category, description, area='Kakkanad'):
+        return Donation.objects.create(
+            donor=donor, category=category, description=description,
+            pickup_date=date(2026, 3, 1), district='Ernakulam', area=area,
+        )
+
+    def test_ranked_search_scoped_to_donor(self):
+        books = self._donate(self.donor, 'Books', 'Books books and more books')
+        shelf = self._donate(self.donor, 'Furniture', 'A shelf for books', area='Aluva')
+        self._donate(self.donor, 'Clothes', 'Winter jackets')
+        self._donate(self.other, 'Books', 'Books from Ravi')
+
+        response = self.client.get('/api/donations/search/', {'q': 'BOOK'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['id'] for r in response.data['results']], [books.id, shelf.id])
+        self.assertGreater(response.data['results'][0]['search_rank'], response.data['results'][1]['search_rank'])
+
+        # Every word must match, each as a prefix
+        response = self.client.get('/api/donations/search/', {'q': 'book alu'})
+        self.assertEqual([r['id'] for r in response.data['results']], [shelf.id])
+
+        staff = User.objects.create_user('staff', 'staff@example.com', 'pass12345', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get('/api/donations/search/', {'q': 'ravi'})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(self.client.get('/api/donations/search/').status_code, 400)
+
+    def test_pages_without_counting(self):
+        for i in range(5):
+            self._donate(self.donor, 'Toys', f'Toy box {i}')
+
+        first = self.client.get('/api/donations/search/', {'q': 'toy', 'page_size': 2})
+        self.assertEqual(len(first.data['results']), 2)
+        self.assertIsNone(first.data['previous'])
+        last = self.client.get('/api/donations/search/', {'q': 'toy', 'page_size': 2, 'page': 3})
+        self.assertEqual(len(last.data['results']), 1)
+        self.assertIsNone(last.data['next'])
+        self.assertIn('page=2', last.data['previous'])
+        self.assertEqual(self.client.get('/api/donations/search/', {'q': 'toy', 'page': 0}).status_code, 404)
+
+    def test_index_follows_writes(self):
+        donation = self._donate(self.donor, 'Books', 'Old novels')
+        self.assertEqual(len(donation_search.search_page(Donation.objects.all(), 'novels', 0, 10)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            donation.description = 'Cookery magazines'
+            donation.save()
+            added = self._donate(self.donor, 'Books', 'Comics')
+        self.assertFalse(donation_search.search_page(Donation.objects.all(), 'novels', 0, 10))
+        self.assertEqual(len(donation_search.search_page(Donation.objects.all(), 'cookery', 0, 10)), 1)
+        self.assertEqual(len(donation_search.search_page(Donation.objects.all(), 'comics', 0, 10)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.donor.username = 'ashalatha'
+            self.donor.save()
+            added.delete()
+        donation.refresh_from_db()
+        self.assertIn('ashalatha', donation.search_document)
+        self.assertEqual(len(donation_search.search_page(Donation.objects.all(), 'ashalatha', 0, 10)), 1)
+        self.assertFalse(donation_search.search_page(Donation.objects.all(), 'comics', 0, 10))
+
+    def test_unsearched_saves_skip_the_rebuild(self):
+        donation = Donation.objects.get(pk=self._donate(self.donor, 'Books', 'Old novels').pk)
+        document = donation.search_document
+
+        with CaptureQueriesContext(connection) as ctx:
+            donation.status = DonationStatus.CONFIRMED
+            donation.save()
+            self.donor.first_name = 'Asha'
+            self.donor.save()
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if '"auth_user"' in q['sql'] and 'SELECT' in q['sql']])
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if 'SELECT' in q['sql'] and '"core_donation"' in q['sql']])
+        self.assertEqual(Donation.objects.get(pk=donation.pk).search_document, document)
+
+        donation.area = 'Aluva'
+        donation.save()
+        self.assertIn('Aluva', Donation.objects.get(pk=donation.pk).search_document)
+
+    def test_admin_changelist_uses_search_index(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(admin)
+        match = self._donate(self.donor, 'Books', 'Science textbooks')
+        self._donate(self.other, 'Toys', 'Lego')
+
+        response = self.client.get('/admin/core/donation/', {'q': 'asha textb'})
+        self.assertEqual(list(response.context['cl'].result_list), [match])
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(self.admin)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelists_render_in_constant_queries(self):
+        donors = [User.objects.create_user(f'donor{i}', f'donor{i}@example.com', 'pass12345') for i in range(3)]
+        for donor in donors:
+            make_donations(donor, 1, images_per_donation=1)
+        for donation in Donation.objects.all():
+            DonationTracking.objects.create(donation=donation)
+        urls = ['/admin/core/donation/', '/admin/core/donationimage/', '/admin/core/donationtracking/']
+        self._queries(urls[0])  # fills the district count cache
+        few = [self._queries(url) for url in urls]
+
+        for donor in donors:
+            donations = make_donations(donor, 5, images_per_donation=1)
+            for donation in donations:
+                DonationTracking.objects.create(donation=donation)
+        self.assertEqual([self._queries(url) for url in urls], few)
+
+    def test_filter_labels_use_cached_counts(self):
+        donor = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        make_donations(donor, 2, images_per_donation=0)
+
+        response = self.client.get('/admin/core/donation/')
+        self.assertContains(response, 'Ernakulam (2)')
+        self.assertContains(response, 'Submitted (2)')
+
+        make_donations(donor, 1, images_per_donation=0)
+        response = self.client.get('/admin/core/donation/', {'district': 'Ernakulam'})
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+        self.assertContains(response, 'Ernakulam (2)')  # district counts are cached
+        self.assertContains(response, 'Submitted (3)')  # status counts are maintained
+
+    def test_counted_filter_defaults_to_one_aggregate(self):
+        class CategoryFilter(CountedChoicesFilter):
+            title = 'category'
+            parameter_name = 'category'
+            options = [('Books', 'Books'), ('Toys', 'Toys')]
+
+        donor = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        make_donations(donor, 2, images_per_donation=0)
+        with CaptureQueriesContext(connection) as ctx:
+            choices = CategoryFilter(RequestFactory().get('/'), {}, Donation, site._registry[Donation]).lookup_choices
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(choices, [('Books', 'Books (2)'), ('Toys', 'Toys (0)')])
+
+
+class PickupRoutingTests(TestCase):
+    def test_geocode_against_gazetteer(self):
+        kakkanad = pickup_routing.geocode('Ernakulam', 'Kakkanad')
+        self.assertTrue(kakkanad[2])
+        self.assertEqual(pickup_routing.geocode('Ernakulam', 'near KAKKANAD junction')[:2], kakkanad[:2])
+        self.assertEqual(pickup_routing.geocode('Ernakulam', 'Kakanad')[:2], kakkanad[:2])
+        self.assertEqual(pickup_routing.geocode('Ernakulam', '', '12 Main Road, Kakkanad')[:2], kakkanad[:2])
+
+        lat, lon, matched = pickup_routing.geocode('Ernakulam', 'Nowhere in particular')
+        self.assertFalse(matched)
+        self.assertEqual((lat, lon), pickup_routing.load_gazetteer()['Ernakulam']['centre'])
+
+    def test_runs_respect_capacity_and_two_opt_only_shortens(self):
+        rng = random.Random(7)
+        points = [(rng.uniform(0, 50), rng.uniform(0, 50)) for _ in range(500)]
+        depot = (25.0, 25.0)
+
+        greedy = pickup_routing.solve_runs(points, depot, 12, improve=False)
+        improved = pickup_routing.solve_runs(points, depot, 12)
+        for runs in (greedy, improved):
+            self.assertTrue(all(len(run) <= 12 for run in runs))
+            self.assertEqual(sorted(index for run in runs for index in run), list(range(500)))
+        for before, after in zip(greedy, improved):
+            self.assertEqual(sorted(before), sorted(after))
+            self.assertLessEqual(
+                pickup_routing._tour_length(after, points, depot),
+                pickup_routing._tour_length(before, points, depot) + 1e-9,
+            )
+
+    def test_endpoint_plans_awaiting_donations_per_district(self):
+        donor = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        staff = User.objects.create_user('staff', 'staff@example.com', 'pass12345', is_staff=True)
+        day = date(2026, 3, 7)
+        for district, area in [('Ernakulam', 'Aluva'), ('Ernakulam', 'Kakkanad'),
+                               ('Ernakulam', 'Vyttila'), ('Kozhikode', 'Feroke')]:
+            Donation.objects.create(donor=donor, category='Books', description='Books',
+                                    pickup_date=day, district=district, area=area)
+        done = Donation.objects.create(donor=donor, category='Books', description='Books',
+                                       pickup_date=day, district='Ernakulam', area='Aluva')
+        transition(done, DonationStatus.CANCELLED)
+
+        client = APIClient()
+        client.force_authenticate(staff)
+        response = client.get('/api/pickups/routes/', {'date': '2026-03-07', 'capacity': 2})
+        self.assertEqual(response.status_code, 200)
+        districts = {plan['district']: plan for plan in response.data['districts']}
+        self.assertEqual(list(districts), ['Ernakulam', 'Kozhikode'])
+        self.assertEqual([len(run['stops']) for run in districts['Ernakulam']['runs']], [2, 1])
+        stops = [stop for run in districts['Ernakulam']['runs'] for stop in run['stops']]
+        self.assertNotIn(done.id, [stop['donation_id'] for stop in stops])
+        self.assertTrue(all(stop['geocoded'] for stop in stops))
+
+        self.assertEqual(client.get('/api/pickups/routes/', {'district': 'Atlantis'}).status_code, 400)
+        self.assertEqual(client.get('/api/pickups/routes/', {'date': '2026-3-7x'}).status_code, 400)
+        client.force_authenticate(donor)
+        self.assertEqual(client.get('/api/pickups/routes/').status_code, 403)
+
+
+@override_settings(PICKUP_SLOT_CAPACITY=2, PICKUP_SLOT_HORIZON_DAYS=2)
+class PickupSlotTests(TestCase):
+    def setUp(self):
+        self.donor = User.objects.create_user('donor', 'donor@example.com', 'pass12345')
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def _donations(self, count, district='Ernakulam'):
+        return [
+            Donation.objects.create(donor=self.donor, category='Books', description='Books',
+                                    pickup_date=self.tomorrow, district=district)
+            for _ in range(count)
+        ]
+
+    def _booked(self, day):
+        return PickupSlot.objects.get(district='Ernakulam', day=day).booked
+
+    def test_scheduling_fills_days_in_order_and_cancelling_frees_the_place(self):
+        donations = self._donations(5)
+        for donation in donations[:4]:
+            transition(donation, DonationStatus.PICKUP_SCHEDULED)
+        day_after = self.tomorrow + timedelta(days=1)
+        self.assertEqual(
+            [d.pickup_date for d in donations[:4]], [self.tomorrow, self.tomorrow, day_after, day_after]
+        )
+        self.assertEqual(Donation.objects.get(pk=donations[0].pk).pickup_slot.day, self.tomorrow)
+
+        with self.assertRaisesMessage(InvalidTransition, "No pickup slot free in Ernakulam"):
+            transition(donations[4], DonationStatus.PICKUP_SCHEDULED)
+        self.assertEqual(Donation.objects.get(pk=donations[4].pk).status, DonationStatus.SUBMITTED)
+
+        transition(donations[0], DonationStatus.CANCELLED)
+        self.assertEqual(self._booked(self.tomorrow), 1)
+        self.assertIsNone(Donation.objects.get(pk=donations[0].pk).pickup_slot_id)
+        transition(donations[4], DonationStatus.PICKUP_SCHEDULED)
+        self.assertEqual(donations[4].pickup_date, self.tomorrow)
+
+        # A picked-up donation keeps its place; deleting a scheduled one frees it
+        transition(donations[1], DonationStatus.PICKED_UP)
+        donations[2].delete()
+        self.assertEqual(self._booked(self.tomorrow), 2)
+        self.assertEqual(self._booked(day_after), 1)
+
+    def test_bulk_scheduling_respects_capacity(self):
+        donations = self._donations(5) + self._donations(1, district=None)
+        ids = [donation.id for donation in donations]
+
+        results = bulk_transition(ids, DonationStatus.PICKUP_SCHEDULED)
+        self.assertEqual([result['ok'] for result in results], [True] * 4 + [False] * 2)
+        self.assertIn("No pickup slot free", results[4]['error'])
+        self.assertIn("Set a district", results[5]['error'])
+        self.assertEqual(self._booked(self.tomorrow), 2)
+        self.assertEqual(Donation.objects.filter(pickup_slot__isnull=False).count(), 4)
+
+        bulk_transition(ids, DonationStatus.CONFIRMED)
+        self.assertEqual(set(PickupSlot.objects.values_list('booked', flat=True)), {0})
+        self.assertFalse(Donation.objects.filter(pickup_slot__isnull=False).exists())
+
+    def test_slots_are_booked_in_district_and_day_order(self):
+        day_after = self.tomorrow + timedelta(days=1)
+        rows = [(1, 'Kozhikode', self.tomorrow), (2, 'Ernakulam', day_after), (3, 'Ernakulam', self.tomorrow)]
+        with mock.patch.object(PickupSlot, 'take', wraps=PickupSlot.take) as take:
+            assigned = assign_slots(rows)
+
+        self.assertEqual(set(assigned), {1, 2, 3})
+        booked = [
+            PickupSlot.objects.values_list('district', 'day').get(pk=call.args[0]) for call in take.call_args_list
+        ]
+        self.assertEqual(
+            booked, [('Ernakulam', self.tomorrow), ('Ernakulam', day_after), ('Kozhikode', self.tomorrow)]
+        )
+
+    def test_admin_add_form_rejects_scheduled_status(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(admin)
+        response = self.client.get('/admin/core/donation/add/')
+        form_class = type(response.context['adminform'].form)
+
+        form = form_class(data={
+            'donor': self.donor.pk, 'category': 'Books', 'description': 'Books',
+            'pickup_date': self.tomorrow, 'district': 'Ernakulam', 'status': DonationStatus.PICKUP_SCHEDULED,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['status'], ["Add the donation first, then schedule its pickup."])
+        self.assertFalse(PickupSlot.objects.exists())
+
+    def test_api_cannot_create_a_scheduled_donation(self):
+        client = APIClient()
+        client.force_authenticate(self.donor)
+        response = client.post('/api/donations/', {
+            'category': 'Books', 'description': 'Books', 'pickup_date': self.tomorrow,
+            'district': 'Ernakulam', 'status': DonationStatus.PICKUP_SCHEDULED,
+        })
+        self.assertEqual(response.status_code, 201)
+        donation = Donation.objects.get(pk=response.data['id'])
+        self.assertEqual(donation.status, DonationStatus.SUBMITTED)
+        self.assertIsNone(donation.pickup_slot_id)
+        self.assertFalse(PickupSlot.objects.exists())
+
+    def test_conditional_reservation_never_overbooks(self):
+        slot, = PickupSlot.open('Ernakulam', [self.tomorrow])
+        PickupSlot.objects.filter(pk=slot.pk).update(capacity=5)
+
+        self.assertEqual(PickupSlot.take(slot.pk, 3), 3)
+        # A stale reader asking for more than is left only gets what remains
+        self.assertEqual(PickupSlot.take(slot.pk, 3), 2)
+        self.assertEqual(PickupSlot.take(slot.pk, 1), 0)
+        self.assertEqual(self._booked(self.tomorrow), 5)
+
+        PickupSlot.release(slot.pk, 10)
+        self.assertEqual(self._booked(self.tomorrow), 5)
+        PickupSlot.release(slot.pk, 2)
+        self.assertEqual(self._booked(self.tomorrow), 3)
+
+    def test_availability_endpoint(self):
+        PickupSlot.open('Ernakulam', [self.tomorrow])
+        PickupSlot.take(PickupSlot.objects.get(day=self.tomorrow).pk, 2)
+
+        client = APIClient()
+        self.assertEqual(client.get('/api/pickups/availability/', {'district': 'Ernakulam'}).status_code, 401)
+        client.force_authenticate(self.donor)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/pickups/availability/', {'district': 'Ernakulam', 'days': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(
+            [(day['date'], day['available']) for day in response.data['days']],
+            [(timezone.localdate().isoformat(), 2), (self.tomorrow.isoformat(), 0),
+             ((self.tomorrow + timedelta(days=1)).isoformat(), 2)],
+        )
+        self.assertEqual(client.get('/api/pickups/availability/', {'district': 'Atlantis'}).status_code, 400)
+        self.assertEqual(
+            client.get('/api/pickups/availability/', {'district': 'Ernakulam', 'from': 'tomorrow'}).status_code, 400
+        )
+        self.assertEqual(
+            client.get('/api/pickups/availability/', {'district': 'Ernakulam', 'days': 0}).status_code, 400
+        )
@@ -15,24 +15,33 @@ from .api_views import (
     RegisterView, UserDetailView, DonationListCreateView, DonationDetailView
 )
 from .api_social import social_auth_callback
+from .api_events import donation_events, my_donation_events
 from .api_otp_auth import (
-    SendOTPView, VerifyOTPView, ForgotPasswordView, ResetPasswordView, ReceiptPDFView
+    SendOTPView, VerifyOTPView, ForgotPasswordView, ResetPasswordView, ReceiptPDFView,
+    ReceiptExportView,
 )
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 
-from .api_views import AdminStatsView
+from .api_views import (
+    AdminStatsView, BulkStatusView, DonationSearchView, PickupAvailabilityView, PickupRoutesView,
+    ReceiptQueueStatsView,
+)
 
 urlpatterns = [
     # ... previous paths ...
     path('api/donations/<int:donation_id>/send-otp/', SendOTPView.as_view(), name='api_send_otp'),
     path('api/donations/<int:donation_id>/verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
     path('api/receipt/<int:donation_id>/pdf/', ReceiptPDFView.as_view(), name='receipt-pdf'),
+    path('api/receipts/export/', ReceiptExportView.as_view(), name='receipt-export'),
     path('api/auth/forgot-password/', ForgotPasswordView.as_view(), name='forgot-password'),
     path('api/auth/reset-password/', ResetPasswordView.as_view(), name='api_reset_password'),
     path('api/admin/stats/', AdminStatsView.as_view(), name='api_admin_stats'),
+    path('api/admin/receipt-queue/', ReceiptQueueStatsView.as_view(), name='api_receipt_queue'),
+    path('api/pickups/routes/', PickupRoutesView.as_view(), name='api_pickup_routes'),
+    path('api/pickups/availability/', PickupAvailabilityView.as_view(), name='api_pickup_availability'),
 
     path('', home, name='home'),
     path('register/', register, name='register'),
@@ -63,6 +72,10 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/user/', UserDetailView.as_view(), name='api_user_detail'),
     path('api/donations/', DonationListCreateView.as_view(), name='api_donations'),
+    path('api/donations/search/', DonationSearchView.as_view(), name='api_donation_search'),
+    path('api/donations/bulk-status/', BulkStatusView.as_view(), name='api_donation_bulk_status'),
     path('api/donations/<int:pk>/', DonationDetailView.as_view(), name='api_donation_detail'),
+    path('api/donations/events/', my_donation_events, name='api_donation_events'),
+    path('api/donations/<int:donation_id>/events/', donation_events, name='api_donation_detail_events'),
     path('api/social-callback/', social_auth_callback, name='social_auth_callback'),
 ]
@@ -0,0 +1,360 @@
+"""Local donation category classifier.
+
+A small multinomial Naive Bayes model over description words. It starts from
+hand-picked keyword priors and is refined from real Donation rows with
+``manage.py train_category_classifier``. Scoring is a handful of dict lookups,
+so suggestions are answered in-process; only low-confidence descriptions are
+escalated to the remote Gemini model, asynchronously and under a deadline.
+"""
+import asyncio
+import concurrent.futures
+import json
+import logging
+import math
+import re
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = [
+    "Clothes",
+    "Books",
+    "Toys",
+    "Electronics",
+    "Furniture",
+    "Footwear",
+    "Educational Materials",
+    "Household Items",
+]
+DEFAULT_CATEGORY = "Household Items"
+
+# Prior evidence used before (and alongside) training data
+SEED_KEYWORDS = {
+    "Clothes": ["shirt", "pant", "dress", "saree", "jacket", "sweater", "cloth", "clothe", "uniform", "jean"],
+    "Books": ["book", "novel", "textbook", "magazine", "comic"],
+    "Toys": ["toy", "doll", "puzzle", "lego", "ball", "game"],
+    "Electronics": ["laptop", "mobile", "phone", "tv", "computer", "tablet", "charger", "radio"],
+    "Furniture": ["table", "chair", "sofa", "bed", "cupboard", "shelf", "desk", "wardrobe"],
+    "Footwear": ["shoe", "sandal", "slipper", "boot", "chappal", "sneaker"],
+    "Educational Materials": ["notebook", "pen", "pencil", "stationery", "geometry", "chart", "school"],
+    "Household Items": ["utensil", "vessel", "plate", "kitchen", "bucket", "blanket", "bedsheet", "lamp"],
+}
+SEED_WEIGHT = 5
+# Additive smoothing; kept small so one strong keyword is decisive
+ALPHA = 0.1
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def normalize(description):
+    """Lowercase and collapse a description so equivalent inputs share a cache entry."""
+    return " ".join(_TOKEN_RE.findall((description or "").lower()))
+
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def model_path():
+    return Path(getattr(settings, "CATEGORY_MODEL_PATH", Path(settings.BASE_DIR) / "category_model.json"))
+
+
+def train(samples):
+    """Build model counts from ``(category, description)`` pairs."""
+    doc_counts = {category: 0 for category in CATEGORIES}
+    token_counts = {category: {} for category in CATEGORIES}
+    for category, description in samples:
+        if category not in doc_counts:
+            continue
+        doc_counts[category] += 1
+        counts = token_counts[category]
+        for token in tokenize(description):
+            counts[token] = counts.get(token, 0) + 1
+    return {"version": 1, "doc_counts": doc_counts, "token_counts": token_counts}
+
+
+class CategoryModel:
+    def __init__(self, data=None):
+        data = data or train([])
+        counts = {category: dict(data["token_counts"].get(category, {})) for category in CATEGORIES}
+        for category, keywords in SEED_KEYWORDS.items():
+            for keyword in keywords:
+                counts[category][keyword] = counts[category].get(keyword, 0) + SEED_WEIGHT
+
+        vocabulary = {token for category_counts in counts.values() for token in category_counts}
+        docs = {category: data["doc_counts"].get(category, 0) + 1 for category in CATEGORIES}
+        total_docs = sum(docs.values())
+
+        self.log_prior = {category: math.log(docs[category] / total_docs) for category in CATEGORIES}
+        self.log_likelihood = {}
+        self.log_unseen = {}
+        for category in CATEGORIES:
+            denominator = sum(counts[category].values()) + ALPHA * len(vocabulary)
+            self.log_unseen[category] = math.log(ALPHA / denominator)
+            self.log_likelihood[category] = {
+                token: math.log((count + ALPHA) / denominator) for token, count in counts[category].items()
+            }
+        self.vocabulary = vocabulary
+
+    def predict(self, description):
+        """Return ``(category, confidence)`` with confidence in [0, 1]."""
+        tokens = [token for token in tokenize(description) if token in self.vocabulary]
+        if not tokens:
+            return DEFAULT_CATEGORY, 0.0
+        scores = {
+            category: self.log_prior[category] + sum(
+                self.log_likelihood[category].get(token, self.log_unseen[category]) for token in tokens
+            )
+            for category in CATEGORIES
+        }
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1 / total
+
+
+@lru_cache(maxsize=1)
+def get_model():
+    path = model_path()
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return CategoryModel(json.load(handle))
+    except FileNotFoundError:
+        return CategoryModel()
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load category model from {path}: {e}")
+        return CategoryModel()
+
+
+def save_model(data):
+    path = model_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+    reset()
+
+
+def reset():
+    get_model.cache_clear()
+    get_remote_client.cache_clear()
+    with _answers_lock:
+        _answers.clear()
+    global _limiter
+    with _inflight_lock:
+        _limiter = None
+
+
+# ================= REMOTE ESCALATION =================
+# Low-confidence descriptions go to a remote model under a hard deadline.
+# Identical in-flight requests share one call and a limiter caps how many
+# remote calls run at once. Both are process-wide: under WSGI every request
+# runs ai_category on its own short-lived event loop, so nothing keyed on a
+# loop would ever be shared.
+
+class GeminiCategoryClient:
+    """Remote classifier backed by Gemini's async API."""
+
+    def __init__(self):
+        import google.generativeai as genai
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel("models/gemini-2.5-flash")
+
+    async def classify(self, description):
+        prompt = (
+            "Choose ONE category from this list ONLY:\n"
+            f"{', '.join(CATEGORIES)}.\n\n"
+            f"Description: {description}\n"
+            "Return only the category name."
+        )
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+
+@lru_cache(maxsize=1)
+def get_remote_client():
+    """Instance of CATEGORY_REMOTE_CLIENT, or None if it can't be created."""
+    path = getattr(settings, "CATEGORY_REMOTE_CLIENT", "core.utils.category_classifier.GeminiCategoryClient")
+    try:
+        return import_string(path)()
+    except Exception as e:
+        logger.warning(f"Remote category client {path} unavailable: {e}")
+        return None
+
+
+def parse_category(text):
+    text = (text or "").lower()
+    for category in CATEGORIES:
+        if category.split()[0].lower() in text:
+            return category
+    return None
+
+
+class ProcessLimiter:
+    """Async counting semaphore shared by every thread and event loop in the process.
+
+    Waiters are woken in order on their own loop, with the free slot handed
+    straight to them.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._available = limit
+        self._waiters = deque()  # (loop, future)
+        self._lock = threading.Lock()
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._available > 0 and not self._waiters:
+                self._available -= 1
+                return self
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                    granted = False
+                except ValueError:
+                    granted = waiter.done() and not waiter.cancelled()
+            # A slot handed over as we were cancelled goes to the next waiter;
+            # one still on its way is passed on by _grant
+            if granted:
+                self._release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, waiter)
+                    return
+                except RuntimeError:
+                    # That request's loop has already closed
+                    continue
+            self._available += 1
+
+    def _grant(self, waiter):
+        if waiter.done():
+            self._release()
+        else:
+            waiter.set_result(None)
+
+
+_limiter = None
+# description -> concurrent.futures.Future, awaitable from any loop
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_limiter():
+    global _limiter
+    limit = getattr(settings, "CATEGORY_REMOTE_CONCURRENCY", 8)
+    with _inflight_lock:
+        if _limiter is None or _limiter.limit != limit:
+            _limiter = ProcessLimiter(limit)
+        return _limiter
+
+
+async def _call_remote(client, description):
+    async with _get_limiter():
+        return parse_category(await client.classify(description))
+
+
+def _settle(description, shared, task):
+    with _inflight_lock:
+        if _inflight.get(description) is shared:
+            del _inflight[description]
+    if task.cancelled():
+        # The owning request's loop shut down; waiters fall back to the local answer
+        shared.set_exception(RuntimeError("remote call abandoned"))
+    elif task.exception() is not None:
+        shared.set_exception(task.exception())
+    else:
+        shared.set_result(task.result())
+
+
+async def remote_category(description):
+    """Ask the remote model, coalescing identical calls; None on timeout or error."""
+    client = get_remote_client()
+    if client is None:
+        return None
+
+    with _inflight_lock:
+        shared = _inflight.get(description)
+        owner = shared is None
+        if owner:
+            shared = _inflight[description] = concurrent.futures.Future()
+    if owner:
+        task = asyncio.ensure_future(_call_remote(client, description))
+        task.add_done_callback(lambda task: _settle(description, shared, task))
+
+    result = asyncio.wrap_future(shared)
+    # Retrieve the outcome even if we stop waiting, so it isn't logged as lost
+    result.add_done_callback(lambda future: future.cancelled() or future.exception())
+    timeout = getattr(settings, "CATEGORY_REMOTE_TIMEOUT", 2.0)
+    try:
+        # shield: one caller timing out must not cancel the shared call
+        return await asyncio.wait_for(asyncio.shield(result), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Remote category timed out after {timeout}s")
+    except Exception as e:
+        logger.warning(f"Gemini AI failed: {e}")
+    return None
+
+
+# ================= SUGGESTIONS =================
+_answers = OrderedDict()
+_answers_lock = threading.Lock()
+
+
+def _remember(key, category):
+    with _answers_lock:
+        _answers[key] = category
+        _answers.move_to_end(key)
+        while len(_answers) > getattr(settings, "CATEGORY_CACHE_SIZE", 4096):
+            _answers.popitem(last=False)
+
+
+def _cached(key):
+    with _answers_lock:
+        category = _answers.get(key)
+        if category is not None:
+            _answers.move_to_end(key)
+        return category
+
+
+async def suggest_category(normalized_description):
+    """Category for an already-normalized description (see ``normalize``)."""
+    if not normalized_description:
+        return DEFAULT_CATEGORY
+    cached = _cached(normalized_description)
+    if cached:
+        return cached
+
+    category, confidence = get_model().predict(normalized_description)
+    if confidence < getattr(settings, "CATEGORY_CONFIDENCE_THRESHOLD", 0.6):
+        remote = await remote_category(normalized_description)
+        if remote is None:
+            # Not cached, so a later request can still reach the remote model
+            return category
+        category = remote
+    _remember(normalized_description, category)
+    return category
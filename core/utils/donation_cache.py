@@ -0,0 +1,93 @@
+"""Read-through cache of serialized donation payloads.
+
+Each donation has a version token in the cache; its payloads are stored
+under that token and the ETag is derived from it. Any write to the donation,
+its images or its tracking row replaces the token, so a conditional poll is
+answered from the cache alone and stale payloads are simply never read
+again (they expire after DONATION_CACHE_TIMEOUT).
+
+Version tokens expire after DONATION_CACHE_TIMEOUT as well, so a write the
+cache never heard about (made by a process with its own local cache) shows
+up within that time. Workers that write donations outside the web process,
+like ``manage.py process_images``, need a cache every process shares; the
+``core.E001`` deploy check refuses a per-process LocMemCache.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+def get_cache():
+    return caches[getattr(settings, 'DONATION_CACHE_ALIAS', 'donations')]
+
+
+def is_shared():
+    """False when the cache lives inside this process (LocMemCache)."""
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def _timeout():
+    return getattr(settings, 'DONATION_CACHE_TIMEOUT', 300)
+
+
+def _version_key(donation_id):
+    return f"donation:{donation_id}:version"
+
+
+def _payload_key(donation_id, version, variant):
+    return f"donation:{donation_id}:{version}:{hashlib.sha256(variant.encode()).hexdigest()[:16]}"
+
+
+def invalidate_donation(donation_id):
+    """Retire every cached payload for the donation, now and again after commit.
+
+    The second bump makes sure nothing cached from pre-commit reads survives.
+    """
+    if donation_id is None:
+        return
+    invalidate_donations([donation_id])
+
+
+def invalidate_donations(donation_ids):
+    """``invalidate_donation`` for many donations with one cache round trip per bump."""
+    keys = [_version_key(donation_id) for donation_id in donation_ids]
+    if not keys:
+        return
+
+    def bump():
+        get_cache().set_many({key: uuid.uuid4().hex for key in keys}, _timeout())
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def current_version(donation_id):
+    cache = get_cache()
+    version = cache.get(_version_key(donation_id))
+    if version is None:
+        cache.add(_version_key(donation_id), uuid.uuid4().hex, _timeout())
+        version = cache.get(_version_key(donation_id))
+    return version
+
+
+def make_etag(version, user_id, variant):
+    return '"%s"' % hashlib.sha256(f"{version}|{user_id}|{variant}".encode()).hexdigest()[:32]
+
+
+def get_payload(donation_id, version, variant, user_id):
+    entry = get_cache().get(_payload_key(donation_id, version, variant))
+    if entry is None or entry['donor_id'] != user_id:
+        return None
+    return entry['data']
+
+
+def set_payload(donation_id, version, variant, donor_id, data):
+    get_cache().set(
+        _payload_key(donation_id, version, variant),
+        {'donor_id': donor_id, 'data': data},
+        _timeout(),
+    )
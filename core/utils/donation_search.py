@@ -0,0 +1,226 @@
+"""Full-text search over donations.
+
+Each donation stores a ``search_document``: donor username and email,
+category, description, area, district and receipt number, refreshed by
+Donation.save. On PostgreSQL migration 0019 adds a stored generated
+``search_vector`` tsvector over it with a GIN index, so matching and ranking
+run in the database and the vector can't drift from the row.
+
+Other backends (SQLite test runs) fall back to an in-process inverted index,
+loaded from ``search_document`` on first use and updated after each commit.
+
+Both treat every query word as a prefix and require all of them to match,
+so "kakk book" finds "Box of books" picked up in Kakkanad.
+"""
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _WORD_RE.findall((text or '').lower())
+
+
+def build_search_document(donation):
+    # Callers set donation.donor (or select_related it) so this doesn't query
+    donor = donation.donor
+    parts = [
+        donor.username, donor.email,
+        donation.category, donation.description, donation.area, donation.district,
+        donation.receipt_number,
+    ]
+    return ' '.join(part for part in parts if part)
+
+
+def uses_database_index():
+    return connection.vendor == 'postgresql'
+
+
+# ================= POSTGRESQL =================
+def _tsquery(tokens):
+    # Tokens are \w+ only, so nothing in them is tsquery syntax
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+def _pg_filter(queryset, tokens):
+    table = queryset.model._meta.db_table
+    return queryset.alias(
+        search_match=RawSQL(
+            f"{table}.search_vector @@ to_tsquery('simple', %s)", [_tsquery(tokens)], output_field=BooleanField()
+        )
+    ).filter(search_match=True)
+
+
+def _pg_ranked(queryset, tokens):
+    table = queryset.model._meta.db_table
+    return _pg_filter(queryset, tokens).annotate(
+        search_rank=RawSQL(
+            f"ts_rank({table}.search_vector, to_tsquery('simple', %s))", [_tsquery(tokens)], output_field=FloatField()
+        )
+    ).order_by('-search_rank', '-id')
+
+
+# ================= IN-PROCESS FALLBACK =================
+class InvertedIndex:
+    """Token -> {donation id: term frequency}, with a sorted term list for prefix lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._postings = defaultdict(dict)
+        self._docs = {}  # doc_id -> (token count, distinct tokens)
+        self._terms = []
+        self._terms_dirty = False
+
+    def load(self, documents):
+        with self._lock:
+            self._postings.clear()
+            self._docs.clear()
+            for doc_id, text in documents:
+                self._add(doc_id, text)
+            self.loaded = True
+
+    def update(self, documents):
+        """Add or replace ``{doc_id: text}``; ``None`` text removes the document."""
+        with self._lock:
+            for doc_id, text in documents.items():
+                self._remove(doc_id)
+                if text is not None:
+                    self._add(doc_id, text)
+
+    def _add(self, doc_id, text):
+        tokens = tokenize(text)
+        for token in tokens:
+            postings = self._postings[token]
+            if not postings:
+                self._terms_dirty = True
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+        self._docs[doc_id] = (len(tokens), frozenset(tokens))
+
+    def _remove(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for token in doc[1]:
+            del self._postings[token][doc_id]
+            if not self._postings[token]:
+                del self._postings[token]
+                self._terms_dirty = True
+
+    def _expand(self, prefix):
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        start = bisect_left(self._terms, prefix)
+        end = start
+        while end < len(self._terms) and self._terms[end].startswith(prefix):
+            end += 1
+        return self._terms[start:end]
+
+    def search(self, tokens):
+        """Return ``{doc_id: score}`` for documents matching every token as a prefix."""
+        with self._lock:
+            total = len(self._docs) or 1
+            scores = None
+            for token in tokens:
+                matched = defaultdict(int)
+                for term in self._expand(token):
+                    for doc_id, count in self._postings[term].items():
+                        matched[doc_id] += count
+                idf = math.log(1 + total / (len(matched) or 1))
+                if scores is None:
+                    scores = {doc_id: count * idf for doc_id, count in matched.items()}
+                else:
+                    scores = {
+                        doc_id: score + matched[doc_id] * idf
+                        for doc_id, score in scores.items() if doc_id in matched
+                    }
+                if not scores:
+                    return {}
+            return {
+                doc_id: score / (1 + math.log(1 + self._docs[doc_id][0]))
+                for doc_id, score in (scores or {}).items()
+            }
+
+
+_index = InvertedIndex()
+
+
+def _loaded_index():
+    if not _index.loaded:
+        from core.models import Donation
+        _index.load(Donation.objects.values_list('id', 'search_document').iterator())
+    return _index
+
+
+def _memory_ranks(queryset, tokens):
+    ranks = _loaded_index().search(tokens)
+    if not ranks:
+        return {}
+    visible = set(queryset.filter(pk__in=list(ranks)).values_list('id', flat=True))
+    return {doc_id: rank for doc_id, rank in ranks.items() if doc_id in visible}
+
+
+def _memory_page(queryset, tokens, offset, limit):
+    ranks = _memory_ranks(queryset, tokens)
+    ordered = sorted(ranks, key=lambda doc_id: (-ranks[doc_id], -doc_id))[offset:offset + limit]
+    found = queryset.in_bulk(ordered)
+    donations = []
+    for doc_id in ordered:
+        donation = found[doc_id]
+        donation.search_rank = ranks[doc_id]
+        donations.append(donation)
+    return donations
+
+
+def reindex_donations(documents):
+    """Refresh ``{donation_id: search_document or None}`` in the fallback index after commit."""
+    if uses_database_index() or not documents:
+        return
+
+    def apply():
+        # An index that isn't loaded yet will read the committed rows anyway
+        if _index.loaded:
+            _index.update(documents)
+
+    transaction.on_commit(apply)
+
+
+def reset():
+    """Drop the fallback index; it reloads from the database on next use."""
+    _index.load([])
+    _index.loaded = False
+
+
+# ================= PUBLIC API =================
+def search_filter(queryset, query):
+    """Narrow ``queryset`` to donations matching ``query`` (order untouched)."""
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset
+    if uses_database_index():
+        return _pg_filter(queryset, tokens)
+    return queryset.filter(pk__in=list(_memory_ranks(queryset, tokens)))
+
+
+def search_page(queryset, query, offset, limit):
+    """Donations matching ``query``, best first, each with a ``search_rank`` attribute."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    if uses_database_index():
+        return list(_pg_ranked(queryset, tokens)[offset:offset + limit])
+    return _memory_page(queryset, tokens, offset, limit)
+
+
+def search_ranked(queryset, query):
+    """``search_page`` as a lazy queryset; PostgreSQL only."""
+    return _pg_ranked(queryset, tokenize(query))
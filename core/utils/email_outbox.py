@@ -0,0 +1,119 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, message, recipient_list, from_email=None, html_message=None):
+    """Store an email for the outbox worker; same arguments as ``send_mail``."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or '',
+        to=list(recipient_list),
+    )
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base ... capped."""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', 30)
+    cap = getattr(settings, 'EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+def _record_failure(email, error, now, max_attempts):
+    email.attempts += 1
+    logger.warning(f"Email {email.pk} to {email.to} failed (attempt {email.attempts}): {error}")
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = OutboundEmail.FAILED
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def _save_outcomes(emails):
+    OutboundEmail.objects.bulk_update(
+        emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+
+
+def deliver(emails, connection=None):
+    """Send ``emails`` over one connection and record each outcome.
+
+    Returns the list of emails that were sent. Failures, including a
+    connection that can't be opened, are rescheduled with backoff, or marked
+    FAILED after EMAIL_OUTBOX_MAX_ATTEMPTS; they are never raised.
+    """
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    connection = connection or get_connection()
+    sent = []
+    now = timezone.now()
+
+    try:
+        opened = connection.open()
+    except Exception as e:
+        # Nothing can go out; every email in the batch used up an attempt
+        for email in emails:
+            _record_failure(email, e, now, max_attempts)
+        _save_outcomes(emails)
+        return sent
+
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([build_message(email, connection)])
+            except Exception as e:
+                _record_failure(email, e, now, max_attempts)
+                # The connection may be broken; reconnect for the next message
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+                continue
+            email.attempts += 1
+            email.status = OutboundEmail.SENT
+            email.sent_at = now
+            email.last_error = ''
+            sent.append(email)
+    finally:
+        if opened:
+            connection.close()
+
+    _save_outcomes(emails)
+    return sent
+
+
+def send_due_emails(batch_size=100, connection=None):
+    """Claim and deliver one batch of due emails. Returns (claimed, sent)."""
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if not batch:
+            return 0, 0
+        sent = deliver(batch, connection)
+    return len(batch), len(sent)
@@ -0,0 +1,255 @@
+"""Donation photo ingestion.
+
+Uploads are only checked and stored during the request. A worker later
+decodes each one once, orients and bounds it to MAX_IMAGE_WIDTH x
+MAX_IMAGE_HEIGHT and re-encodes it (which drops EXIF, including GPS data).
+Smaller WebP/JPEG renditions and a thumbnail are written next to it so list
+views never have to ship the full-size photo.
+"""
+import io
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.utils.donation_cache import invalidate_donation
+
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+logger = logging.getLogger(__name__)
+
+
+class ImageRejected(ValueError):
+    pass
+
+
+def validate_upload(upload):
+    """Cheap checks that don't need the image decoded."""
+    max_bytes = getattr(settings, 'MAX_IMAGE_UPLOAD_SIZE', 5 * 1024 * 1024)
+    if upload.size > max_bytes:
+        raise ImageRejected(f"Image size cannot exceed {max_bytes // (1024 * 1024)}MB.")
+    ext = os.path.splitext(upload.name)[1].lstrip('.').lower()
+    if ext not in getattr(settings, 'ALLOWED_IMAGE_EXTENSIONS', ['jpg', 'jpeg', 'png', 'gif', 'webp']):
+        raise ImageRejected("Invalid file type.")
+
+
+def decode(source):
+    """Open, orient and flatten an image to RGB, bounded to the configured maximum."""
+    max_size = (getattr(settings, 'MAX_IMAGE_WIDTH', 4096), getattr(settings, 'MAX_IMAGE_HEIGHT', 4096))
+    try:
+        image = Image.open(source)
+        # Let the JPEG decoder skip work when the photo will be shrunk anyway
+        image.draft('RGB', max_size)
+        image = ImageOps.exif_transpose(image)
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ImageRejected(f"Not a valid image: {e}")
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    if image.width > max_size[0] or image.height > max_size[1]:
+        image.thumbnail(max_size, Image.LANCZOS, reducing_gap=2.0)
+    return image
+
+
+def encode(image, fmt):
+    pil_format, options = RENDITION_FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def build_renditions(image):
+    """Return ``(original_jpeg, thumbnail_jpeg, [(fmt, width, height, data), ...])``."""
+    widths = getattr(settings, 'IMAGE_RENDITION_WIDTHS', [320, 640, 1280])
+    thumb_size = getattr(settings, 'IMAGE_THUMBNAIL_SIZE', (240, 240))
+
+    renditions = []
+    # Largest first so each smaller size is resized from the previous one
+    source = image
+    for width in sorted((w for w in widths if w < image.width), reverse=True):
+        height = max(1, round(image.height * width / image.width))
+        source = source.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+        for fmt in RENDITION_FORMATS:
+            renditions.append((fmt, width, height, encode(source, fmt)))
+
+    thumbnail = source.copy()
+    thumbnail.thumbnail(thumb_size, Image.LANCZOS, reducing_gap=2.0)
+    return encode(image, 'jpeg'), encode(thumbnail, 'jpeg'), renditions
+
+
+def probe(upload):
+    """Read just the image header, rejecting files Pillow can't identify."""
+    try:
+        with Image.open(upload) as image:
+            size = image.size
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ImageRejected(f"Not a valid image: {e}")
+    finally:
+        upload.seek(0)
+    return size
+
+
+def store_upload(upload):
+    """Write an upload to storage untouched and return its name.
+
+    Uploads are streamed to a temporary file by Django, so for the default
+    file storage this is a rename rather than a copy. Callers check the
+    upload first (``validate_upload`` / ``probe``).
+    """
+    from core.models import DonationImage
+
+    field = DonationImage._meta.get_field('image')
+    return field.storage.save(field.generate_filename(None, upload.name), upload, max_length=field.max_length)
+
+
+def stage_upload(donation, upload):
+    """Store an upload untouched and queue it for processing."""
+    from core.models import DonationImage
+
+    validate_upload(upload)
+    probe(upload)
+    return DonationImage.objects.create(donation=donation, image=store_upload(upload))
+
+
+def save_files(stem, original, thumbnail, renditions):
+    """Write encoded files through the default storage; returns model field values."""
+    day = timezone.now().strftime('%Y/%m/%d')
+    return {
+        'image': default_storage.save(f"donations/{day}/{stem}.jpg", ContentFile(original)),
+        'thumbnail': default_storage.save(f"donations/thumbs/{day}/{stem}_thumb.jpg", ContentFile(thumbnail)),
+        'renditions': [
+            {
+                'format': fmt,
+                'width': width,
+                'height': height,
+                'name': default_storage.save(
+                    f"donations/renditions/{day}/{stem}_{width}.{FORMAT_EXTENSIONS[fmt]}", ContentFile(data)
+                ),
+            }
+            for fmt, width, height, data in renditions
+        ],
+    }
+
+
+# ================= PROCESSING QUEUE =================
+# DonationImage rows are the queue: uploads are PENDING until a worker from
+# ``manage.py process_images`` claims them. A claim is stamped with
+# ``claimed_at`` and only the holder of that exact claim may record results,
+# so a claim that outlived IMAGE_CLAIM_LEASE_SECONDS and was taken over by
+# another worker can't overwrite the newer outcome.
+
+def claim_images(batch_size):
+    """Mark up to ``batch_size`` pending images PROCESSING; returns ``(claimed_at, ids)``."""
+    from core.models import DonationImage
+
+    claimed_at = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            DonationImage.objects.select_for_update(skip_locked=True)
+            .filter(processing_state=DonationImage.PENDING)
+            .order_by('uploaded_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        DonationImage.objects.filter(id__in=ids).update(
+            processing_state=DonationImage.PROCESSING, claimed_at=claimed_at
+        )
+    return claimed_at, ids
+
+
+def process_image(image_id):
+    """Decode one image and write its renditions. Runs inside pool workers, so it returns plain data."""
+    from core.models import DonationImage
+
+    started = time.perf_counter()
+    try:
+        donation_image = DonationImage.objects.get(pk=image_id)
+        upload_name = donation_image.image.name
+        with default_storage.open(upload_name, 'rb') as source:
+            image = decode(source)
+        stem = os.path.splitext(os.path.basename(upload_name))[0] or 'image'
+        fields = save_files(stem, *build_renditions(image))
+        fields.update(width=image.width, height=image.height, upload=upload_name)
+    except Exception as e:
+        logger.error(f"Image processing failed for image {image_id}: {e}")
+        return image_id, False, int((time.perf_counter() - started) * 1000), str(e), {}
+    return image_id, True, int((time.perf_counter() - started) * 1000), '', fields
+
+
+def record_image_results(results, claimed_at):
+    """Persist ``process_image`` results for the claim made at ``claimed_at``.
+
+    Results for images no longer held under that claim are discarded along
+    with the files written for them. Returns the ids actually recorded.
+    """
+    from core.models import DonationImage
+
+    images = []
+    uploads = []
+    for image_id, ok, _ms, error, fields in results:
+        donation_image = DonationImage(pk=image_id, processing_state=DonationImage.FAILED, processing_error=error)
+        if ok:
+            uploads.append(fields.pop('upload'))
+            donation_image.processing_state = DonationImage.READY
+            for name, value in fields.items():
+                setattr(donation_image, name, value)
+        images.append(donation_image)
+
+    held = DonationImage.objects.filter(processing_state=DonationImage.PROCESSING, claimed_at=claimed_at)
+    with transaction.atomic():
+        # Lock this claim's rows so "held" can't change before the update
+        recorded = set(
+            held.select_for_update().filter(pk__in=[image.pk for image in images]).values_list('id', flat=True)
+        )
+        for state in (DonationImage.READY, DonationImage.FAILED):
+            batch = [image for image in images if image.processing_state == state and image.pk in recorded]
+            update_fields = ['processing_state', 'processing_error']
+            if state == DonationImage.READY:
+                update_fields += ['image', 'thumbnail', 'renditions', 'width', 'height']
+            held.bulk_update(batch, update_fields)
+
+    # bulk_update bypasses post_save, so retire cached donation payloads here
+    donation_ids = DonationImage.objects.filter(pk__in=recorded).values_list('donation_id', flat=True)
+    for donation_id in set(donation_ids):
+        invalidate_donation(donation_id)
+
+    for image, upload in zip((image for image in images if image.processing_state == DonationImage.READY), uploads):
+        if image.pk in recorded:
+            default_storage.delete(upload)
+        else:
+            # Another worker took this image over; our output is unused
+            for name in image.file_names():
+                default_storage.delete(name)
+            logger.warning(f"Discarded result for image {image.pk}: its claim expired and was taken over")
+    return recorded
+
+
+def requeue_stale_images():
+    """Return images whose claim has outlived IMAGE_CLAIM_LEASE_SECONDS to the queue.
+
+    Claims still within their lease belong to a live worker and are left alone.
+    """
+    from core.models import DonationImage
+
+    expired = timezone.now() - timedelta(seconds=getattr(settings, 'IMAGE_CLAIM_LEASE_SECONDS', 600))
+    return DonationImage.objects.filter(
+        Q(claimed_at__lt=expired) | Q(claimed_at__isnull=True),
+        processing_state=DonationImage.PROCESSING,
+    ).update(processing_state=DonationImage.PENDING)
@@ -0,0 +1,264 @@
+"""Daily pickup runs per district.
+
+Donations awaiting pickup on a day are grouped by district and geocoded
+against the bundled gazetteer (core/data/kerala_gazetteer.json): the area
+name is matched first, then any gazetteer place named in the pickup address,
+and failing both the stop is placed at the district centre and flagged.
+
+Each district is then solved as a capacity-bounded vehicle-routing problem
+from a depot at the district centre: runs are built nearest-neighbour (a
+grid index keeps each lookup close to constant time) and every run is
+tightened with 2-opt. Coordinates are projected to kilometres once, so
+distances are straight-line estimates, not road distances.
+"""
+import difflib
+import json
+import math
+import re
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+from core.models import Donation, DonationStatus, KERALA_DISTRICTS
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / 'data' / 'kerala_gazetteer.json'
+
+# Statuses whose items are still at the donor's address
+AWAITING_PICKUP = [DonationStatus.SUBMITTED, DonationStatus.CONFIRMED, DonationStatus.PICKUP_SCHEDULED]
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON = 111.320
+
+
+def _normalize(name):
+    return ' '.join(re.findall(r'[a-z]+', (name or '').lower()))
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer():
+    """``{district: {'centre': (lat, lon), 'areas': {normalized name: (lat, lon)}}}``."""
+    with open(GAZETTEER_PATH, encoding='utf-8') as handle:
+        raw = json.load(handle)
+    return {
+        district: {
+            'centre': tuple(entry['centre']),
+            'areas': {_normalize(name): tuple(point) for name, point in entry['areas'].items()},
+        }
+        for district, entry in raw.items()
+    }
+
+
+@lru_cache(maxsize=4096)
+def geocode(district, area, address=''):
+    """Return ``(lat, lon, matched)``; unmatched stops get the district centre."""
+    entry = load_gazetteer()[district]
+    areas = entry['areas']
+    area = _normalize(area)
+    if area in areas:
+        return (*areas[area], True)
+
+    # "Near Kakkanad junction", or the place only named in the address
+    for text in (area, _normalize(address)):
+        padded = f" {text} "
+        for name, point in areas.items():
+            if f" {name} " in padded:
+                return (*point, True)
+
+    close = difflib.get_close_matches(area, areas, n=1, cutoff=0.8) if area else []
+    if close:
+        return (*areas[close[0]], True)
+    return (*entry['centre'], False)
+
+
+# ================= SOLVER =================
+class _Grid:
+    """Uniform grid over projected points supporting nearest-alive lookups."""
+
+    def __init__(self, points):
+        xs = [x for x, _y in points]
+        ys = [y for _x, y in points]
+        self.min_x, self.min_y = min(xs), min(ys)
+        extent = max(max(xs) - self.min_x, max(ys) - self.min_y, 0.001)
+        # Aim for a couple of points per cell
+        self.size = max(extent / max(math.sqrt(len(points) / 2), 1), 0.05)
+        self.points = points
+        self.alive = bytearray(b'\x01') * len(points)
+        self.remaining = len(points)
+        self.cells = defaultdict(list)
+        for index, (x, y) in enumerate(points):
+            self.cells[self._cell(x, y)].append(index)
+        self.max_ring = int(extent / self.size) + 2
+
+    def _cell(self, x, y):
+        return int((x - self.min_x) // self.size), int((y - self.min_y) // self.size)
+
+    def remove(self, index):
+        self.alive[index] = 0
+        self.remaining -= 1
+
+    def _scan(self, key, x, y, best, best_index):
+        cell = self.cells.get(key)
+        if not cell:
+            return best, best_index
+        alive = self.alive
+        points = self.points
+        survivors = []
+        for index in cell:
+            if not alive[index]:
+                continue
+            survivors.append(index)
+            px, py = points[index]
+            distance = (px - x) ** 2 + (py - y) ** 2
+            if distance < best:
+                best, best_index = distance, index
+        # Compact while we're here so dead entries are skipped only once
+        if len(survivors) != len(cell):
+            self.cells[key] = survivors
+        return best, best_index
+
+    def nearest(self, x, y):
+        cx, cy = self._cell(x, y)
+        best, best_index = math.inf, None
+        for ring in range(self.max_ring + abs(cx) + abs(cy) + 1):
+            if ring == 0:
+                best, best_index = self._scan((cx, cy), x, y, best, best_index)
+            else:
+                for dx in range(-ring, ring + 1):
+                    best, best_index = self._scan((cx + dx, cy - ring), x, y, best, best_index)
+                    best, best_index = self._scan((cx + dx, cy + ring), x, y, best, best_index)
+                for dy in range(-ring + 1, ring):
+                    best, best_index = self._scan((cx - ring, cy + dy), x, y, best, best_index)
+                    best, best_index = self._scan((cx + ring, cy + dy), x, y, best, best_index)
+            # Anything in a further ring is at least ``ring * size`` away
+            if best_index is not None and best <= (ring * self.size) ** 2:
+                break
+        return best_index
+
+
+def _tour_length(tour, points, depot):
+    length = 0.0
+    x, y = depot
+    for index in tour:
+        px, py = points[index]
+        length += math.hypot(px - x, py - y)
+        x, y = px, py
+    return length + math.hypot(depot[0] - x, depot[1] - y)
+
+
+def _two_opt(tour, points, depot, max_passes=50):
+    """Reverse segments of depot -> tour -> depot while that shortens it."""
+    nodes = [depot] + [points[index] for index in tour] + [depot]
+    order = list(range(len(nodes)))
+    size = len(nodes)
+    dist = [[math.hypot(ax - bx, ay - by) for bx, by in nodes] for ax, ay in nodes]
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, size - 2):
+            a, b = order[i - 1], order[i]
+            row_a, row_b = dist[a], dist[b]
+            for j in range(i + 1, size - 1):
+                c, d = order[j], order[j + 1]
+                if row_a[c] + row_b[d] < row_a[b] + dist[c][d] - 1e-9:
+                    order[i:j + 1] = order[j:i - 1:-1]
+                    a, b = order[i - 1], order[i]
+                    row_a, row_b = dist[a], dist[b]
+                    improved = True
+        if not improved:
+            break
+    return [tour[position - 1] for position in order[1:-1]]
+
+
+def solve_runs(points, depot, capacity, improve=True):
+    """Split ``points`` (km coordinates) into runs of at most ``capacity`` stops.
+
+    Returns a list of runs, each a list of indices into ``points`` in visiting
+    order, starting and ending at ``depot``.
+    """
+    if not points:
+        return []
+    grid = _Grid(points)
+    runs = []
+    while grid.remaining:
+        run = []
+        x, y = depot
+        while grid.remaining and len(run) < capacity:
+            index = grid.nearest(x, y)
+            grid.remove(index)
+            run.append(index)
+            x, y = points[index]
+        runs.append(_two_opt(run, points, depot) if improve and len(run) > 2 else run)
+    return runs
+
+
+def _projector(lat0):
+    scale = math.cos(math.radians(lat0)) * KM_PER_DEGREE_LON
+
+    def project(lat, lon):
+        return lon * scale, lat * KM_PER_DEGREE_LAT
+    return project
+
+
+def plan_district(district, stops, capacity, improve=True):
+    """Plan runs for one district.
+
+    ``stops`` are dicts with at least ``lat`` and ``lon``; they are returned
+    grouped into runs in visiting order.
+    """
+    centre = load_gazetteer()[district]['centre']
+    project = _projector(centre[0])
+    depot = project(*centre)
+    points = [project(stop['lat'], stop['lon']) for stop in stops]
+    runs = []
+    for run in solve_runs(points, depot, capacity, improve=improve):
+        runs.append({
+            'distance_km': round(_tour_length(run, points, depot), 2),
+            'stops': [stops[index] for index in run],
+        })
+    return {
+        'district': district,
+        'depot': {'lat': centre[0], 'lon': centre[1]},
+        'distance_km': round(sum(run['distance_km'] for run in runs), 2),
+        'runs': runs,
+    }
+
+
+def plan_pickups(day, district=None, capacity=None):
+    """Plan the pickup runs for ``day``, for one district or all of them."""
+    capacity = capacity or getattr(settings, 'PICKUP_RUN_CAPACITY', 25)
+    donations = (
+        Donation.objects.filter(pickup_date=day, status__in=AWAITING_PICKUP)
+        .order_by('id')
+        .values('id', 'district', 'area', 'pickup_address', 'status')
+    )
+    if district:
+        donations = donations.filter(district=district)
+
+    by_district = defaultdict(list)
+    unrouted = []
+    for donation in donations:
+        if donation['district'] not in load_gazetteer():
+            unrouted.append(donation['id'])
+            continue
+        lat, lon, matched = geocode(donation['district'], donation['area'] or '', donation['pickup_address'] or '')
+        by_district[donation['district']].append({
+            'donation_id': donation['id'],
+            'status': donation['status'],
+            'area': donation['area'],
+            'pickup_address': donation['pickup_address'],
+            'lat': lat,
+            'lon': lon,
+            'geocoded': matched,
+        })
+
+    order = [name for name, _label in KERALA_DISTRICTS]
+    return {
+        'date': day.isoformat(),
+        'capacity': capacity,
+        'districts': [
+            plan_district(name, by_district[name], capacity)
+            for name in order if by_district.get(name)
+        ],
+        'unrouted': unrouted,
+    }
@@ -0,0 +1,79 @@
+"""Pickup capacity per district and day.
+
+Each (district, day) has one PickupSlot row holding its capacity and a
+``booked`` counter. That row is the availability index: "how many pickups can
+Ernakulam still take next week" is one range read on the unique
+(district, day) index, with no counting over donations. Rows are created on
+first use with the default capacity (PICKUP_SLOT_CAPACITY, overridable per
+district) or ahead of time with ``manage.py open_pickup_slots``.
+
+Places are booked with a conditional ``UPDATE ... SET booked = booked + n
+WHERE booked <= capacity - n`` (PickupSlot.take), never read-modify-write, so
+concurrent bookings serialize on the slot row and can't overfill it. A
+donation moving to PICKUP_SCHEDULED gets the first day with room, starting
+at its requested pickup date (or today), within PICKUP_SLOT_HORIZON_DAYS.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import PickupSlot
+
+
+def horizon_days():
+    return getattr(settings, 'PICKUP_SLOT_HORIZON_DAYS', 14)
+
+
+def assign_slots(rows):
+    """Book one place for each ``(donation_id, district, preferred_day)``.
+
+    Returns ``{donation_id: (slot_id, day)}``. Donations left out have no
+    district or found no free place within the horizon. Call this inside the
+    transaction that schedules them, so a rollback gives the places back.
+    """
+    today = timezone.localdate()
+    groups = defaultdict(list)
+    for pk, district, preferred in rows:
+        if district:
+            groups[(district, max(preferred or today, today))].append(pk)
+
+    assigned = {}
+    # Slot rows are locked in (district, day) order, so concurrent bookings
+    # can't deadlock on each other
+    for (district, start), pks in sorted(groups.items()):
+        days = [start + timedelta(days=offset) for offset in range(horizon_days())]
+        for slot in PickupSlot.open(district, days):
+            if not pks:
+                break
+            if not slot.available:
+                continue
+            taken = PickupSlot.take(slot.pk, min(len(pks), slot.available))
+            for pk in pks[:taken]:
+                assigned[pk] = (slot.pk, slot.day)
+            pks = pks[taken:]
+    return assigned
+
+
+def availability(district, start, days):
+    """Capacity, booked and free places for ``district`` on each of ``days`` days from ``start``."""
+    slots = {
+        day: (capacity, booked)
+        for day, capacity, booked in PickupSlot.objects.filter(
+            district=district, day__gte=start, day__lt=start + timedelta(days=days)
+        ).values_list('day', 'capacity', 'booked')
+    }
+    # Days nobody has booked yet have no row
+    unopened = (PickupSlot.default_capacity(district), 0)
+    result = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        capacity, booked = slots.get(day, unopened)
+        result.append({
+            'date': day.isoformat(),
+            'capacity': capacity,
+            'booked': booked,
+            'available': max(capacity - booked, 0),
+        })
+    return result
@@ -0,0 +1,165 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+
+from core.utils.receipt_pdf import (
+    RECEIPT_TEMPLATE, receipt_cache_path, receipt_context, receipt_key, render_pdf_bytes, store_receipt,
+)
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_render_worker():
+    django.setup()
+
+
+def _render_in_worker(context):
+    return render_pdf_bytes(RECEIPT_TEMPLATE, context)
+
+
+def get_render_pool():
+    """Shared process pool for receipt rendering, or None to render inline.
+
+    Uses 'spawn' so workers never inherit the web process's database sockets;
+    they only ever receive template contexts.
+    """
+    global _pool
+    processes = getattr(settings, 'RECEIPT_EXPORT_PROCESSES', os.cpu_count() or 1)
+    if processes <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_render_worker,
+            )
+    return _pool
+
+
+def _discard_pool(pool):
+    """Drop a pool whose worker died so the next export starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_inline(donation):
+    """Render one receipt in this process; None (logged) if it can't be rendered."""
+    try:
+        return render_pdf_bytes(RECEIPT_TEMPLATE, receipt_context(donation))
+    except Exception:
+        logger.exception(f"Receipt for donation {donation.id} could not be rendered; left out of the export")
+        return None
+
+
+class _ZipStream:
+    """Write-only, non-seekable sink that hands buffered bytes to a generator."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_receipts_zip(donations, chunk_size=64 * 1024):
+    """Yield a ZIP archive of the donations' receipts piece by piece.
+
+    Cached PDFs are copied straight from disk; missing ones are rendered in
+    the process pool with at most RECEIPT_EXPORT_MAX_IN_FLIGHT outstanding,
+    so memory stays bounded regardless of how many receipts are exported.
+    A receipt the pool fails to render is retried in-process, and left out
+    (with a logged error) if that fails too, so the archive stays valid.
+    """
+    return (chunk for chunk in _zip_chunks(donations, chunk_size) if chunk)
+
+
+def _zip_chunks(donations, chunk_size):
+    pool = get_render_pool()
+    max_in_flight = getattr(settings, 'RECEIPT_EXPORT_MAX_IN_FLIGHT', 16)
+    stream = _ZipStream()
+    pending = {}
+
+    def entry_name(donation):
+        return f"receipt_{donation.receipt_number or donation.id}.pdf"
+
+    def add(donation, key, data):
+        if data is not None:
+            store_receipt(key, data)
+            archive.writestr(entry_name(donation), data)
+
+    def finish(future):
+        nonlocal pool
+        donation, key = pending.pop(future)
+        try:
+            data = future.result()
+        except Exception as e:
+            logger.warning(f"Pool render of receipt for donation {donation.id} failed ({e!r}); rendering inline")
+            if isinstance(e, BrokenProcessPool) and pool is not None:
+                _discard_pool(pool)
+                pool = None
+            data = _render_inline(donation)
+        add(donation, key, data)
+
+    try:
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for donation in donations:
+                key = receipt_key(donation)
+                path = receipt_cache_path(key)
+                if path.exists():
+                    with open(path, 'rb') as source, archive.open(entry_name(donation), 'w') as target:
+                        shutil.copyfileobj(source, target, chunk_size)
+                elif pool is None:
+                    add(donation, key, _render_inline(donation))
+                else:
+                    try:
+                        pending[pool.submit(_render_in_worker, receipt_context(donation))] = (donation, key)
+                    except BrokenProcessPool:
+                        _discard_pool(pool)
+                        pool = None
+                        add(donation, key, _render_inline(donation))
+                    while len(pending) >= max_in_flight:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(future)
+                            yield stream.drain()
+                yield stream.drain()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+                    yield stream.drain()
+        yield stream.drain()
+    finally:
+        # Client went away or the export failed: don't leave renders queued
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,125 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import DonationStatus, ReceiptRenderJob
+from core.utils.receipt_pdf import prerender_receipt
+
+logger = logging.getLogger(__name__)
+
+
+def prerenders_receipt(status):
+    """Whether a move to ``status`` queues a receipt pre-render.
+
+    The receipt shows the status, so every move makes a new one. Only the
+    receipts donors keep are worth rendering ahead; intermediate ones are
+    superseded before anyone downloads them and render on demand if they do.
+    """
+    default = (DonationStatus.DELIVERED, DonationStatus.COMPLETED)
+    return status in getattr(settings, 'RECEIPT_PRERENDER_STATUSES', default)
+
+
+def enqueue_receipt_render(donation):
+    """Queue a pre-render of the donation's receipt unless one is already waiting."""
+    pending = ReceiptRenderJob.objects.filter(donation=donation, status=ReceiptRenderJob.PENDING)
+    if not pending.exists():
+        ReceiptRenderJob.objects.create(donation=donation)
+
+
+def enqueue_receipt_renders(donation_ids, batch_size=1000):
+    """``enqueue_receipt_render`` for many donations in a few set-based queries."""
+    donation_ids = list(donation_ids)
+    for offset in range(0, len(donation_ids), batch_size):
+        chunk = donation_ids[offset:offset + batch_size]
+        pending = set(
+            ReceiptRenderJob.objects.filter(donation_id__in=chunk, status=ReceiptRenderJob.PENDING)
+            .values_list('donation_id', flat=True)
+        )
+        ReceiptRenderJob.objects.bulk_create(
+            [ReceiptRenderJob(donation_id=donation_id) for donation_id in chunk if donation_id not in pending]
+        )
+
+
+def claim_jobs(batch_size):
+    """Mark up to ``batch_size`` pending jobs RUNNING; returns ``(claimed_at, ids)``.
+
+    Only the holder of that claim may record results (see ``record_results``).
+    """
+    claimed_at = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            ReceiptRenderJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ReceiptRenderJob.PENDING)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        ReceiptRenderJob.objects.filter(id__in=ids).update(status=ReceiptRenderJob.RUNNING, claimed_at=claimed_at)
+    return claimed_at, ids
+
+
+def render_job(job_id):
+    """Render one job's receipt. Runs inside pool workers, so it returns plain data."""
+    started = time.perf_counter()
+    try:
+        job = ReceiptRenderJob.objects.select_related('donation__donor').get(pk=job_id)
+        prerender_receipt(job.donation)
+    except Exception as e:
+        logger.error(f"Receipt pre-render failed for job {job_id}: {e}")
+        return job_id, False, int((time.perf_counter() - started) * 1000), str(e)
+    return job_id, True, int((time.perf_counter() - started) * 1000), ''
+
+
+def record_results(results, claimed_at):
+    """Persist ``render_job`` results in one bulk update.
+
+    Jobs taken over by another worker since ``claimed_at`` are left alone.
+    Returns how many jobs were recorded.
+    """
+    now = timezone.now()
+    jobs = [
+        ReceiptRenderJob(
+            pk=job_id,
+            status=ReceiptRenderJob.DONE if ok else ReceiptRenderJob.FAILED,
+            finished_at=now,
+            render_ms=render_ms,
+            error=error,
+        )
+        for job_id, ok, render_ms, error in results
+    ]
+    return ReceiptRenderJob.objects.filter(status=ReceiptRenderJob.RUNNING, claimed_at=claimed_at).bulk_update(
+        jobs, ['status', 'finished_at', 'render_ms', 'error']
+    )
+
+
+def requeue_stale_jobs():
+    """Return jobs whose claim has outlived RECEIPT_JOB_LEASE_SECONDS to the queue.
+
+    Claims still within their lease belong to a live worker and are left alone.
+    """
+    expired = timezone.now() - timedelta(seconds=getattr(settings, 'RECEIPT_JOB_LEASE_SECONDS', 300))
+    return ReceiptRenderJob.objects.filter(
+        Q(claimed_at__lt=expired) | Q(claimed_at__isnull=True),
+        status=ReceiptRenderJob.RUNNING,
+    ).update(status=ReceiptRenderJob.PENDING)
+
+
+def receipt_queue_metrics(sample=100):
+    """Queue depth by state plus render-time stats over the latest finished jobs."""
+    metrics = ReceiptRenderJob.objects.order_by().aggregate(
+        pending=Count('id', filter=Q(status=ReceiptRenderJob.PENDING)),
+        running=Count('id', filter=Q(status=ReceiptRenderJob.RUNNING)),
+        failed=Count('id', filter=Q(status=ReceiptRenderJob.FAILED)),
+    )
+    timings = sorted(
+        ReceiptRenderJob.objects.filter(status=ReceiptRenderJob.DONE)
+        .order_by('-finished_at')
+        .values_list('render_ms', flat=True)[:sample]
+    )
+    metrics['render_ms_avg'] = round(sum(timings) / len(timings), 1) if timings else None
+    metrics['render_ms_p95'] = timings[int(0.95 * (len(timings) - 1))] if timings else None
+    return metrics
@@ -1,10 +1,26 @@
+import hashlib
+import io
 import logging
-from django.http import HttpResponse
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
 from django.template.loader import get_template
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from xhtml2pdf import pisa
 
 logger = logging.getLogger(__name__)
 
+
+class PDFRenderError(Exception):
+    pass
+
+
 def render_to_pdf(template_src, context):
     """Render HTML template to PDF and return HTTP response."""
     logger.info(f"[PDF-UTILS] Starting PDF generation with context keys: {list(context.keys())}")
@@ -37,3 +53,155 @@ def render_to_pdf(template_src, context):
     
     logger.info(f"[PDF-UTILS] PDF generated successfully")
     return response
+
+
+def html_to_pdf_bytes(html):
+    """Convert rendered HTML to PDF bytes, raising PDFRenderError on failure."""
+    buffer = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=buffer)
+    if pisa_status.err:
+        raise PDFRenderError(f"PDF generation had {pisa_status.err} error(s)")
+    return buffer.getvalue()
+
+
+def render_pdf_bytes(template_src, context):
+    """Render a template straight to PDF bytes."""
+    return html_to_pdf_bytes(get_template(template_src).render(context))
+
+
+# ================= DONATION RECEIPT =================
+RECEIPT_TEMPLATE = 'admin/receipt_pdf.html'
+
+
+def receipt_context(donation):
+    """Template context for the donor-facing receipt PDF."""
+    return {
+        'donation': donation,
+        'donation_id': donation.id,
+        'receipt_number': donation.receipt_number,
+        'donor_name': donation.donor.username,
+        'category': donation.category,
+        'description': donation.description,
+        'area': donation.area,
+        'district': donation.district,
+        'status': donation.get_status_display(),
+        'pickup_date': donation.pickup_date,
+        'created_at': donation.created_at,
+    }
+
+
+def receipt_key(donation):
+    return receipt_cache_key(RECEIPT_TEMPLATE, donation)
+
+
+def render_receipt_bytes(donation):
+    return render_pdf_bytes(RECEIPT_TEMPLATE, receipt_context(donation))
+
+
+def prerender_receipt(donation):
+    """Make sure the donation's current receipt is cached. Returns True if it rendered."""
+    key = receipt_key(donation)
+    if receipt_cache_path(key).exists():
+        return False
+    store_receipt(key, render_receipt_bytes(donation))
+    return True
+
+
+# ================= RECEIPT CACHE =================
+# Rendered receipts are stored on disk under a key derived from everything
+# that affects their content, so a repeat download is a file read and any
+# status change or template bump naturally produces a new entry.
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def receipt_cache_dir():
+    return Path(getattr(settings, 'RECEIPT_CACHE_DIR', Path(settings.BASE_DIR) / 'receipt_cache'))
+
+
+def receipt_cache_key(template_src, donation, *extra):
+    """Key for a donation's rendered receipt; doubles as its ETag."""
+    parts = [
+        template_src,
+        donation.receipt_number or '',
+        donation.status,
+        donation.updated_at.isoformat() if donation.updated_at else '',
+        str(getattr(settings, 'RECEIPT_TEMPLATE_VERSION', 1)),
+        *[str(part) for part in extra],
+    ]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def receipt_cache_path(key):
+    return receipt_cache_dir() / key[:2] / f"{key}.pdf"
+
+
+def store_receipt(key, data):
+    """Atomically write ``data`` into the cache and return its path."""
+    path = receipt_cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(data)
+    os.replace(tmp, path)
+    maybe_prune_receipt_cache()
+    return path
+
+
+def get_or_render_receipt(key, render):
+    """Return the cached receipt path for ``key``, calling ``render()`` on a miss."""
+    path = receipt_cache_path(key)
+    if path.exists():
+        # Refresh mtime so pruning only drops receipts nobody downloads
+        path.touch()
+        return path
+    return store_receipt(key, render())
+
+
+def prune_receipt_cache(max_age=None):
+    """Delete cached receipts not used within ``max_age`` seconds. Returns count."""
+    if max_age is None:
+        max_age = getattr(settings, 'RECEIPT_CACHE_MAX_AGE', 30 * 24 * 3600)
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in receipt_cache_dir().glob('*/*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def maybe_prune_receipt_cache():
+    """Prune the cache in a background thread at most once per interval."""
+    global _last_prune
+    interval = getattr(settings, 'RECEIPT_CACHE_PRUNE_INTERVAL', 3600)
+    with _prune_lock:
+        if time.monotonic() - _last_prune < interval:
+            return
+        _last_prune = time.monotonic()
+    threading.Thread(target=prune_receipt_cache, name='receipt-cache-prune', daemon=True).start()
+
+
+def cached_pdf_response(request, key, last_modified, filename, render):
+    """Serve a cached receipt with ETag / Last-Modified and 304 support."""
+    etag = f'"{key}"'
+    last_modified = last_modified.timestamp() if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        path = get_or_render_receipt(key, render)
+        response = FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=filename,
+            content_type='application/pdf',
+        )
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,144 @@
+"""In-process pub/sub for donation status transitions.
+
+Donation.save publishes after commit; each open event stream holds one
+Subscription. An event is encoded to its SSE frame once, and only if anyone
+is listening; the same bytes object is handed to every subscriber, and each
+subscriber keeps at most EVENT_STREAM_QUEUE_SIZE frames (oldest dropped
+first), so a connection costs a small, fixed amount of memory no matter how
+busy the site is.
+
+Only streams served by this process see its events; run the ASGI server with
+one process per host or put a shared broker in front when scaling out.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+_event_ids = itertools.count(1)
+
+
+def format_event(payload, event='status', event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(payload, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscription:
+    __slots__ = ('loop', 'queue', 'keys')
+
+    def __init__(self, keys, maxsize):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.keys = keys
+
+    def offer(self, frame):
+        """Queue a frame, dropping the oldest one if the client is lagging."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class StatusBroker:
+    """Subscriptions of the streams open in this process.
+
+    Per-process only: a transition written by another process (a management
+    command, another server worker) is never seen here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, keys):
+        subscription = Subscription(tuple(keys), getattr(settings, 'EVENT_STREAM_QUEUE_SIZE', 8))
+        with self._lock:
+            for key in subscription.keys:
+                self._subscribers[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
+
+    def has_subscribers(self, keys):
+        with self._lock:
+            return any(key in self._subscribers for key in keys)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+    def publish(self, keys, frame):
+        """Fan a frame out to every subscriber of any of ``keys``. Safe from any thread."""
+        with self._lock:
+            targets = set()
+            for key in keys:
+                targets.update(self._subscribers.get(key, ()))
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, frame)
+            except RuntimeError:
+                # The subscriber's event loop has closed
+                self.unsubscribe(subscription)
+
+
+broker = StatusBroker()
+
+
+def donation_key(donation_id):
+    return ('donation', donation_id)
+
+
+def donor_key(donor_id):
+    return ('donor', donor_id)
+
+
+def status_payload(donation, previous=None):
+    return {
+        'donation_id': donation.pk,
+        'status': donation.status,
+        'status_display': donation.get_status_display(),
+        'previous': previous,
+        'at': timezone.now().isoformat(),
+    }
+
+
+def publish_status_change(donation, previous):
+    """Publish the transition once the surrounding transaction commits."""
+    publish_status_changes([(donation, previous)])
+
+
+def publish_status_changes(changes):
+    """Publish ``(donation, previous)`` transitions with a single on-commit hook.
+
+    Frames are only encoded for donations somebody is subscribed to.
+    """
+    messages = [
+        ([donation_key(donation.pk), donor_key(donation.donor_id)], status_payload(donation, previous))
+        for donation, previous in changes
+    ]
+
+    def publish():
+        for keys, payload in messages:
+            if broker.has_subscribers(keys):
+                broker.publish(keys, format_event(payload, event_id=next(_event_ids)))
+
+    if messages:
+        transaction.on_commit(publish)
@@ -0,0 +1,270 @@
+"""The one place donation status changes are written.
+
+A transition is a compare-and-set ``UPDATE ... WHERE id = %s AND status =
+<old>`` plus a tracking upsert, in one transaction. If the caller did not
+already lock and read the row, it is read with ``select_for_update`` first.
+The event log, status counters, receipt pre-render, payload cache and event
+stream are all updated from here so the call sites can't drift apart.
+
+``bulk_transition`` does the same for many donations at once with set-based
+statements: one locking read, one UPDATE per source status and bulk tracking
+and event writes per chunk of BULK_STATUS_CHUNK_SIZE ids.
+
+Moving to PICKUP_SCHEDULED books a pickup slot (core/utils/pickup_slots.py)
+in the same transaction and may move ``pickup_date`` to the first day with
+room; going back to CONFIRMED or to CANCELLED gives the place back.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import (
+    Donation, DonationStatus, DonationStatusCounter, DonationStatusEvent, DonationTracking, PickupSlot,
+)
+from core.utils.donation_cache import invalidate_donation, invalidate_donations
+from core.utils.pickup_slots import assign_slots, horizon_days
+from core.utils.receipt_jobs import enqueue_receipt_render, enqueue_receipt_renders, prerenders_receipt
+from core.utils.status_events import publish_status_change, publish_status_changes
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class TransitionConflict(InvalidTransition):
+    """The donation's status changed under us."""
+
+
+def _legal_transitions():
+    transitions = {}
+    for idx, status in enumerate(DonationStatus.ORDER):
+        allowed = set(DonationStatus.ORDER[idx + 1:])
+        if status not in DonationStatus.TERMINAL:
+            allowed.add(DonationStatus.CANCELLED)
+        transitions[status] = allowed
+    # Re-scheduling a pickup
+    transitions[DonationStatus.PICKUP_SCHEDULED].add(DonationStatus.CONFIRMED)
+    transitions[DonationStatus.CANCELLED] = set()
+    return transitions
+
+
+LEGAL_TRANSITIONS = _legal_transitions()
+
+# Leaving PICKUP_SCHEDULED for one of these frees the booked pickup slot
+RELEASES_SLOT = {DonationStatus.CONFIRMED, DonationStatus.CANCELLED}
+
+
+def check_transition(old, new):
+    if new not in DonationStatus.LABELS:
+        raise InvalidTransition(f"Unknown status {new!r}.")
+    if new not in LEGAL_TRANSITIONS.get(old, ()):
+        raise InvalidTransition(
+            f"Cannot change status from {DonationStatus.LABELS.get(old, old)} "
+            f"to {DonationStatus.LABELS[new]}."
+        )
+
+
+def _no_slot_error(district, day):
+    if not district:
+        return "Set a district before scheduling a pickup."
+    return f"No pickup slot free in {district} within {horizon_days()} days of {day}."
+
+
+def _slot_fields(donation, old, new, fields):
+    """Book or free ``donation``'s pickup slot; returns the columns to write with the move."""
+    if new == DonationStatus.PICKUP_SCHEDULED:
+        preferred = fields.get('pickup_date', donation.pickup_date)
+        assigned = assign_slots([(donation.pk, donation.district, preferred)])
+        if donation.pk not in assigned:
+            raise InvalidTransition(_no_slot_error(donation.district, preferred))
+        slot_id, day = assigned[donation.pk]
+        return {'pickup_slot_id': slot_id, 'pickup_date': day}
+    if old == DonationStatus.PICKUP_SCHEDULED and new in RELEASES_SLOT and donation.pickup_slot_id:
+        PickupSlot.release(donation.pickup_slot_id)
+        return {'pickup_slot_id': None}
+    return {}
+
+
+def transition(donation, new_status, actor=None, expected=None, fields=None, render_receipt=True):
+    """Move ``donation`` to ``new_status`` and return it updated in memory.
+
+    ``expected`` is the status the caller believes the donation has. When it
+    is given (for instance because the row was already read under
+    ``select_for_update``) no extra read is made; otherwise the row is
+    locked and read first. ``fields`` are extra column values written by the
+    same UPDATE, e.g. ``{'otp_verified': True}``. When ``expected`` is given
+    the donation's ``district``, ``pickup_date`` and ``pickup_slot_id`` are
+    taken as they are in memory.
+
+    Raises InvalidTransition for illegal moves and TransitionConflict when
+    another writer changed the status first.
+    """
+    fields = dict(fields or {})
+    with transaction.atomic():
+        if expected is None:
+            expected, donation.district, donation.pickup_date, donation.pickup_slot_id = (
+                Donation.objects.select_for_update()
+                .values_list('status', 'district', 'pickup_date', 'pickup_slot_id')
+                .get(pk=donation.pk)
+            )
+        check_transition(expected, new_status)
+        # A failed move below rolls the booking back with everything else
+        fields.update(_slot_fields(donation, expected, new_status, fields))
+
+        now = timezone.now()
+        updated = Donation.objects.filter(pk=donation.pk, status=expected).update(
+            status=new_status, updated_at=now, **fields
+        )
+        if not updated:
+            current = Donation.objects.filter(pk=donation.pk).values_list('status', flat=True).first()
+            raise TransitionConflict(
+                f"Donation #{donation.pk} is now {DonationStatus.LABELS.get(current, current)}; "
+                f"expected {DonationStatus.LABELS.get(expected, expected)}."
+            )
+
+        DonationTracking.objects.bulk_create(
+            [DonationTracking(donation_id=donation.pk, current_status=new_status, updated_at=now)],
+            update_conflicts=True,
+            unique_fields=['donation'],
+            update_fields=['current_status', 'updated_at'],
+        )
+
+        # Bookkeeping that Donation.save would otherwise do
+        DonationStatusEvent.objects.create(donation_id=donation.pk, status=new_status, actor=actor, created_at=now)
+        DonationStatusCounter.adjust({new_status: 1, expected: -1})
+
+        donation.status = new_status
+        donation.updated_at = now
+        donation._loaded_status = new_status
+        for name, value in fields.items():
+            setattr(donation, name, value)
+
+        invalidate_donation(donation.pk)
+        publish_status_change(donation, expected)
+        if render_receipt and prerenders_receipt(new_status):
+            enqueue_receipt_render(donation)
+    return donation
+
+
+def _chunks(items, size):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def bulk_transition(donation_ids, new_status, actor=None, render_receipts=True):
+    """Move every donation in ``donation_ids`` to ``new_status`` in one transaction.
+
+    Donations that don't exist or can't legally make the move are skipped,
+    not fatal. Returns one result per distinct id, in the order given:
+    ``{'id', 'ok', 'previous', 'status', 'error'}``.
+    """
+    if new_status not in DonationStatus.LABELS:
+        raise InvalidTransition(f"Unknown status {new_status!r}.")
+    chunk_size = getattr(settings, 'BULK_STATUS_CHUNK_SIZE', 1000)
+    ids = list(dict.fromkeys(donation_ids))
+    results = {}
+
+    with transaction.atomic():
+        rows = {}
+        for chunk in _chunks(ids, chunk_size):
+            locked = (
+                Donation.objects.select_for_update()
+                .filter(pk__in=chunk)
+                .values_list('id', 'status', 'donor_id', 'district', 'pickup_date', 'pickup_slot_id')
+            )
+            rows.update((row[0], row[1:]) for row in locked)
+
+        legal = []
+        for pk in ids:
+            if pk not in rows:
+                results[pk] = {'id': pk, 'ok': False, 'previous': None, 'status': None,
+                               'error': "Donation not found."}
+                continue
+            old_status = rows[pk][0]
+            try:
+                check_transition(old_status, new_status)
+            except InvalidTransition as e:
+                results[pk] = {'id': pk, 'ok': False, 'previous': old_status, 'status': old_status,
+                               'error': str(e)}
+                continue
+            legal.append(pk)
+
+        scheduling = new_status == DonationStatus.PICKUP_SCHEDULED
+        releasing = new_status in RELEASES_SLOT
+        slots = assign_slots([(pk, rows[pk][2], rows[pk][3]) for pk in legal]) if scheduling else {}
+
+        # One UPDATE per source status, and per booked slot when scheduling
+        groups = defaultdict(list)
+        for pk in legal:
+            old_status = rows[pk][0]
+            if scheduling and pk not in slots:
+                results[pk] = {'id': pk, 'ok': False, 'previous': old_status, 'status': old_status,
+                               'error': _no_slot_error(rows[pk][2], rows[pk][3])}
+                continue
+            groups[(old_status, slots.get(pk))].append(pk)
+
+        now = timezone.now()
+        moved = []
+        deltas = defaultdict(int)
+        for (old_status, slot), pks in groups.items():
+            values = {'status': new_status, 'updated_at': now}
+            if slot:
+                values.update(pickup_slot_id=slot[0], pickup_date=slot[1])
+            elif releasing and old_status == DonationStatus.PICKUP_SCHEDULED:
+                values['pickup_slot_id'] = None
+            current = set()
+            for chunk in _chunks(pks, chunk_size):
+                updated = Donation.objects.filter(pk__in=chunk, status=old_status).update(**values)
+                if updated == len(chunk):
+                    current.update(chunk)
+                else:
+                    # Only reachable on backends without row locks
+                    current.update(
+                        Donation.objects.filter(pk__in=chunk, status=new_status, updated_at=now)
+                        .values_list('id', flat=True)
+                    )
+            for pk in pks:
+                if pk in current:
+                    moved.append((pk, old_status))
+                    results[pk] = {'id': pk, 'ok': True, 'previous': old_status, 'status': new_status,
+                                   'error': ''}
+                else:
+                    results[pk] = {'id': pk, 'ok': False, 'previous': old_status, 'status': None,
+                                   'error': "Status changed by another update."}
+            deltas[old_status] -= len(current)
+            deltas[new_status] += len(current)
+
+        moved_ids = [pk for pk, _old in moved]
+        # Places booked for rows that didn't move, and places the moved rows gave up
+        freed = Counter(slots[pk][0] for pk in slots.keys() - set(moved_ids))
+        if releasing:
+            freed.update(
+                rows[pk][4] for pk, old_status in moved
+                if old_status == DonationStatus.PICKUP_SCHEDULED and rows[pk][4]
+            )
+        for slot_id, count in freed.items():
+            PickupSlot.release(slot_id, count)
+
+        DonationTracking.objects.bulk_create(
+            [DonationTracking(donation_id=pk, current_status=new_status, updated_at=now) for pk in moved_ids],
+            batch_size=chunk_size,
+            update_conflicts=True,
+            unique_fields=['donation'],
+            update_fields=['current_status', 'updated_at'],
+        )
+        DonationStatusEvent.objects.bulk_create(
+            [DonationStatusEvent(donation_id=pk, status=new_status, actor=actor, created_at=now) for pk in moved_ids],
+            batch_size=chunk_size,
+        )
+        DonationStatusCounter.adjust(deltas)
+
+        invalidate_donations(moved_ids)
+        publish_status_changes(
+            (Donation(pk=pk, donor_id=rows[pk][1], status=new_status), old_status) for pk, old_status in moved
+        )
+        if render_receipts and prerenders_receipt(new_status):
+            enqueue_receipt_renders(moved_ids)
+
+    return [results[pk] for pk in ids]
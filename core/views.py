@@ -3,7 +3,6 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponseForbidden, HttpResponse
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils import timezone
 from django.template.loader import render_to_string
 from decimal import Decimal
@@ -11,9 +10,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-from .models import Donation, DonationImage, DonationTracking, DonationStatus, KERALA_DISTRICTS
+from .models import Donation, DonationImage, DonationStatus, KERALA_DISTRICTS
 from .forms import RegisterForm, DonationForm
-from .utils.receipt_pdf import render_to_pdf
+from .utils.category_classifier import normalize, suggest_category
+from .utils.receipt_pdf import cached_pdf_response, html_to_pdf_bytes, receipt_cache_key
+from .utils.status_transitions import InvalidTransition, transition
 
 
 # ================= HOME =================
@@ -44,62 +45,10 @@ def my_donations(request):
 
 
 # ================= AI CATEGORY =================
-def ai_category(request):
+async def ai_category(request):
     """AI-powered category suggestion based on description."""
-    description = request.GET.get('description', '').lower()
-    
-    fallback = "Household Items"
-    if not description:
-        return JsonResponse({"category": fallback})
-    
-    if "book" in description:
-        fallback = "Books"
-    elif "toy" in description:
-        fallback = "Toys"
-    elif "laptop" in description or "mobile" in description:
-        fallback = "Electronics"
-    elif "shoe" in description:
-        fallback = "Footwear"
-    elif "shirt" in description or "pant" in description:
-        fallback = "Clothes"
-    elif "table" in description or "chair" in description:
-        fallback = "Furniture"
-    
-    try:
-        import google.generativeai as genai
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        
-        prompt = (
-            "Choose ONE category from this list ONLY:\n"
-            "Clothes, Books, Toys, Electronics, Furniture, Footwear, "
-            "Educational Materials, Household Items.\n\n"
-            f"Description: {description}\n"
-            "Return only the category name."
-        )
-        
-        response = model.generate_content(prompt)
-        ai_text = response.text.lower()
-        
-        categories = {
-            "clothes": "Clothes",
-            "books": "Books",
-            "toys": "Toys",
-            "electronics": "Electronics",
-            "furniture": "Furniture",
-            "footwear": "Footwear",
-            "educational": "Educational Materials",
-            "household": "Household Items",
-        }
-        
-        for key, value in categories.items():
-            if key in ai_text:
-                return JsonResponse({"category": value})
-    
-    except Exception as e:
-        logger.warning(f"Gemini AI failed: {e}")
-    
-    return JsonResponse({"category": fallback})
+    description = normalize(request.GET.get('description', ''))
+    return JsonResponse({"category": await suggest_category(description)})
 
 
 # ================= STATUS UPDATE =================
@@ -113,15 +62,13 @@ def update_status(request, donation_id):
     
     if request.method == 'POST':
         new_status = request.POST.get('status')
-        if new_status in [s[0] for s in DonationStatus.CHOICES]:
-            donation.status = new_status
-            donation.save()
-            
-            # Update tracking
-            tracking, created = DonationTracking.objects.get_or_create(donation=donation)
-            tracking.save()
-            
-            messages.success(request, f"Status updated to {new_status}")
+        if new_status in DonationStatus.LABELS:
+            try:
+                transition(donation, new_status, actor=request.user)
+            except InvalidTransition as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, f"Status updated to {new_status}")
     
     return redirect('admin_dashboard')
 
@@ -148,31 +95,34 @@ def download_receipt(request, donation_id):
     images = donation.images.all()
     image_urls = [request.build_absolute_uri(img.image.url) for img in images]
     
-    html = render_to_string('receipt.html', {
-        'donation': donation,
-        'generated_date': timezone.now(),
-        'image_urls': image_urls,
-    })
-
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="receipt_{donation.receipt_number}.pdf"'
-    
+    html = None
+
+    def render():
+        nonlocal html
+        html = render_to_string('receipt.html', {
+            'donation': donation,
+            'generated_date': timezone.now(),
+            'image_urls': image_urls,
+        })
+        return html_to_pdf_bytes(html)
+
     try:
-        from xhtml2pdf import pisa
-        pisa_status = pisa.CreatePDF(html, dest=response)
-        if pisa_status.err:
-            logger.error(f"PDF generation had errors: {pisa_status.err}")
-            # Fallback to HTML
-            response.write(html.encode('utf-8'))
-            response['Content-Type'] = 'text/html'
-            response['Content-Disposition'] = f'attachment; filename="receipt_{donation.receipt_number}.html"'
+        # Image URLs are part of the key so adding a photo re-renders
+        return cached_pdf_response(
+            request,
+            receipt_cache_key('receipt.html', donation, *image_urls),
+            donation.updated_at,
+            f"receipt_{donation.receipt_number}.pdf",
+            render,
+        )
     except Exception as e:
         logger.error(f"PDF creation failed: {e}")
-        response.write(html.encode('utf-8'))
-        response['Content-Type'] = 'text/html'
+        if html is None:
+            raise
+        # Fallback to HTML (never cached)
+        response = HttpResponse(html.encode('utf-8'), content_type='text/html')
         response['Content-Disposition'] = f'attachment; filename="receipt_{donation.receipt_number}.html"'
-
-    return response
+        return response
 
 
 # ================= ADMIN DASHBOARD =================
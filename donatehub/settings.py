@@ -143,6 +143,86 @@ ALLOWED_IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp']
 # Maximum image dimensions (optional validation)
 MAX_IMAGE_WIDTH = 4096
 MAX_IMAGE_HEIGHT = 4096
+MAX_IMAGE_UPLOAD_SIZE = 5 * 1024 * 1024
+
+# Renditions written on upload (see core/utils/image_pipeline.py)
+IMAGE_RENDITION_WIDTHS = [320, 640, 1280]
+IMAGE_THUMBNAIL_SIZE = (240, 240)
+# Seconds a process_images worker may hold a claimed batch before another
+# worker may take it back; keep well above the time one batch takes
+IMAGE_CLAIM_LEASE_SECONDS = 600
+
+# Stream every upload to a temp file so staging an image is a rename,
+# not a copy out of request memory; the SHA-256 is computed on the way
+FILE_UPLOAD_HANDLERS = ['core.storage.HashingFileUploadHandler']
+
+# Media is content-addressed: identical files are stored once and
+# reference-counted (see core/storage.py, manage.py dedupe_media)
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+# ================= CACHES =================
+# 'donations' holds serialized donation payloads (core/utils/donation_cache.py).
+# LocMemCache is per process and only fit for DEBUG: `manage.py process_images`
+# refuses it otherwise, as does `check --deploy`. Use FileBasedCache shared on
+# one host, or RedisCache against Redis or a compatible local server.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'donations': {
+        'BACKEND': os.getenv('DONATION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DONATION_CACHE_LOCATION', 'donations'),
+    },
+}
+DONATION_CACHE_ALIAS = 'donations'
+DONATION_CACHE_TIMEOUT = 300
+
+# Rows per status in the donation status counter (core.models.DonationStatusCounter);
+# more shards mean fewer concurrent writers waiting on the same row
+STATUS_COUNTER_SHARDS = 8
+
+
+# ================= STATUS EVENT STREAM (SSE) =================
+# Served by core/api_events.py under ASGI (donatehub/asgi.py) only; requests
+# through WSGI_APPLICATION get a 503. The frontend connects only when built
+# with VITE_STATUS_EVENTS=true. Events reach streams in the same process only.
+EVENT_STREAM_HEARTBEAT = 15          # seconds between keep-alive comments
+EVENT_STREAM_QUEUE_SIZE = 8          # undelivered events kept per connection
+EVENT_STREAM_RETRY_MS = 3000
+
+
+# ================= PICKUP ROUTING =================
+# Stops per vehicle run in GET /api/pickups/routes/ (core/utils/pickup_routing.py)
+PICKUP_RUN_CAPACITY = 25
+
+# Pickups booked per district per day (core/utils/pickup_slots.py); existing
+# days can be changed with `manage.py open_pickup_slots --capacity N`
+PICKUP_SLOT_CAPACITY = 200
+PICKUP_SLOT_CAPACITY_BY_DISTRICT = {}   # e.g. {'Ernakulam': 400}
+PICKUP_SLOT_HORIZON_DAYS = 14           # days searched for a free slot when scheduling
+
+
+# ================= BULK STATUS UPDATES =================
+# POST /api/donations/bulk-status/ and the admin "Mark selected as ..." actions
+BULK_STATUS_MAX_IDS = 10000          # ids accepted per request
+BULK_STATUS_CHUNK_SIZE = 1000        # ids per IN (...) list / bulk insert batch
+
+
+# ================= RECEIPT PDF CACHE =================
+# Rendered receipts are reused until the donation or template changes.
+# Bump RECEIPT_TEMPLATE_VERSION whenever a receipt template is edited.
+RECEIPT_CACHE_DIR = BASE_DIR / 'receipt_cache'
+RECEIPT_TEMPLATE_VERSION = 1
+RECEIPT_CACHE_MAX_AGE = 30 * 24 * 3600      # prune receipts unused for 30 days
+RECEIPT_CACHE_PRUNE_INTERVAL = 3600         # at most one background prune per hour
+RECEIPT_EXPORT_PROCESSES = os.cpu_count() or 1   # render pool for ZIP exports (0 = inline)
+RECEIPT_EXPORT_MAX_IN_FLIGHT = 16           # bounds memory held by pending renders
+RECEIPT_PRERENDER_STATUSES = ('DELIVERED', 'COMPLETED')   # moves that queue a render_receipts job
+RECEIPT_JOB_LEASE_SECONDS = 300             # a render_receipts claim older than this may be taken over
 
 
 # ================= DEFAULT PRIMARY KEY =================
@@ -211,10 +291,27 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
+# Outbox: requests only queue mail; `manage.py send_queued_emails` delivers it
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 30
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = 3600
+
 
 # ================= GEMINI API CONFIG =================
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Local category classifier (see core/utils/category_classifier.py).
+# Gemini is only asked when the local model is less confident than this.
+CATEGORY_MODEL_PATH = BASE_DIR / 'category_model.json'
+CATEGORY_CONFIDENCE_THRESHOLD = 0.6
+CATEGORY_CACHE_SIZE = 4096
+# Remote escalation (async; served natively under donatehub/asgi.py, and
+# coalesced and capped process-wide under WSGI too)
+CATEGORY_REMOTE_CLIENT = 'core.utils.category_classifier.GeminiCategoryClient'
+CATEGORY_REMOTE_TIMEOUT = 2.0        # seconds before falling back to the local answer
+CATEGORY_REMOTE_CONCURRENCY = 8      # max remote calls in flight per process
+
 # ================= CORS CONFIG =================
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -230,8 +327,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Keyset pagination on (created_at, id) - see core/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.DonationCursorPagination',
+    'PAGE_SIZE': 20,
 }
 
+# Upper bound for ?page_size= on donation lists
+DONATION_MAX_PAGE_SIZE = 100
+# Page size of the admin dashboard "recent" feed
+ADMIN_RECENT_PAGE_SIZE = 10
+# Admin changelists: unfiltered tables larger than this show the planner's
+# row estimate (pg_class.reltuples) instead of running COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
+# Seconds the per-district counts in the admin filter sidebar are cached
+ADMIN_FACET_CACHE_TIMEOUT = 300
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
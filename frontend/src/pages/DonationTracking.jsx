@@ -24,6 +24,24 @@ const DonationTracking = () => {
       }
     };
     fetchDonation();
+
+    // Server-pushed status changes need the backend running under ASGI;
+    // set VITE_STATUS_EVENTS=true when it is. The first event is just the
+    // current status.
+    if (import.meta.env.VITE_STATUS_EVENTS !== 'true') {
+      return undefined;
+    }
+    const token = localStorage.getItem('access_token');
+    const source = new EventSource(
+      `http://localhost:8000/api/donations/${id}/events/?token=${encodeURIComponent(token || '')}`
+    );
+    source.addEventListener('status', (event) => {
+      const update = JSON.parse(event.data);
+      if (update.previous !== null) {
+        fetchDonation();
+      }
+    });
+    return () => source.close();
   }, [id]);
 
   const handleDownloadReceipt = async () => {
@@ -68,6 +86,12 @@ const DonationTracking = () => {
     );
   }
 
+  // Latest time the donation entered a status, from the status event log
+  const stepReachedAt = (stepName) => {
+    const events = (donation?.timeline || []).filter((event) => event.status === stepName);
+    return events.length ? events[events.length - 1].at : null;
+  };
+
   const getStatusStepStatus = (stepName) => {
     const statusOrder = ['SUBMITTED', 'CONFIRMED', 'PICKUP_SCHEDULED', 'PICKED_UP', 'IN_TRANSIT', 'DELIVERED', 'COMPLETED'];
     const currentIdx = statusOrder.indexOf(donation.status);
@@ -174,6 +198,11 @@ const DonationTracking = () => {
                         {getStatusStepStatus(step.key) === 'completed' ? 'This stage is completed' :
                           getStatusStepStatus(step.key) === 'current' ? 'You are currently at this stage' : 'Awaiting this stage'}
                       </p>
+                      {stepReachedAt(step.key) && (
+                        <small className="text-muted">
+                          {new Date(stepReachedAt(step.key)).toLocaleString(undefined, { dateStyle: 'medium', timeStyle: 'short' })}
+                        </small>
+                      )}
                     </div>
                   </div>
                 ))}
@@ -8,12 +8,15 @@ const MyDonations = () => {
     const [downloading, setDownloading] = useState(false);
     const [error, setError] = useState(null);
     const [selectedImage, setSelectedImage] = useState(null);
+    const [nextPage, setNextPage] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         const fetchDonations = async () => {
             try {
                 const response = await api.get('/donations/');
-                setDonations(response.data);
+                setDonations(response.data.results);
+                setNextPage(response.data.next);
             } catch (err) {
                 console.error('Error fetching donations:', err);
                 setError('Failed to load donations. Please try again later.');
@@ -24,6 +27,22 @@ const MyDonations = () => {
         fetchDonations();
     }, []);
 
+    const handleLoadMore = async () => {
+        if (!nextPage) return;
+        setLoadingMore(true);
+        try {
+            // `next` is an absolute cursor URL built by the API
+            const response = await api.get(nextPage, { baseURL: '' });
+            setDonations((prev) => [...prev, ...response.data.results]);
+            setNextPage(response.data.next);
+        } catch (err) {
+            console.error('Error loading more donations:', err);
+            alert('Failed to load more donations. Please try again later.');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleDownloadReceipt = async (donationId, receiptNumber) => {
         setDownloading(true);
         try {
@@ -183,7 +202,7 @@ const MyDonations = () => {
                                                         src={`http://localhost:8000${donation.main_image}`}
                                                         alt="thumb"
                                                         className="donation-thumb"
-                                                        onClick={() => setSelectedImage({ url: `http://localhost:8000${donation.main_image}`, title: donation.category })}
+                                                        onClick={() => setSelectedImage({ url: donation.images?.[0]?.image || `http://localhost:8000${donation.main_image}`, title: donation.category })}
                                                     />
                                                 ) : (
                                                     <span className="text-muted">-</span>
@@ -237,6 +256,18 @@ const MyDonations = () => {
                                     ))}
                                 </tbody>
                             </table>
+                            {nextPage && (
+                                <div className="text-center">
+                                    <button
+                                        className="btn btn-outline-primary"
+                                        onClick={handleLoadMore}
+                                        disabled={loadingMore}
+                                    >
+                                        {loadingMore && <span className="spinner-border spinner-border-sm me-1"></span>}
+                                        Load more
+                                    </button>
+                                </div>
+                            )}
                         </div>
                     ) : (
                         <div className="alert alert-info text-center">